@@ -0,0 +1,27 @@
+/**
+ * Export template and scenario definitions for the backend.
+ *
+ * Writes backend/templates.json, which the backend's template library loads
+ * to precompute real ROI results. Run after editing src/data/templates.js or
+ * src/utils/scenarios.js:
+ *
+ *     npm run export-templates
+ *
+ * Scenario `outputs` are left out: the backend derives them from
+ * calculate_roi instead of trusting hardcoded numbers.
+ */
+
+import { writeFileSync } from 'node:fs';
+import { dirname, resolve } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { TEMPLATES } from '../src/data/templates.js';
+import { SCENARIOS } from '../src/utils/scenarios.js';
+
+const here = dirname(fileURLToPath(import.meta.url));
+const target = resolve(here, '../../backend/templates.json');
+
+// eslint-disable-next-line no-unused-vars
+const scenarios = SCENARIOS.map(({ outputs, ...definition }) => definition);
+
+writeFileSync(target, JSON.stringify({ templates: TEMPLATES, scenarios }, null, 2) + '\n');
+console.log(`Wrote ${TEMPLATES.length} templates and ${scenarios.length} scenarios to ${target}`);
@@ -11,6 +11,7 @@ import Docs from './pages/Docs';
 import Business from './pages/Business';
 import Marketplace from './pages/Marketplace';
 import Compare from './pages/Compare';
+import Share from './pages/Share';
 import NotFound from './pages/NotFound';
 import './styles/global.css';
 
@@ -46,6 +47,7 @@ function AppContent() {
           <Route path="/marketplace" element={<Marketplace />} />
           <Route path="/compare" element={<Compare />} />
           <Route path="/business" element={<Business />} />
+          <Route path="/share" element={<Share />} />
           <Route path="*" element={<NotFound />} />
         </Routes>
       </main>
@@ -147,7 +147,7 @@ export const TEMPLATES = [
             process_name: 'Order Fulfillment',
             frequency: 'daily',
             runs_per_period: 100,          // 100 orders/day
-            hours_per_run: 0.08,           // 5 mins per order manual
+            hours_per_run: 0.1,            // ~5-6 mins per order manual (calculator minimum)
             staff_count: 3,
             hourly_rate: 20,
             error_rate: 3,                 // 3-5% manual error rate
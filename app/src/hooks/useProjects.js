@@ -1,41 +1,173 @@
 import { useState, useEffect, useCallback } from 'react';
 import {
-    getProjects,
+    getProjectChanges,
+    syncProjectsAPI,
     saveProjectAPI,
     updateProjectAPI,
     deleteProjectAPI
 } from '../utils/api';
+import { useToast } from '../context/ToastContext';
 
 const STORAGE_KEY = 'roi-projects';
+const CURSOR_KEY = 'roi-projects-cursor';
+const PENDING_KEY = 'roi-projects-pending';
+
+// Edits uploaded per /projects/sync call (the backend's MAX_UPLOAD_CHANGES)
+const SYNC_BATCH_SIZE = 500;
+
+function readCachedProjects() {
+    try {
+        const stored = localStorage.getItem(STORAGE_KEY);
+        return stored ? JSON.parse(stored) : null;
+    } catch (err) {
+        console.error('Failed to load projects from localStorage:', err);
+        return null;
+    }
+}
+
+// Local edits not yet on the backend, by project id
+function readPending() {
+    try {
+        return JSON.parse(localStorage.getItem(PENDING_KEY)) || {};
+    } catch {
+        return {};
+    }
+}
+
+function writePending(pending) {
+    try {
+        localStorage.setItem(PENDING_KEY, JSON.stringify(pending));
+    } catch (err) {
+        console.error('Failed to store pending project edits:', err);
+    }
+}
+
+// Queue a local edit for the next sync. Later edits of the same project keep
+// the version the first one started from, so the backend can still tell
+// whether someone else changed the project in the meantime.
+function queueEdit(project, edit) {
+    const pending = readPending();
+    const baseVersion = pending[project.id]?.base_version ?? project.version ?? 0;
+    pending[project.id] = {
+        id: project.id,
+        base_version: baseVersion,
+        deleted: false,
+        name: project.name,
+        inputs: project.inputs,
+        results: project.results,
+        scenarios: project.scenarios,
+        ...edit,
+    };
+    writePending(pending);
+}
+
+function dropPending(id) {
+    const pending = readPending();
+    if (pending[id]) {
+        delete pending[id];
+        writePending(pending);
+    }
+}
+
+// Upload queued edits. The backend keeps its copy of a project that changed
+// since the edit started; the local side of such a conflict is uploaded again
+// as a new "(conflicted copy)" project so no work is lost. Returns the
+// conflicts, or null when the backend is unavailable (the queue is kept).
+let flushing = null;
+
+function flushPending() {
+    // One flush at a time (StrictMode mounts effects twice)
+    flushing = flushing || uploadPending().finally(() => { flushing = null; });
+    return flushing;
+}
+
+async function uploadPending() {
+    const edits = Object.values(readPending());
+    const conflicts = [];
+    for (let i = 0; i < edits.length; i += SYNC_BATCH_SIZE) {
+        const batch = edits.slice(i, i + SYNC_BATCH_SIZE);
+        const response = await syncProjectsAPI(batch);
+        if (response === null) {
+            return null;
+        }
+        const pending = readPending();
+        response.results.forEach((result, index) => {
+            delete pending[result.id];
+            if (result.status === 'conflict') {
+                conflicts.push({ edit: batch[index], server: result.project });
+            }
+        });
+        writePending(pending);
+    }
+
+    const copies = conflicts
+        .filter(({ edit }) => !edit.deleted)
+        .map(({ edit }) => ({
+            ...edit,
+            id: crypto.randomUUID(),
+            base_version: 0,
+            name: `${edit.name} (conflicted copy)`,
+        }));
+    if (copies.length > 0 && await syncProjectsAPI(copies) === null) {
+        // Backend went away mid-sync, upload the copies next time
+        const pending = readPending();
+        copies.forEach(copy => { pending[copy.id] = copy; });
+        writePending(pending);
+    }
+    return conflicts;
+}
+
+// Apply change feed entries to a project list (tombstones remove), newest first
+function applyChanges(projects, changes) {
+    const byId = new Map(projects.map(p => [p.id, p]));
+    changes.forEach(change => {
+        if (change.deleted) {
+            byId.delete(change.id);
+        } else {
+            byId.set(change.id, { ...change.project, version: change.version });
+        }
+    });
+    return [...byId.values()].sort((a, b) => (b.updated || '').localeCompare(a.updated || ''));
+}
 
 export function useProjects() {
     const [projects, setProjects] = useState([]);
     const [isLoading, setIsLoading] = useState(true);
     const [useBackend, setUseBackend] = useState(true);
+    const [conflicts, setConflicts] = useState([]);
+    const toast = useToast();
 
-    // Load projects on mount - try backend first, fall back to localStorage
+    // Load projects on mount - upload edits made while offline, then sync the
+    // localStorage copy with the backend's changes since the last visit, fall
+    // back to localStorage alone
     useEffect(() => {
         async function loadProjects() {
             setIsLoading(true);
+            const cached = readCachedProjects();
 
-            // Try backend first
-            const backendProjects = await getProjects();
-            if (backendProjects !== null) {
-                setProjects(backendProjects);
+            // Try backend first (everything when there is no cached copy)
+            const uploaded = await flushPending();
+            const cursor = cached ? Number(localStorage.getItem(CURSOR_KEY)) || 0 : 0;
+            const feed = uploaded === null ? null : await getProjectChanges(cursor);
+            if (feed !== null) {
+                setProjects(applyChanges(feed.full ? [] : cached, feed.changes));
+                localStorage.setItem(CURSOR_KEY, String(feed.cursor));
                 setUseBackend(true);
                 setIsLoading(false);
+                if (uploaded.length > 0) {
+                    setConflicts(uploaded);
+                    toast.warning(
+                        `${uploaded.length} project(s) changed elsewhere before your offline edits were uploaded. ` +
+                        'Your versions were kept as "(conflicted copy)" projects.'
+                    );
+                }
                 return;
             }
 
-            // Fall back to localStorage
+            // Fall back to localStorage; local edits stay queued for the next sync
             setUseBackend(false);
-            try {
-                const stored = localStorage.getItem(STORAGE_KEY);
-                if (stored) {
-                    setProjects(JSON.parse(stored));
-                }
-            } catch (err) {
-                console.error('Failed to load projects from localStorage:', err);
+            if (cached) {
+                setProjects(cached);
             }
             setIsLoading(false);
         }
@@ -71,7 +203,7 @@ export function useProjects() {
             }
         }
 
-        // Fall back to local-only save
+        // Fall back to local-only save, uploaded on the next sync
         const id = crypto.randomUUID();
         const newProject = {
             id,
@@ -79,6 +211,7 @@ export function useProjects() {
             created: new Date().toISOString(),
             updated: new Date().toISOString(),
         };
+        queueEdit(newProject, { base_version: 0 });
         setProjects(prev => [newProject, ...prev]);
         return id;
     }, [useBackend]);
@@ -99,12 +232,14 @@ export function useProjects() {
         if (useBackend) {
             const updated = await updateProjectAPI(id, merged);
             if (updated) {
+                dropPending(id);
                 setProjects(prev => prev.map(p => p.id === id ? updated : p));
                 return;
             }
         }
 
-        // Fall back to local-only update
+        // Fall back to local-only update, uploaded on the next sync
+        queueEdit(current, merged);
         setProjects(prev =>
             prev.map(p =>
                 p.id === id
@@ -119,14 +254,22 @@ export function useProjects() {
         if (useBackend) {
             const result = await deleteProjectAPI(id);
             if (result) {
+                dropPending(id);
                 setProjects(prev => prev.filter(p => p.id !== id));
                 return;
             }
         }
 
-        // Fall back to local-only delete
+        // Fall back to local-only delete, uploaded on the next sync
+        const current = projects.find(p => p.id === id);
+        if (current?.version === undefined) {
+            // Never uploaded, nothing to delete on the backend
+            dropPending(id);
+        } else {
+            queueEdit(current, { deleted: true });
+        }
         setProjects(prev => prev.filter(p => p.id !== id));
-    }, [useBackend]);
+    }, [useBackend, projects]);
 
     const duplicateProject = useCallback(async (id) => {
         const original = projects.find(p => p.id === id);
@@ -148,7 +291,7 @@ export function useProjects() {
             }
         }
 
-        // Fall back to local-only duplicate
+        // Fall back to local-only duplicate, uploaded on the next sync
         const newId = crypto.randomUUID();
         const duplicate = {
             id: newId,
@@ -156,6 +299,7 @@ export function useProjects() {
             created: new Date().toISOString(),
             updated: new Date().toISOString(),
         };
+        queueEdit(duplicate, { base_version: 0 });
         setProjects(prev => [duplicate, ...prev]);
         return newId;
     }, [useBackend, projects]);
@@ -168,6 +312,7 @@ export function useProjects() {
         projects,
         isLoading,
         useBackend,
+        conflicts,
         saveProject,
         updateProject,
         deleteProject,
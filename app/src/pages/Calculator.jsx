@@ -11,7 +11,7 @@ import Button from '../components/ui/Button';
 import { XIcon, FolderIcon } from '../components/ui/Icons';
 import { useProjects } from '../hooks/useProjects';
 import { useToast } from '../context/ToastContext';
-import { calculateROI, generatePDF } from '../utils/api';
+import { calculateROI, generatePDF, createShareLink } from '../utils/api';
 import styles from './Calculator.module.css';
 
 export default function Calculator() {
@@ -20,6 +20,7 @@ export default function Calculator() {
     const [formKey, setFormKey] = useState(0);
     const [isLoading, setIsLoading] = useState(false);
     const [isDownloading, setIsDownloading] = useState(false);
+    const [isSharing, setIsSharing] = useState(false);
     const [error, setError] = useState(null);
     const [showProjects, setShowProjects] = useState(false);
     const [loadedInputs, setLoadedInputs] = useState(null);
@@ -164,20 +165,20 @@ export default function Calculator() {
         }
     };
 
+    // Merge form data with branding options
+    const brandedData = () => ({
+        ...formData,
+        ...(pdfBranding.company_name && { company_name: pdfBranding.company_name }),
+        ...(pdfBranding.brand_color !== '#2563eb' && { brand_color: pdfBranding.brand_color }),
+        ...(pdfBranding.logo_base64 && { logo_base64: pdfBranding.logo_base64 }),
+    });
+
     const handleDownloadPDF = async () => {
         if (!formData) return;
 
         setIsDownloading(true);
         try {
-            // Merge form data with branding options
-            const pdfData = {
-                ...formData,
-                ...(pdfBranding.company_name && { company_name: pdfBranding.company_name }),
-                ...(pdfBranding.brand_color !== '#2563eb' && { brand_color: pdfBranding.brand_color }),
-                ...(pdfBranding.logo_base64 && { logo_base64: pdfBranding.logo_base64 }),
-            };
-
-            const blob = await generatePDF(pdfData);
+            const blob = await generatePDF(brandedData());
             const url = URL.createObjectURL(blob);
             const a = document.createElement('a');
             a.href = url;
@@ -193,6 +194,26 @@ export default function Calculator() {
         }
     };
 
+    const handleShare = async () => {
+        if (!formData) return;
+
+        setIsSharing(true);
+        try {
+            const { link } = await createShareLink(brandedData());
+            try {
+                await navigator.clipboard.writeText(link);
+                toast.success('Share link copied to clipboard');
+            } catch {
+                // Clipboard blocked (e.g. insecure origin), show the link instead
+                toast.info(`Share link: ${link}`);
+            }
+        } catch (err) {
+            toast.error('Failed to create share link');
+        } finally {
+            setIsSharing(false);
+        }
+    };
+
     const handleClearScenarios = () => {
         setScenarios({ base: null, best: null, worst: null });
         setResults(null);
@@ -295,6 +316,13 @@ export default function Calculator() {
                                     >
                                         Save Project
                                     </Button>
+                                    <Button
+                                        variant="secondary"
+                                        onClick={handleShare}
+                                        loading={isSharing}
+                                    >
+                                        Share Link
+                                    </Button>
                                     {Object.values(scenarios).some(s => s !== null) && (
                                         <Button
                                             variant="ghost"
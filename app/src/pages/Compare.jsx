@@ -1,6 +1,7 @@
-import { useState } from 'react';
+import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { useProjects } from '../hooks/useProjects';
+import { compareProcesses } from '../utils/api';
 import Button from '../components/ui/Button';
 import { DownloadIcon, ArrowRightIcon } from '../components/ui/Icons';
 import styles from './Compare.module.css';
@@ -29,8 +30,20 @@ const METRICS = [
 ];
 
 export default function Compare() {
-    const { projects, isLoading } = useProjects();
+    const { projects, isLoading, useBackend } = useProjects();
     const [selectedIds, setSelectedIds] = useState(new Set());
+    const [comparison, setComparison] = useState(null);
+
+    // Recalculate the selected projects together on the backend when it is reachable
+    useEffect(() => {
+        setComparison(null);
+        if (!useBackend || selectedIds.size < 2) return;
+        let cancelled = false;
+        compareProcesses([...selectedIds]).then(result => {
+            if (!cancelled) setComparison(result);
+        });
+        return () => { cancelled = true; };
+    }, [useBackend, selectedIds]);
 
     const toggleProject = (id) => {
         setSelectedIds(prev => {
@@ -46,6 +59,18 @@ export default function Compare() {
 
     const selectedProjects = projects.filter(p => selectedIds.has(p.id));
 
+    // Backend comparison value when available, otherwise the stored one
+    const getValue = (project, metric) => {
+        const index = comparison ? comparison.processes.findIndex(p => p.id === project.id) : -1;
+        if (index >= 0) {
+            const column = comparison.metrics[metric.key];
+            if (column) return column.values[index];
+            if (metric.key in comparison.processes[index]) return comparison.processes[index][metric.key];
+        }
+        const data = metric.source === 'inputs' ? project.inputs : project.results;
+        return data?.[metric.key] ?? data?.[metric.fallback];
+    };
+
     const formatValue = (value, format) => {
         if (value === undefined || value === null) return '—';
         switch (format) {
@@ -62,11 +87,11 @@ export default function Compare() {
 
     const getBestProjectId = (metric) => {
         if (!metric.higherBetter === undefined || selectedProjects.length < 2) return null;
+        if (comparison?.metrics[metric.key]) return comparison.metrics[metric.key].best;
 
-        const values = selectedProjects.map(p => {
-            const data = metric.source === 'inputs' ? p.inputs : p.results;
-            return { id: p.id, value: data?.[metric.key] ?? data?.[metric.fallback] };
-        }).filter(v => v.value !== undefined && v.value !== null);
+        const values = selectedProjects
+            .map(p => ({ id: p.id, value: getValue(p, metric) }))
+            .filter(v => v.value !== undefined && v.value !== null);
 
         if (values.length === 0) return null;
 
@@ -83,8 +108,7 @@ export default function Compare() {
         const rows = METRICS.map(metric => {
             const row = [metric.label];
             selectedProjects.forEach(p => {
-                const data = metric.source === 'inputs' ? p.inputs : p.results;
-                const value = data?.[metric.key] ?? data?.[metric.fallback];
+                const value = getValue(p, metric);
                 row.push(formatValue(value, metric.format));
             });
             return row;
@@ -193,8 +217,7 @@ export default function Compare() {
                                                     <tr key={metric.key}>
                                                         <td className={styles.metricLabel}>{metric.label}</td>
                                                         {selectedProjects.map(p => {
-                                                            const data = metric.source === 'inputs' ? p.inputs : p.results;
-                                                            const value = data?.[metric.key] ?? data?.[metric.fallback];
+                                                            const value = getValue(p, metric);
                                                             const isBest = bestId === p.id;
                                                             return (
                                                                 <td
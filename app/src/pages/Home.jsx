@@ -1,7 +1,8 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
 import { SCENARIOS } from '../utils/scenarios';
 import { TEMPLATES } from '../data/templates';
+import { getTemplateLibrary } from '../utils/api';
 import ScenarioModule from '../components/home/ScenarioModule';
 import WhatIsAutomation from '../components/home/WhatIsAutomation';
 import HowItWorks from '../components/home/HowItWorks';
@@ -16,8 +17,20 @@ import styles from './Home.module.css';
 
 export default function Home() {
     const [activeScenario, setActiveScenario] = useState(0);
+    const [scenarios, setScenarios] = useState(SCENARIOS);
     const navigate = useNavigate();
 
+    // Swap in outputs computed by the backend calculator when it is reachable
+    useEffect(() => {
+        getTemplateLibrary().then(library => {
+            if (!library) return;
+            const computed = Object.fromEntries(
+                library.scenarios.filter(s => s.outputs).map(s => [s.id, s.outputs])
+            );
+            setScenarios(SCENARIOS.map(s => (computed[s.id] ? { ...s, outputs: computed[s.id] } : s)));
+        });
+    }, []);
+
     const categories = [
         { id: 'invoice-approval', label: 'Finance' },
         { id: 'lead-routing', label: 'Sales' },
@@ -92,7 +105,7 @@ export default function Home() {
 
                 {/* Active Scenario */}
                 <div className={styles.scenarioContainer}>
-                    <ScenarioModule scenario={SCENARIOS[activeScenario]} />
+                    <ScenarioModule scenario={scenarios[activeScenario]} />
                 </div>
             </section>
 
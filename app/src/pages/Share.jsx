@@ -0,0 +1,59 @@
+import { useEffect, useState } from 'react';
+import { Link, useNavigate, useSearchParams } from 'react-router-dom';
+import { getSharedSnapshot } from '../utils/api';
+import styles from './NotFound.module.css';
+
+// Opens a shared calculation (share?id=...) in the calculator
+export default function Share() {
+    const [searchParams] = useSearchParams();
+    const [missing, setMissing] = useState(false);
+    const navigate = useNavigate();
+    const id = searchParams.get('id');
+
+    useEffect(() => {
+        if (!id) {
+            setMissing(true);
+            return;
+        }
+        getSharedSnapshot(id).then(snapshot => {
+            if (!snapshot) {
+                setMissing(true);
+                return;
+            }
+            navigate('/calculator', {
+                replace: true,
+                state: {
+                    loadProject: {
+                        name: snapshot.inputs.process_name,
+                        inputs: snapshot.inputs,
+                        results: snapshot.results,
+                    },
+                },
+            });
+        });
+    }, [id, navigate]);
+
+    if (!missing) {
+        return (
+            <div className={styles.page}>
+                <div className={styles.container}>
+                    <p>Loading shared calculation...</p>
+                </div>
+            </div>
+        );
+    }
+
+    return (
+        <div className={styles.page}>
+            <div className={styles.container}>
+                <h1>Shared calculation not found</h1>
+                <p>The link may be incomplete, or the calculation is no longer available.</p>
+                <div className={styles.actions}>
+                    <Link to="/calculator" className={styles.primaryBtn}>
+                        Try Calculator
+                    </Link>
+                </div>
+            </div>
+        </div>
+    );
+}
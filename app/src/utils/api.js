@@ -138,6 +138,68 @@ export async function generatePDF(data) {
     }
 }
 
+// Saved projects and/or unsaved inputs compared in one call: aligned metric
+// columns, ranks and pairwise deltas (null when the backend is unavailable)
+export async function compareProcesses(projectIds = [], inputs = []) {
+    try {
+        const response = await fetch(`${API_URL}/compare`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ project_ids: projectIds, inputs }),
+        });
+        if (response.ok) {
+            return response.json();
+        }
+    } catch {
+        // Backend unavailable, callers compare stored results
+    }
+    return null;
+}
+
+// Freeze inputs, results and the branded PDF as an immutable share link
+export async function createShareLink(data) {
+    const response = await fetch(`${API_URL}/share`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(data),
+    });
+    if (!response.ok) {
+        throw new Error('Creating the share link failed');
+    }
+    const snapshot = await response.json();
+    return {
+        ...snapshot,
+        link: `${window.location.origin}/share?id=${snapshot.id}`,
+        pdfUrl: `${API_URL}${snapshot.pdf_url}`,
+    };
+}
+
+// Shared calculation (null when it does not exist or the backend is unavailable)
+export async function getSharedSnapshot(id) {
+    try {
+        const response = await fetch(`${API_URL}/share/${encodeURIComponent(id)}`);
+        if (response.ok) {
+            return response.json();
+        }
+    } catch {
+        // Backend unavailable
+    }
+    return null;
+}
+
+// Template library with backend-computed results (cached by the browser)
+export async function getTemplateLibrary() {
+    try {
+        const response = await fetch(`${API_URL}/templates`);
+        if (response.ok) {
+            return response.json();
+        }
+    } catch {
+        // Backend unavailable, callers keep the bundled numbers
+    }
+    return null;
+}
+
 export async function checkHealth() {
     try {
         const response = await fetch(`${API_URL}/health`);
@@ -185,6 +247,50 @@ export async function getProjects() {
     return null; // Signals to use localStorage fallback
 }
 
+// Projects changed since a cursor, following every page (null when the
+// backend is unavailable). full means the changes replace the local copy.
+export async function getProjectChanges(since = 0) {
+    try {
+        const changes = [];
+        let cursor = since;
+        let full = false;
+        for (;;) {
+            const response = await fetch(`${API_URL}/projects/changes?since=${cursor}`);
+            if (!response.ok) {
+                return null;
+            }
+            const page = await response.json();
+            full = full || page.full;
+            changes.push(...page.changes);
+            cursor = page.cursor;
+            if (!page.has_more) {
+                return { changes, cursor, full };
+            }
+        }
+    } catch {
+        // Backend unavailable
+    }
+    return null;
+}
+
+// Upload local edits ({ id, base_version, deleted, name, inputs, results, scenarios });
+// edits made on an outdated copy come back as conflicts with the server's copy
+export async function syncProjectsAPI(changes) {
+    try {
+        const response = await fetch(`${API_URL}/projects/sync`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ changes }),
+        });
+        if (response.ok) {
+            return await response.json();
+        }
+    } catch {
+        // Backend unavailable
+    }
+    return null;
+}
+
 export async function saveProjectAPI(project) {
     try {
         const response = await fetch(`${API_URL}/projects`, {
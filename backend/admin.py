@@ -0,0 +1,38 @@
+"""
+admin.py - Admin Access Control
+
+Guards operational endpoints (API key management, diagnostics) with a shared
+admin token sent in the X-Admin-Token header.
+
+Configuration:
+    Set ADMIN_TOKEN to enable admin endpoints. When unset they return 403.
+"""
+
+import hmac
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Check a candidate admin token in constant time."""
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> bool:
+    """
+    Dependency for admin-only endpoints.
+    
+    Raises:
+        HTTPException if admin access is disabled or the token is wrong
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled. Set ADMIN_TOKEN.")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    return True
@@ -0,0 +1,317 @@
+"""
+admission.py - Cost-Weighted Admission Control and Load Shedding
+
+Protects a worker as a whole, where the rate limiter only counts requests
+per client. Each expensive route belongs to a work class with a cost in
+units (a calculation is 1, a PDF render 8, a batch job 20) and a priority.
+A worker runs at most ADMISSION_CAPACITY units at once; requests beyond
+that wait in a priority queue, so interactive calculations are started
+before PDF renders and both before batch jobs. Cheap routes (health,
+metrics, cached GETs) are not controlled.
+
+Shedding: the controller tracks how long admitted requests waited (a
+smoothed queue delay, or the oldest waiter's age when that is longer). When
+it exceeds a class's share of ADMISSION_TARGET_MS, new requests of that class
+are rejected on arrival with 503 and Retry-After: batch first, then PDFs.
+Interactive requests are never shed on arrival, and any request that waits
+longer than its class's max_wait_ms is shed too, so no request queues
+forever.
+
+Coalescing: identical PDF requests share one render (singleflight.py), but
+only if they overlap. A request identical to one already admitted therefore
+joins it without being charged instead of queueing behind it and rendering
+again once admitted. For these routes the body is read before admission to
+key the request; the key is the canonical JSON body.
+
+All state lives on the worker's event loop, so no locking is needed.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import time
+from typing import Optional
+
+from metrics import ADMISSION_REQUESTS
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+
+# Cost units one CPU core keeps busy without requests queueing on the GIL:
+# one PDF render or eight calculations
+CAPACITY_PER_CPU = 8
+
+# Cost units one worker runs concurrently. Sized to the CPUs rather than the
+# thread pool (40): with 40 units on one core, 64 mixed-profile users saw a
+# p95 of 3.6 s at 48 req/s, the delay spent on the GIL after admission instead
+# of in the queue the shedder watches; with 8, p95 3.0 s at 60 req/s. With
+# several workers per host, set it to CAPACITY_PER_CPU * cores / workers.
+ADMISSION_CAPACITY = int(os.getenv("ADMISSION_CAPACITY", str(CAPACITY_PER_CPU * (os.cpu_count() or 1))))
+
+# Queue delay the worker aims to stay under (milliseconds)
+ADMISSION_TARGET_MS = float(os.getenv("ADMISSION_TARGET_MS", "100"))
+
+# Weight of each new sample in the smoothed queue delay
+DELAY_SMOOTHING = 0.2
+
+# Seconds clients are asked to wait after a 503
+RETRY_AFTER_SECONDS = 1
+
+
+class WorkClass:
+    """
+    Routes that cost and matter alike.
+
+    Attributes:
+        cost: Capacity units a request holds while it runs
+        priority: Queue order, 0 first
+        max_wait_ms: Longest a request may wait before it is shed
+        shed_factor: Shed on arrival once the queue delay exceeds
+                     ADMISSION_TARGET_MS times this (None: never)
+        cancel_on_disconnect: Abandon the work when the client disconnects
+                              (see cancellation.py)
+    """
+
+    __slots__ = ("name", "cost", "priority", "max_wait_ms", "shed_factor", "cancel_on_disconnect")
+
+    def __init__(self, name: str, cost: int, priority: int, max_wait_ms: float, shed_factor=None,
+                 cancel_on_disconnect: bool = False):
+        self.name = name
+        self.cost = cost
+        self.priority = priority
+        self.max_wait_ms = max_wait_ms
+        self.shed_factor = shed_factor
+        self.cancel_on_disconnect = cancel_on_disconnect
+
+
+INTERACTIVE = WorkClass("interactive", cost=1, priority=0, max_wait_ms=2000)
+PDF = WorkClass("pdf", cost=8, priority=1, max_wait_ms=1000, shed_factor=2.0, cancel_on_disconnect=True)
+BATCH = WorkClass("batch", cost=20, priority=2, max_wait_ms=500, shed_factor=1.0, cancel_on_disconnect=True)
+
+# (method, path) -> work class; other routes are admitted without accounting
+ROUTES = {
+    ("POST", "/calculate"): INTERACTIVE,
+    ("POST", "/calculate/delta"): INTERACTIVE,
+    ("POST", "/calculate-auth"): INTERACTIVE,
+    ("POST", "/calculate/scenarios"): INTERACTIVE,
+    ("POST", "/cash-flow"): INTERACTIVE,
+    ("POST", "/compare"): INTERACTIVE,
+    ("POST", "/generate-pdf"): PDF,
+    ("POST", "/share"): PDF,
+    ("POST", "/ingest"): BATCH,
+    ("POST", "/portfolio/optimize"): BATCH,
+    ("POST", "/portfolio/phasing"): BATCH,
+    ("POST", "/tool-pricing/quote"): BATCH,
+    ("POST", "/ai-pricing/quote"): BATCH,
+    ("POST", "/projects/sync"): BATCH,
+}
+
+# Routes whose endpoint coalesces identical concurrent requests (singleflight.py)
+COALESCED_ROUTES = {("POST", "/generate-pdf")}
+
+
+class AdmissionController:
+    """Cost accounting, priority queue and shedding decisions for one worker."""
+
+    def __init__(self, capacity: int = ADMISSION_CAPACITY, target_ms: float = ADMISSION_TARGET_MS):
+        self.capacity = capacity
+        self.target_ms = target_ms
+        self.in_flight = 0
+        self.queue_delay_ms = 0.0
+        self._waiting = []  # heap of [priority, seq, cost, future, enqueued, key]
+        self._seq = itertools.count()
+        self._keys = {}  # coalescing key -> charged requests admitted under it
+
+    def _cost(self, work: WorkClass) -> int:
+        # A request costing more than the whole capacity runs alone
+        return min(work.cost, self.capacity)
+
+    def delay_ms(self) -> float:
+        """Current queueing delay: smoothed, or the oldest waiter's age if longer."""
+        oldest = min((entry[4] for entry in self._waiting if not entry[3].done()), default=None)
+        waited = (time.perf_counter() - oldest) * 1000 if oldest is not None else 0.0
+        return max(self.queue_delay_ms, waited)
+
+    def _record_delay(self, delay_ms: float) -> None:
+        self.queue_delay_ms += DELAY_SMOOTHING * (delay_ms - self.queue_delay_ms)
+
+    async def acquire(self, work: WorkClass, key: Optional[str] = None) -> Optional[int]:
+        """
+        Wait for capacity.
+
+        Args:
+            work: The request's work class
+            key: Identical requests' shared key; while one of them is admitted,
+                 the others are admitted at once without being charged
+
+        Returns:
+            Cost units charged (0 when joining an identical admitted request),
+            or None if the request is shed instead
+        """
+        if key is not None and key in self._keys:
+            ADMISSION_REQUESTS.inc(work_class=work.name, outcome="coalesced")
+            return 0
+        cost = self._cost(work)
+        if not self._waiting and self.in_flight + cost <= self.capacity:
+            self._admit(cost, key)
+            self._record_delay(0.0)
+            ADMISSION_REQUESTS.inc(work_class=work.name, outcome="admitted")
+            return cost
+        if work.shed_factor is not None and self.delay_ms() > self.target_ms * work.shed_factor:
+            ADMISSION_REQUESTS.inc(work_class=work.name, outcome="shed")
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [work.priority, next(self._seq), cost, future, time.perf_counter(), key]
+        heapq.heappush(self._waiting, entry)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), work.max_wait_ms / 1000)
+        except asyncio.TimeoutError:
+            if not future.done():
+                future.cancel()
+                self._dispatch()
+                ADMISSION_REQUESTS.inc(work_class=work.name, outcome="shed")
+                return None
+        except asyncio.CancelledError:
+            # Client went away while queued: give back capacity if it was granted meanwhile
+            if future.done() and not future.cancelled():
+                self.release(future.result(), key)
+            else:
+                future.cancel()
+                self._dispatch()
+            raise
+        charged = future.result()
+        self._record_delay((time.perf_counter() - entry[4]) * 1000)
+        ADMISSION_REQUESTS.inc(work_class=work.name, outcome="queued" if charged else "coalesced")
+        return charged
+
+    def release(self, charged: int, key: Optional[str] = None) -> None:
+        """Return a finished request's capacity and start waiting requests."""
+        if charged:
+            self.in_flight -= charged
+            if key is not None:
+                self._keys[key] -= 1
+                if not self._keys[key]:
+                    del self._keys[key]
+        self._dispatch()
+
+    def _admit(self, cost: int, key: Optional[str]) -> None:
+        self.in_flight += cost
+        if key is not None:
+            self._keys[key] = self._keys.get(key, 0) + 1
+
+    def _dispatch(self) -> None:
+        """Admit waiting requests in priority order while capacity allows."""
+        while self._waiting:
+            _, _, cost, future, _, key = self._waiting[0]
+            if future.done():
+                heapq.heappop(self._waiting)
+                continue
+            if self.in_flight + cost > self.capacity:
+                break
+            heapq.heappop(self._waiting)
+            self._admit(cost, key)
+            future.set_result(cost)
+            if key is not None:
+                # Identical requests queued behind it join it for free
+                for entry in self._waiting:
+                    if entry[5] == key and not entry[3].done():
+                        entry[3].set_result(0)
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": ADMISSION_ENABLED,
+            "capacity": self.capacity,
+            "in_flight_cost": self.in_flight,
+            "waiting": sum(1 for entry in self._waiting if not entry[3].done()),
+            "queue_delay_ms": round(self.delay_ms(), 3),
+            "target_ms": self.target_ms,
+        }
+
+
+controller = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware admitting requests to controlled routes through the controller."""
+
+    def __init__(self, app, admission: AdmissionController = None):
+        self.app = app
+        self.admission = admission or controller
+
+    async def __call__(self, scope, receive, send):
+        work = ROUTES.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if work is None or not ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        # Until admitted the request counts as queued (see cancellation.py),
+        # even though the body of a coalesced route has been read already
+        scope["admission_waiting"] = True
+        key = None
+        if (scope["method"], scope["path"]) in COALESCED_ROUTES:
+            body, receive = await _read_body(receive)
+            if body is None:
+                return  # Client disconnected
+            key = _body_key(body)
+        charged = await self.admission.acquire(work, key)
+        scope["admission_waiting"] = False
+        if charged is None:
+            await _busy(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.admission.release(charged, key)
+
+
+async def _read_body(receive) -> tuple:
+    """
+    Read the whole request body.
+
+    Returns:
+        Tuple of (body, or None if the client disconnected, and a receive
+        callable that replays the body before passing on later messages)
+    """
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None, receive
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    body = b"".join(chunks)
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def replay():
+        return pending.pop() if pending else await receive()
+
+    return body, replay
+
+
+def _body_key(body: bytes) -> Optional[str]:
+    """Coalescing key of a JSON body: key order and whitespace do not matter (None if not JSON)."""
+    try:
+        content = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return None
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+async def _busy(send) -> None:
+    """503 with Retry-After for a shed request."""
+    body = json.dumps({"detail": "Server is busy, please retry shortly"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(RETRY_AFTER_SECONDS).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
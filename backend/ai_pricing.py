@@ -0,0 +1,175 @@
+"""
+ai_pricing.py - LLM Inference Pricing
+
+Per-token prices of the AI models in app/src/utils/toolPricing.js
+(AI_MODELS) and the cost of AI-assisted automation steps: a process that
+sends input_tokens and receives output_tokens on every run costs
+
+    runs_per_year * (input_tokens * input_price + output_tokens * output_price) / 1,000,000
+
+per year, prices being USD per million tokens. The table is loaded once
+into price vectors so a whole portfolio is priced on every model with one
+outer product.
+
+Cached-input and cache-write prices are not modeled: every input token is
+billed at the standard input rate, the conservative estimate.
+"""
+
+import functools
+
+from tool_pricing import PRICING_LAST_UPDATED
+
+TOKENS_PER_PRICE_UNIT = 1_000_000
+
+# Provider -> name and models as (id, name, input price, output price) in USD
+# per 1M tokens. Ids are the AIModel values in models.py.
+PROVIDERS = {
+    "openai": {
+        "name": "OpenAI",
+        "models": [
+            ("gpt_5_2", "GPT-5.2", 1.75, 14.00),
+            ("gpt_5_mini", "GPT-5-mini", 0.25, 2.00),
+            ("gpt_4_1", "GPT-4.1", 2.00, 8.00),
+            ("gpt_4o", "GPT-4o", 2.50, 10.00),
+            ("gpt_4o_mini", "GPT-4o-mini", 0.15, 0.60),
+            ("o3", "o3", 2.00, 8.00),
+            ("o4_mini", "o4-mini", 1.10, 4.40),
+        ],
+    },
+    "anthropic": {
+        "name": "Anthropic",
+        "models": [
+            ("claude_opus_4_5", "Claude Opus 4.5", 5.00, 25.00),
+            ("claude_sonnet_4_5", "Claude Sonnet 4.5", 3.00, 15.00),
+            ("claude_haiku_4_5", "Claude Haiku 4.5", 1.00, 5.00),
+        ],
+    },
+    "google": {
+        "name": "Google (Gemini)",
+        "models": [
+            ("gemini_2_5_pro", "Gemini 2.5 Pro", 1.25, 10.00),
+            ("gemini_2_5_flash", "Gemini 2.5 Flash", 0.30, 2.50),
+        ],
+    },
+    "xai": {
+        "name": "xAI (Grok)",
+        "models": [
+            ("grok_4_1_fast_reasoning", "Grok-4-1-fast-reasoning", 0.20, 0.50),
+            ("grok_4_fast_reasoning", "Grok-4-fast-reasoning", 0.20, 0.50),
+            ("grok_code_fast_1", "Grok-code-fast-1", 0.20, 1.50),
+            ("grok_4", "Grok-4", 3.00, 15.00),
+        ],
+    },
+    "cohere": {
+        "name": "Cohere",
+        "models": [
+            ("command_r_03_2024", "Command R 03-2024", 0.50, 1.50),
+            ("command_r_plus_08_2024", "Command R+ 08-2024", 2.50, 10.00),
+            ("aya_expanse", "Aya Expanse (8B/32B)", 0.50, 1.50),
+        ],
+    },
+}
+
+# Model id -> (provider, name, input price, output price)
+MODELS = {
+    model_id: (provider, name, input_price, output_price)
+    for provider, data in PROVIDERS.items()
+    for model_id, name, input_price, output_price in data["models"]
+}
+
+# Column order of annual_costs_all() results
+MODEL_IDS = tuple(MODELS)
+
+
+@functools.lru_cache(maxsize=None)
+def price_vectors():
+    """(input prices, output prices) as float arrays in MODEL_IDS order."""
+    import numpy as np
+
+    input_prices = np.array([MODELS[model_id][2] for model_id in MODEL_IDS])
+    output_prices = np.array([MODELS[model_id][3] for model_id in MODEL_IDS])
+    return input_prices, output_prices
+
+
+def ai_cost(model: str, runs_per_year: float, input_tokens: float, output_tokens: float) -> float:
+    """
+    Annual inference cost of one process.
+
+    Args:
+        model: A MODEL_IDS id, or None for no AI step (cost 0)
+        runs_per_year: Runs per year
+        input_tokens: Input (prompt) tokens per run
+        output_tokens: Output tokens per run, reasoning tokens included
+
+    Returns:
+        Annual cost in USD
+
+    Raises:
+        ValueError: On an unknown model
+    """
+    if model is None:
+        return 0.0
+    if model not in MODELS:
+        raise ValueError(f"Unknown AI model: {model}")
+    _, _, input_price, output_price = MODELS[model]
+    return runs_per_year * (input_tokens * input_price + output_tokens * output_price) / TOKENS_PER_PRICE_UNIT
+
+
+def annual_ai_costs(models, runs_per_year, input_tokens, output_tokens):
+    """
+    Annual inference cost per process, vectorized ai_cost().
+
+    Args:
+        models: Int array of indexes into MODEL_IDS, -1 where there is no AI step
+        runs_per_year, input_tokens, output_tokens: Array-likes, one per process
+
+    Returns:
+        Float array
+    """
+    import numpy as np
+
+    models = np.asarray(models)
+    if not (models >= 0).any():
+        return np.zeros(len(models))
+
+    input_prices, output_prices = price_vectors()
+    index = np.maximum(models, 0)
+    cost = runs_per_year * (input_tokens * input_prices[index] + output_tokens * output_prices[index])
+    return np.where(models >= 0, cost / TOKENS_PER_PRICE_UNIT, 0.0)
+
+
+def annual_costs_all(runs_per_year, input_tokens, output_tokens):
+    """
+    Annual inference cost of every process on every model in one call.
+
+    Args:
+        runs_per_year, input_tokens, output_tokens: Array-likes, one per process
+
+    Returns:
+        Float array (processes, MODEL_IDS)
+    """
+    import numpy as np
+
+    runs = np.atleast_1d(np.asarray(runs_per_year, dtype=float))[:, None]
+    tokens_in = np.atleast_1d(np.asarray(input_tokens, dtype=float))[:, None]
+    tokens_out = np.atleast_1d(np.asarray(output_tokens, dtype=float))[:, None]
+    input_prices, output_prices = price_vectors()
+    return runs * (tokens_in * input_prices + tokens_out * output_prices) / TOKENS_PER_PRICE_UNIT
+
+
+def pricing_table() -> dict:
+    """Providers and model prices in JSON-friendly form."""
+    return {
+        "last_updated": PRICING_LAST_UPDATED,
+        "unit": "USD per 1M tokens",
+        "providers": {
+            provider: {
+                "name": data["name"],
+                "models": [
+                    {"id": model_id, "name": name, "input": input_price, "output": output_price}
+                    for model_id, name, input_price, output_price in data["models"]
+                ],
+            }
+            for provider, data in PROVIDERS.items()
+        },
+    }
@@ -0,0 +1,36 @@
+"""
+api_key_models.py - SQLAlchemy Models for API Keys
+
+Long-lived API keys for service-to-service clients. Only the SHA-256 hash of
+each key is stored; the plaintext is shown once when the key is created.
+"""
+
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, Boolean
+from database import Base
+
+
+class APIKey(Base):
+    """SQLAlchemy model for hashed API keys."""
+    
+    __tablename__ = "api_keys"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    name = Column(String, nullable=False)
+    key_hash = Column(String, nullable=False, unique=True, index=True)
+    prefix = Column(String, nullable=False)  # First characters, for display only
+    quota_per_minute = Column(Integer, nullable=True)  # None = no per-key quota
+    revoked = Column(Boolean, nullable=False, default=False)
+    created = Column(DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON response (never includes the hash)."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "prefix": self.prefix,
+            "quota_per_minute": self.quota_per_minute,
+            "revoked": self.revoked,
+            "created": self.created.isoformat() if self.created else None,
+        }
@@ -1,21 +1,87 @@
 """
-auth.py - JWT Authentication
+auth.py - JWT and API Key Authentication
 
 Handles token generation and validation for API access.
+
+Verified JWTs are cached by token hash until they expire, and API keys are
+checked against an in-memory index of key hashes loaded from the database,
+so repeat callers cost a dict lookup instead of HMAC + JSON parsing.
 """
 
+import hashlib
+import secrets
+import threading
+import time
 from datetime import datetime, timedelta
+from typing import Optional
 from jose import jwt, JWTError
 from fastapi import HTTPException, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
+
+from metrics import record_cache
+from rate_limiting import hit_quota
 
 # Secret key for signing tokens (in production, use environment variable)
 SECRET_KEY = "your-secret-key-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-# Security scheme
-security = HTTPBearer()
+# Verified token cache size (entries also drop out when their JWT expires)
+TOKEN_CACHE_MAX_ENTRIES = 10000
+
+# How often each worker reloads API keys from the database (seconds)
+API_KEY_INDEX_TTL = 60
+API_KEY_PREFIX = "aroi_"
+
+# Security schemes (either credential is accepted)
+security = HTTPBearer(auto_error=False)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+# =============================================================================
+# JWT ACCESS TOKENS
+# =============================================================================
+
+class VerifiedTokenCache:
+    """
+    Maps token hash -> expiry timestamp for JWTs that already passed
+    signature verification. Entries are never served past their `exp`.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, token_hash: str) -> bool:
+        expires_at = self._entries.get(token_hash)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            self._entries.pop(token_hash, None)
+            return False
+        return True
+
+    def add(self, token_hash: str, expires_at: float) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.time()
+                self._entries = {h: exp for h, exp in self._entries.items() if exp > now}
+                # Still full: drop the oldest insertions
+                while len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[token_hash] = expires_at
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = VerifiedTokenCache()
 
 
 def create_access_token() -> str:
@@ -35,16 +101,125 @@ def create_access_token() -> str:
     return token
 
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> bool:
+def verify_jwt(token: str) -> bool:
     """
-    Verify a JWT token from the Authorization header.
-    
+    Verify a JWT, using the cache for tokens seen before.
+
     Raises:
         HTTPException if token is invalid
     """
+    token_hash = _hash(token)
+    cached = token_cache.get(token_hash)
+    record_cache("jwt", cached)
+    if cached:
+        return True
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return True
     except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        token_cache.add(token_hash, float(expires_at))
+    return True
+
+
+# =============================================================================
+# API KEYS
+# =============================================================================
+
+class APIKeyIndex:
+    """
+    In-memory index of active API keys: key hash -> (key id, quota per minute).
+    Reloaded from the database every API_KEY_INDEX_TTL seconds, and
+    immediately after keys are created or revoked in this worker.
+
+    When the index expires, the first request to notice reloads it while
+    concurrent requests keep answering from the previous index; only the
+    very first load is waited for.
+    """
+
+    def __init__(self, ttl: float = API_KEY_INDEX_TTL):
+        self.ttl = ttl
+        self._keys = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def lookup(self, key_hash: str) -> Optional[tuple]:
+        if time.monotonic() - self._loaded_at > self.ttl:
+            if not self._loaded_at:
+                self.reload()
+            elif self._lock.acquire(blocking=False):
+                try:
+                    self._load()
+                finally:
+                    self._lock.release()
+        return self._keys.get(key_hash)
+
+    def reload(self) -> None:
+        with self._lock:
+            self._load()
+
+    def _load(self) -> None:
+        """Replace the index with the active keys; callers hold the lock."""
+        from database import get_db
+        from api_key_models import APIKey
+
+        with get_db() as db:
+            rows = db.query(APIKey.key_hash, APIKey.id, APIKey.quota_per_minute).filter(
+                APIKey.revoked.is_(False)
+            ).all()
+        self._keys = {row.key_hash: (row.id, row.quota_per_minute) for row in rows}
+        self._loaded_at = time.monotonic()
+
+
+api_key_index = APIKeyIndex()
+
+
+def generate_api_key() -> tuple[str, str]:
+    """
+    Create a new random API key.
+
+    Returns:
+        Tuple of (plaintext key, SHA-256 hash to store)
+    """
+    key = API_KEY_PREFIX + secrets.token_urlsafe(32)
+    return key, _hash(key)
+
+
+def verify_api_key(key: str) -> bool:
+    """
+    Verify an API key and consume one unit of its per-minute quota.
+
+    Raises:
+        HTTPException if the key is unknown/revoked (401) or over quota (429)
+    """
+    entry = api_key_index.lookup(_hash(key))
+    if entry is None:
+        raise HTTPException(status_code=401, detail="Invalid API key")
+
+    key_id, quota_per_minute = entry
+    if quota_per_minute and not hit_quota(f"{quota_per_minute}/minute", "api_key", key_id):
+        raise HTTPException(status_code=429, detail="API key quota exceeded")
+    return True
+
+
+# =============================================================================
+# FASTAPI DEPENDENCY
+# =============================================================================
+
+def verify_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    api_key: Optional[str] = Depends(api_key_header),
+) -> bool:
+    """
+    Verify a Bearer JWT from the Authorization header or an X-API-Key header.
+
+    Raises:
+        HTTPException if neither credential is present and valid
+    """
+    if api_key:
+        return verify_api_key(api_key)
+    if credentials:
+        return verify_jwt(credentials.credentials)
+    raise HTTPException(status_code=401, detail="Not authenticated")
@@ -0,0 +1,258 @@
+"""
+batch.py - Column-wise ROI Engine
+
+Computes the numeric ROIOutput fields, priority score, confidence level and
+recommended automation type for many processes at once. Inputs are columns
+(one NumPy array per ROIInput field) rather than model instances, so bulk
+paths such as spreadsheet ingestion avoid per-row Python work.
+
+The formulas mirror calculator.calculate_roi(); narrative fields
+(recommendation text, assumptions, executive summary) are not produced.
+Results are unrounded; round when presenting them.
+"""
+
+import ai_pricing
+import tool_pricing
+from models import AIModel, AutomationPlatform, Frequency, ROIInput
+
+# Frequency column values are stored as these integer codes
+FREQUENCY_CODES = {frequency.value: code for code, frequency in enumerate(Frequency)}
+
+# automation_platform codes (-1 for none) and the tool_pricing.CHOICES index of each
+PLATFORM_CODES = {platform.value: code for code, platform in enumerate(AutomationPlatform)}
+_PLATFORM_CHOICES = tuple(tool_pricing.CHOICES.index(platform) for platform in PLATFORM_CODES)
+
+# ai_model codes (-1 for none) and the ai_pricing.MODEL_IDS index of each
+AI_MODEL_CODES = {model.value: code for code, model in enumerate(AIModel)}
+_AI_MODEL_INDEXES = tuple(ai_pricing.MODEL_IDS.index(model) for model in AI_MODEL_CODES)
+
+# Categorical outputs are returned as indexes into these tuples
+PRIORITY_LEVELS = ("High", "Medium", "Low")
+CONFIDENCE_LEVELS = ("High", "Medium", "Low")
+AUTOMATION_STYLES = ("iPaaS", "RPA", "Custom")
+
+# recommended_automation_type labels: a single style (code = style index) or
+# a hybrid "primary + secondary" (code = 3 + primary * 3 + secondary)
+AUTOMATION_TYPES = AUTOMATION_STYLES + tuple(
+    f"{primary} + {secondary}" for primary in AUTOMATION_STYLES for secondary in AUTOMATION_STYLES
+)
+
+# Numeric output columns, in ROIOutput order
+NUMERIC_OUTPUTS = (
+    "annual_labor_cost",
+    "annual_error_cost",
+    "annual_sla_cost",
+    "annual_tool_cost",
+    "total_current_cost",
+    "automation_savings_percent",
+    "annual_savings",
+    "implementation_cost",
+    "annual_automation_cost",
+    "net_annual_savings",
+    "total_cost_of_ownership",
+    "payback_months",
+    "roi_percentage",
+    "five_year_savings",
+)
+
+
+def field_defaults() -> dict:
+    """ROIInput defaults for optional fields."""
+    return {
+        name: info.default
+        for name, info in ROIInput.model_fields.items()
+        if not info.is_required()
+    }
+
+
+def _periods_per_year(frequency, working_days, hours_per_day):
+    """Vectorized calculate_periods_per_year() over frequency codes."""
+    import numpy as np
+
+    yearly_hours = working_days * hours_per_day
+    by_code = {
+        FREQUENCY_CODES[Frequency.EVERY_MINUTE.value]: yearly_hours * 60,
+        FREQUENCY_CODES[Frequency.HOURLY.value]: yearly_hours,
+        FREQUENCY_CODES[Frequency.DAILY.value]: working_days,
+        FREQUENCY_CODES[Frequency.WEEKLY.value]: 52,
+        FREQUENCY_CODES[Frequency.BIWEEKLY.value]: 26,
+        FREQUENCY_CODES[Frequency.MONTHLY.value]: 12,
+        FREQUENCY_CODES[Frequency.QUARTERLY.value]: 4,
+    }
+    periods = np.asarray(working_days, dtype=float).copy()
+    for code, value in by_code.items():
+        periods = np.where(frequency == code, value, periods)
+    return periods
+
+
+def _automation_style(frequency, runs_per_year, error_rate, hours_per_run):
+    """
+    Vectorized _recommend_automation_type() scoring.
+
+    Returns:
+        Tuple of (primary, secondary, hybrid) where primary/secondary index
+        AUTOMATION_STYLES and hybrid marks scores within 10 points
+    """
+    import numpy as np
+
+    n = len(frequency)
+    scores = np.zeros((n, 3))
+    ipaas, rpa, custom = 0, 1, 2
+
+    monthly_volume = runs_per_year / 12
+    low, mid = monthly_volume < 500, (monthly_volume >= 500) & (monthly_volume < 2000)
+    high = ~(low | mid)
+    scores[:, ipaas] += 40 * low + 25 * mid
+    scores[:, rpa] += 25 * mid + 35 * high
+    scores[:, custom] += 25 * high
+
+    simple, moderate = error_rate < 5, (error_rate >= 5) & (error_rate < 15)
+    complex_ = ~(simple | moderate)
+    scores[:, ipaas] += 30 * simple + 15 * moderate
+    scores[:, rpa] += 25 * moderate + 20 * complex_
+    scores[:, custom] += 35 * complex_
+
+    quick, medium = hours_per_run < 0.5, (hours_per_run >= 0.5) & (hours_per_run < 2)
+    long_ = ~(quick | medium)
+    scores[:, ipaas] += 20 * quick
+    scores[:, rpa] += 20 * medium + 15 * long_
+    scores[:, custom] += 25 * long_
+
+    high_freq = np.isin(frequency, [FREQUENCY_CODES[f.value] for f in
+                                    (Frequency.EVERY_MINUTE, Frequency.HOURLY, Frequency.DAILY)])
+    scores[:, rpa] += 15 * high_freq
+    scores[:, custom] += 10 * high_freq
+    scores[:, ipaas] += 15 * ~high_freq
+
+    # Stable sort keeps iPaaS, RPA, Custom order on ties, like sorted() does
+    ranked = np.argsort(-scores, axis=1, kind="stable")
+    primary, secondary = ranked[:, 0], ranked[:, 1]
+    rows = np.arange(n)
+    hybrid = scores[rows, primary] - scores[rows, secondary] <= 10
+    return primary, secondary, hybrid
+
+
+def automation_type_codes(primary, secondary, hybrid):
+    """Indexes into AUTOMATION_TYPES for each row."""
+    import numpy as np
+
+    n = len(AUTOMATION_STYLES)
+    return np.where(hybrid, n + primary * n + secondary, primary).astype(np.int8)
+
+
+def automation_type_labels(primary, secondary, hybrid) -> list:
+    """recommended_automation_type strings, e.g. "RPA" or "iPaaS + RPA"."""
+    return [AUTOMATION_TYPES[code] for code in automation_type_codes(primary, secondary, hybrid).tolist()]
+
+
+def calculate_batch(columns: dict) -> dict:
+    """
+    Calculate ROI metrics for every row of validated input columns.
+
+    Args:
+        columns: ROIInput field name -> 1-D array of equal length. frequency
+                 holds FREQUENCY_CODES, automation_platform PLATFORM_CODES
+                 and ai_model AI_MODEL_CODES (-1 for none); missing
+                 optional fields take the ROIInput defaults.
+
+    Returns:
+        Dict of NUMERIC_OUTPUTS arrays plus priority, confidence (indexes
+        into PRIORITY_LEVELS / CONFIDENCE_LEVELS) and the automation style
+        arrays (automation_primary, automation_secondary, automation_hybrid)
+    """
+    import numpy as np
+    import cashflow
+    from calculator import CalculatorConfig
+
+    config = CalculatorConfig()
+    n = len(columns["frequency"])
+    defaults = field_defaults()
+
+    def col(name):
+        if name in columns:
+            return np.asarray(columns[name])
+        return np.full(n, defaults[name])
+
+    frequency = col("frequency")
+    working_days, hours_per_day = col("working_days_per_year").astype(float), col("hours_per_day").astype(float)
+    hours_per_run, hourly_rate = col("hours_per_run").astype(float), col("hourly_rate").astype(float)
+    error_rate = col("error_rate").astype(float)
+    has_sla = col("has_sla").astype(bool)
+    implementation_cost = col("implementation_cost").astype(float)
+    volume_growth = col("volume_growth").astype(float)
+
+    runs_per_year = col("runs_per_period") * _periods_per_year(frequency, working_days, hours_per_day)
+
+    # Current costs
+    labor = hours_per_run * runs_per_year * col("staff_count") * hourly_rate
+    cost_per_error = col("error_fix_cost") + col("error_fix_hours") * hourly_rate
+    errors = np.where(error_rate == 0, 0.0, runs_per_year * (error_rate / 100) * cost_per_error)
+    sla = np.where(has_sla, col("sla_breaches_year") * col("sla_penalty"), 0.0).astype(float)
+    tool = col("current_tool_cost").astype(float)
+    total_current = labor + errors + sla + tool
+
+    # Savings and cost of ownership
+    savings = (
+        labor * (col("expected_labor_reduction") / 100)
+        + errors * (col("expected_error_reduction") / 100)
+        + sla * (col("expected_sla_improvement") / 100)
+        + tool * config.DEFAULT_TOOL_SAVINGS_RATE
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        savings_percent = np.where(total_current > 0, savings / total_current * 100, 0.0)
+        license_cost = col("software_license_cost").astype(float)
+        if "automation_platform" in columns:
+            platform = np.asarray(columns["automation_platform"])
+            choices = np.where(platform >= 0, np.asarray(_PLATFORM_CHOICES)[np.maximum(platform, 0)], -1)
+            license_cost = tool_pricing.annual_license_costs(choices, runs_per_year / 12, license_cost)
+        automation_cost = license_cost + col("annual_maintenance_cost")
+        if "ai_model" in columns:
+            model = np.asarray(columns["ai_model"])
+            indexes = np.where(model >= 0, np.asarray(_AI_MODEL_INDEXES)[np.maximum(model, 0)], -1)
+            automation_cost = automation_cost + ai_pricing.annual_ai_costs(
+                indexes, runs_per_year, col("ai_input_tokens_per_run").astype(float),
+                col("ai_output_tokens_per_run").astype(float)
+            )
+        net = savings - automation_cost
+        payback = np.where(net <= 0, 999.0, implementation_cost / net * 12)
+        roi = np.where(implementation_cost <= 0, 0.0, (net - implementation_cost) / implementation_cost * 100)
+    five_year = cashflow.project_batch(savings, automation_cost, implementation_cost, volume_growth,
+                                       horizon_years=5).cumulative[:, -1]
+
+    # Priority (_generate_recommendation) and confidence (_assess_confidence)
+    priority = np.where(
+        (payback <= config.HIGH_PRIORITY_THRESHOLD) & (roi > config.HIGH_PRIORITY_ROI), 0,
+        np.where((payback <= config.MEDIUM_PRIORITY_THRESHOLD) & (roi > 0), 1, 2),
+    )
+    data_points = (
+        (error_rate > 0).astype(int)
+        + (col("error_fix_cost") > 0)
+        + (has_sla & (col("sla_penalty") > 0))
+        + (tool > 0)
+        + (volume_growth > 0)
+    )
+    confidence = np.where(data_points >= 4, 0, np.where(data_points >= 2, 1, 2))
+
+    primary, secondary, hybrid = _automation_style(frequency, runs_per_year, error_rate, hours_per_run)
+
+    return {
+        "annual_labor_cost": labor,
+        "annual_error_cost": errors,
+        "annual_sla_cost": sla,
+        "annual_tool_cost": tool,
+        "total_current_cost": total_current,
+        "automation_savings_percent": savings_percent,
+        "annual_savings": savings,
+        "implementation_cost": implementation_cost,
+        "annual_automation_cost": automation_cost,
+        "net_annual_savings": net,
+        "total_cost_of_ownership": implementation_cost + automation_cost * 5,
+        "payback_months": payback,
+        "roi_percentage": roi,
+        "five_year_savings": five_year,
+        "priority": priority,
+        "confidence": confidence,
+        "automation_primary": primary,
+        "automation_secondary": secondary,
+        "automation_hybrid": hybrid,
+    }
@@ -0,0 +1,41 @@
+"""
+bench_api.py - End-to-end API latency through an in-process ASGI client
+
+Requests go through routing, middleware, validation and serialization
+without a network hop. Rate limiting is disabled for the run.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import SAMPLE_INPUT
+
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+
+    main.limiter.enabled = False
+    with TestClient(main.app) as c:
+        yield c
+    main.limiter.enabled = True
+
+
+def bench_api_health(benchmark, client):
+    benchmark(client.get, "/health")
+
+
+def bench_api_calculate(benchmark, client):
+    response = benchmark(client.post, "/calculate", json=SAMPLE_INPUT)
+    assert response.status_code == 200
+
+
+def bench_api_generate_pdf(benchmark, client):
+    response = benchmark(client.post, "/generate-pdf", json=SAMPLE_INPUT)
+    assert response.status_code == 200
+
+
+def bench_api_generate_pdf_with_logo(benchmark, client, logo_base64):
+    payload = {**SAMPLE_INPUT, "company_name": "Acme Corp", "logo_base64": logo_base64}
+    response = benchmark(client.post, "/generate-pdf", json=payload)
+    assert response.status_code == 200
@@ -0,0 +1,175 @@
+"""
+bench_calculator.py - Calculation engine benchmarks
+"""
+
+from calculator import (
+    calculate_roi,
+    calculate_periods_per_year,
+    _generate_executive_summary,
+    _recommend_automation_type,
+)
+from models import ROIInput
+from conftest import SAMPLE_INPUT
+
+
+def bench_validate_input(benchmark):
+    benchmark(ROIInput, **SAMPLE_INPUT)
+
+
+def _raw_rows(n: int) -> list:
+    """n ROIInput payloads as spreadsheet-style strings, as ingestion sees them (unset optionals left out)."""
+    from conftest import make_inputs
+
+    return [
+        {k: str(v.value if hasattr(v, "value") else v) for k, v in i.model_dump().items() if v is not None}
+        for i in make_inputs(n)
+    ]
+
+
+def bench_validate_models_10k(benchmark):
+    rows = _raw_rows(10_000)
+    benchmark(lambda: [ROIInput.model_validate(row) for row in rows])
+
+
+def bench_validate_columns_10k(benchmark):
+    from column_validation import compile_validator
+
+    rows = _raw_rows(10_000)
+    columns = {name: [row[name] for row in rows] for name in rows[0]}
+    benchmark(compile_validator(ROIInput).validate, columns)
+
+
+def bench_calculate_scalar(benchmark, sample_input):
+    benchmark(calculate_roi, sample_input)
+
+
+def bench_calculate_batch_1k(benchmark, batch_inputs):
+    benchmark(lambda: [calculate_roi(i) for i in batch_inputs])
+
+
+def bench_narrative(benchmark, sample_input):
+    result = calculate_roi(sample_input)
+    runs_per_year = sample_input.runs_per_period * calculate_periods_per_year(
+        sample_input.frequency, sample_input.working_days_per_year, sample_input.hours_per_day
+    )
+
+    def narrative():
+        automation_type, reasoning = _recommend_automation_type(sample_input, runs_per_year)
+        return _generate_executive_summary(
+            inputs=sample_input,
+            net_annual_savings=result.net_annual_savings,
+            payback_months=result.payback_months,
+            priority_score=result.priority_score,
+            total_current_cost=result.total_current_cost,
+            annual_labor_cost=result.annual_labor_cost,
+            runs_per_year=runs_per_year,
+            automation_type=automation_type,
+            automation_reasoning=reasoning,
+        )
+
+    benchmark(narrative)
+
+
+def bench_calculate_delta(benchmark, sample_input):
+    import incremental
+
+    token = incremental.calculate(sample_input)["token"]
+    benchmark(incremental.calculate_delta, token, {"hourly_rate": sample_input.hourly_rate + 5})
+
+
+def bench_cash_flow_batch_10k_monthly(benchmark):
+    import numpy as np
+    import cashflow
+
+    rng = np.random.default_rng(0)
+    n = 10_000
+    savings, costs = rng.uniform(0, 1e5, n), rng.uniform(0, 1e4, n)
+    implementation, growth = rng.uniform(1e3, 2e5, n), rng.uniform(0, 30, n)
+
+    def run():
+        projection = cashflow.project_batch(savings, costs, implementation, growth, horizon_years=5, period="month")
+        return cashflow.npv(projection, 8), cashflow.irr(projection)
+
+    benchmark(run)
+
+
+def _portfolio_candidates(n: int, seed: int = 0) -> list:
+    import random
+    import portfolio
+
+    rng = random.Random(seed)
+    return [
+        portfolio.Candidate(str(i), f"p{i}", rng.uniform(1e3, 5e4), rng.uniform(-1e4, 5e5), rng.randint(1, 20))
+        for i in range(n)
+    ]
+
+
+def bench_portfolio_exact_500(benchmark):
+    import portfolio
+
+    candidates = _portfolio_candidates(500)
+    benchmark(portfolio.optimize, candidates, 250_000, None, "exact")
+
+
+def bench_portfolio_greedy_10k_staff_cap(benchmark):
+    import portfolio
+
+    candidates = _portfolio_candidates(10_000)
+    benchmark(portfolio.optimize, candidates, 2_500_000, 2_000, "greedy")
+
+
+def bench_phasing_1k_projects_20_quarters(benchmark):
+    import numpy as np
+    import phasing
+
+    rng = np.random.default_rng(0)
+    n, horizon = 1_000, 20
+    net = rng.uniform(-2e3, 6e4, (n, 1)) * rng.uniform(1.0, 1.1, (1, horizon))
+    plan = phasing.PhasingPlan(
+        ids=[str(i) for i in range(n)],
+        names=[f"p{i}" for i in range(n)],
+        costs=rng.uniform(5e4, 5e5, n),
+        quarterly_net=net[:, 0],
+        profiles=np.cumsum(net, axis=1),
+        durations=rng.integers(1, 4, n),
+        capacity=50,
+        horizon_quarters=horizon,
+    )
+    benchmark(phasing.simulate, plan)
+
+
+def bench_tool_pricing_quote_all_100k(benchmark):
+    import numpy as np
+    import tool_pricing
+
+    volumes = np.random.default_rng(0).lognormal(8, 2, 100_000)
+    benchmark(tool_pricing.quote_all, volumes)
+
+
+def bench_ai_pricing_all_models_100k(benchmark):
+    import numpy as np
+    import ai_pricing
+
+    rng = np.random.default_rng(0)
+    runs = rng.lognormal(9, 2, 100_000)
+    benchmark(ai_pricing.annual_costs_all, runs, rng.uniform(0, 5000, 100_000), rng.uniform(0, 1000, 100_000))
+
+
+def bench_scenarios_50(benchmark):
+    import scenario_analysis
+
+    scenarios = [
+        (f"case-{i}", {"expected_labor_reduction": 40 + i}, {"implementation_cost": 0.5 + i / 50})
+        for i in range(50)
+    ]
+    benchmark(scenario_analysis.evaluate, ROIInput(**SAMPLE_INPUT), scenarios)
+
+
+def bench_compare_50(benchmark):
+    import comparison
+
+    entries = [
+        (f"input-{i}", f"Process {i}", ROIInput(**{**SAMPLE_INPUT, "runs_per_period": 10 + i, "implementation_cost": 1000 * i}))
+        for i in range(50)
+    ]
+    benchmark(comparison.compare, entries)
@@ -0,0 +1,42 @@
+"""
+bench_ingest.py - Inventory ingestion benchmarks (parse, validate, score, write)
+"""
+
+import csv
+import io
+
+import pytest
+
+import ingest
+from conftest import make_inputs
+
+INVENTORY_ROWS = 10_000
+
+
+@pytest.fixture(scope="module")
+def inventory_csv() -> str:
+    fields = list(make_inputs(1)[0].model_dump(mode="json"))
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    templates = [i.model_dump(mode="json") for i in make_inputs(100)]
+    for n in range(INVENTORY_ROWS):
+        writer.writerow(templates[n % len(templates)])
+    return buffer.getvalue()
+
+
+def bench_ingest_enriched_csv_10k(benchmark, inventory_csv):
+    def run():
+        header, chunks = ingest.iter_chunks(io.StringIO(inventory_csv))
+        return sum(len(block) for block in ingest.enriched_csv(header, chunks))
+
+    benchmark(run)
+
+    # Every output column must be unique, also when enriched output is re-uploaded
+    header, chunks = ingest.iter_chunks(io.StringIO(inventory_csv))
+    output = "".join(ingest.enriched_csv(header, chunks))
+    for _ in range(2):
+        columns = next(csv.reader(io.StringIO(output)))
+        assert len(columns) == len(set(columns))
+        header, chunks = ingest.iter_chunks(io.StringIO(output))
+        output = "".join(ingest.enriched_csv(header, chunks))
@@ -0,0 +1,44 @@
+"""
+bench_pdf.py - PDF report and chart benchmarks
+"""
+
+from calculator import calculate_roi
+from pdf_generator import generate_pdf_report, create_savings_chart
+
+
+def bench_chart(benchmark, sample_input):
+    result = calculate_roi(sample_input)
+    benchmark(create_savings_chart, result, sample_input)
+
+
+def bench_pdf_without_logo(benchmark, sample_input):
+    result = calculate_roi(sample_input)
+    benchmark(generate_pdf_report, result, input_data=sample_input)
+
+
+def bench_pdf_with_logo(benchmark, sample_input, logo_base64):
+    result = calculate_roi(sample_input)
+    benchmark(
+        generate_pdf_report,
+        result,
+        input_data=sample_input,
+        company_name="Acme Corp",
+        brand_color="#0f766e",
+        logo_base64=logo_base64,
+    )
+
+
+def bench_pdf_identical_burst_12(benchmark, sample_input):
+    """12 identical concurrent renders through the single-flight layer."""
+    from concurrent.futures import ThreadPoolExecutor
+    from singleflight import SingleFlight, request_key
+
+    flight = SingleFlight("bench-pdf")
+    key = request_key(sample_input)
+    result = calculate_roi(sample_input)
+
+    def render():
+        return generate_pdf_report(result, input_data=sample_input)
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        benchmark(lambda: list(pool.map(lambda _: flight.do(key, render), range(12))))
@@ -0,0 +1,91 @@
+"""
+bench_projects.py - Project list and change feed benchmarks at 1k / 10k / 100k rows
+
+Set BENCH_PROJECT_ROWS (e.g. "1000,10000") to skip the larger sizes.
+"""
+
+import os
+
+import pytest
+
+from calculator import calculate_roi
+from database import SessionLocal, init_db
+from project_models import Project
+from conftest import make_inputs
+
+ROW_COUNTS = [int(n) for n in os.getenv("BENCH_PROJECT_ROWS", "1000,10000,100000").split(",")]
+
+
+def _seed(rows: int) -> None:
+    """Fill the projects table with exactly `rows` realistic projects."""
+    init_db()
+    db = SessionLocal()
+    try:
+        existing = db.query(Project).count()
+        if existing > rows:
+            db.query(Project).delete()
+            db.commit()
+            existing = 0
+        templates = [(i.model_dump(mode="json"), calculate_roi(i).model_dump()) for i in make_inputs(50)]
+        batch = []
+        for n in range(existing, rows):
+            inputs, results = templates[n % len(templates)]
+            batch.append({
+                "id": f"bench-{n}",
+                "name": f"Project {n}",
+                "inputs": inputs,
+                "results": results,
+                "scenarios": {"base": {"inputs": inputs, "results": results}},
+            })
+            if len(batch) == 5000:
+                db.bulk_insert_mappings(Project, batch)
+                batch = []
+        if batch:
+            db.bulk_insert_mappings(Project, batch)
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def bench_list_projects(benchmark, rows):
+    import main
+
+    _seed(rows)
+
+    def list_all():
+        db = SessionLocal()
+        try:
+            return main.list_projects(request=None, db=db)
+        finally:
+            db.close()
+
+    result = benchmark.pedantic(list_all, rounds=3 if rows >= 100000 else 10, iterations=1)
+    assert len(result) == rows
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def bench_project_changes_since(benchmark, rows):
+    """Delta sync of 50 edited projects, against the full list above."""
+    import project_sync
+
+    _seed(rows)
+    db = SessionLocal()
+    try:
+        # An earlier change, so the cursor before the edits is not 0 (full sync)
+        project_sync.record_changes(db, ["bench-50"])
+        versions = project_sync.record_changes(db, [f"bench-{n}" for n in range(50)])
+        db.commit()
+        since = min(versions.values()) - 1
+    finally:
+        db.close()
+
+    def changes():
+        db = SessionLocal()
+        try:
+            return project_sync.changes_since(db, since)
+        finally:
+            db.close()
+
+    result = benchmark.pedantic(changes, rounds=10, iterations=1)
+    assert len(result["changes"]) == 50
@@ -0,0 +1,91 @@
+"""
+compare.py - Flag benchmark regressions between two saved runs
+
+Usage (from backend/):
+    pytest benchmarks --benchmark-json=benchmarks/results/baseline.json
+    ... make changes ...
+    pytest benchmarks --benchmark-json=benchmarks/results/current.json
+    python benchmarks/compare.py benchmarks/results/baseline.json benchmarks/results/current.json
+
+Options:
+    --threshold 10     Percent slowdown that counts as a regression (default 10)
+    --stat median      Statistic to compare: min, mean or median (default median)
+
+Exit code is 1 when any benchmark regressed beyond the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    """Map benchmark fullname -> stats dict from a pytest-benchmark JSON file."""
+    with open(path) as f:
+        data = json.load(f)
+    return {b["fullname"]: b["stats"] for b in data.get("benchmarks", [])}
+
+
+def compare(baseline: dict, current: dict, threshold: float, stat: str) -> list:
+    """
+    Compare shared benchmarks.
+
+    Returns:
+        List of dicts with name, baseline, current, change_pct and regressed
+    """
+    rows = []
+    for name in sorted(set(baseline) & set(current)):
+        before = baseline[name][stat]
+        after = current[name][stat]
+        change_pct = (after - before) / before * 100 if before else 0.0
+        rows.append({
+            "name": name,
+            "baseline": before,
+            "current": after,
+            "change_pct": change_pct,
+            "regressed": change_pct > threshold,
+        })
+    return rows
+
+
+def _format_seconds(value: float) -> str:
+    if value < 1e-3:
+        return f"{value * 1e6:.1f} us"
+    if value < 1:
+        return f"{value * 1e3:.2f} ms"
+    return f"{value:.2f} s"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two pytest-benchmark JSON files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    parser.add_argument("--stat", choices=["min", "mean", "median"], default="median")
+    args = parser.parse_args()
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+    rows = compare(baseline, current, args.threshold, args.stat)
+
+    width = max([len(r["name"]) for r in rows] + [9])
+    print(f"{'benchmark':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(f"{row['name']:<{width}}  {_format_seconds(row['baseline']):>12}  "
+              f"{_format_seconds(row['current']):>12}  {row['change_pct']:>+7.1f}%{flag}")
+
+    missing = sorted(set(baseline) - set(current))
+    if missing:
+        print(f"\nNot in current run: {', '.join(missing)}")
+
+    regressions = [r for r in rows if r["regressed"]]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold}% ({args.stat})")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold}% ({args.stat})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
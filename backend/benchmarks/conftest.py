@@ -0,0 +1,87 @@
+"""
+conftest.py - Shared fixtures for the benchmark suite
+
+Points the app at a throwaway SQLite database and disables rate limiting
+before any backend module is imported.
+"""
+
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+_db_dir = tempfile.mkdtemp(prefix="roi-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault("METRICS_ENABLED", "true")
+
+import pytest  # noqa: E402
+
+from models import ROIInput, Frequency  # noqa: E402
+
+SAMPLE_INPUT = {
+    "process_name": "Invoice Processing",
+    "frequency": "daily",
+    "runs_per_period": 20,
+    "hours_per_run": 0.5,
+    "staff_count": 2,
+    "hourly_rate": 45,
+    "error_rate": 5,
+    "error_fix_cost": 50,
+    "error_fix_hours": 0.5,
+    "has_sla": True,
+    "sla_penalty": 2500,
+    "sla_breaches_year": 4,
+    "current_tool_cost": 1200,
+    "implementation_cost": 25000,
+    "software_license_cost": 3000,
+    "annual_maintenance_cost": 1500,
+    "volume_growth": 10,
+}
+
+
+def make_inputs(n: int) -> list:
+    """Deterministic spread of n valid ROIInputs across frequencies and sizes."""
+    frequencies = list(Frequency)
+    inputs = []
+    for i in range(n):
+        inputs.append(ROIInput(
+            **{
+                **SAMPLE_INPUT,
+                "process_name": f"Process {i}",
+                "frequency": frequencies[i % len(frequencies)],
+                "runs_per_period": 1 + (i * 7) % 200,
+                "hours_per_run": 0.1 + (i % 40) * 0.25,
+                "staff_count": 1 + i % 10,
+                "hourly_rate": 20 + (i * 3) % 180,
+                "error_rate": (i * 11) % 50,
+                "implementation_cost": 1000 + (i * 997) % 200000,
+                "volume_growth": i % 30,
+            }
+        ))
+    return inputs
+
+
+@pytest.fixture(scope="session")
+def sample_input() -> ROIInput:
+    return ROIInput(**SAMPLE_INPUT)
+
+
+@pytest.fixture(scope="session")
+def batch_inputs() -> list:
+    return make_inputs(1000)
+
+
+@pytest.fixture(scope="session")
+def logo_base64() -> str:
+    """A 400x120 PNG logo, base64-encoded like the frontend sends it."""
+    import base64
+    from io import BytesIO
+    from PIL import Image
+
+    image = Image.new("RGB", (400, 120), (37, 99, 235))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
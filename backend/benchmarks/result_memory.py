@@ -0,0 +1,90 @@
+"""
+result_memory.py - Result Container Memory Benchmark
+
+Calculates the same inputs twice, as a list of ROIOutput objects (one
+calculate_roi() call per row) and as a ResultSet, and reports the memory
+each retains (tracemalloc) plus build time. A sample of ResultSet rows is
+converted back with to_output() and compared with calculate_roi().
+
+Usage (from backend/):
+    python benchmarks/result_memory.py
+    python benchmarks/result_memory.py --rows 100000 --min-ratio 8
+
+Exit code is 1 if the ResultSet is not at least --min-ratio times smaller
+or if a sampled row differs, so it can run in CI.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from conftest import make_inputs  # noqa: E402  (also puts backend/ on sys.path)
+
+from calculator import calculate_roi  # noqa: E402
+from result_set import ResultSet  # noqa: E402
+
+# Rows converted back and compared with calculate_roi()
+SAMPLE_ROWS = 500
+
+
+def measure(build) -> tuple:
+    """
+    Run build() and return (result, retained bytes, peak bytes, seconds).
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, peak, seconds
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--min-ratio", type=float, default=5.0,
+                        help="Fail unless ROIOutput objects take this many times the ResultSet memory")
+    args = parser.parse_args()
+
+    inputs = make_inputs(args.rows)
+    # Warm up so module imports and caches are not counted
+    calculate_roi(inputs[0])
+    ResultSet.from_inputs(inputs[:10])[0].to_output()
+
+    outputs, output_bytes, output_peak, output_seconds = measure(lambda: [calculate_roi(i) for i in inputs])
+    del outputs
+    results, compact_bytes, compact_peak, compact_seconds = measure(lambda: ResultSet.from_inputs(inputs))
+
+    mb = 1024 * 1024
+    print(f"{args.rows} rows")
+    print(f"  list[ROIOutput]  {output_bytes / mb:8.1f} MB  ({output_bytes / args.rows:6.0f} B/row, "
+          f"peak {output_peak / mb:.1f} MB)  built in {output_seconds:.2f}s")
+    print(f"  ResultSet        {compact_bytes / mb:8.1f} MB  ({compact_bytes / args.rows:6.0f} B/row, "
+          f"peak {compact_peak / mb:.1f} MB)  built in {compact_seconds:.2f}s")
+    ratio = output_bytes / compact_bytes
+    print(f"  {ratio:.1f}x smaller")
+
+    step = max(1, args.rows // SAMPLE_ROWS)
+    mismatched = [i for i in range(0, args.rows, step) if results[i].to_output() != calculate_roi(inputs[i])]
+
+    failed = False
+    if mismatched:
+        print(f"FAIL: {len(mismatched)} sampled rows differ from calculate_roi(), first at row {mismatched[0]}")
+        failed = True
+    if ratio < args.min_ratio:
+        print(f"FAIL: ResultSet is only {ratio:.1f}x smaller (need {args.min_ratio}x)")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
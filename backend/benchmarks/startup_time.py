@@ -0,0 +1,130 @@
+"""
+startup_time.py - Cold Start Import Benchmark
+
+Measures how long `import main` takes in a fresh interpreter using
+`python -X importtime`, and fails if the import budget is exceeded or if a
+lazily-loaded dependency leaks back into the import path.
+
+Usage (from backend/):
+    python benchmarks/startup_time.py
+    python benchmarks/startup_time.py --runs 10 --budget-ms 900
+    python benchmarks/startup_time.py --json startup.json
+
+Exit code is 1 when a regression is detected, so it can run in CI.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay out of the cold start path (loaded on first use)
+DEFERRED_MODULES = [
+    "reportlab",
+    "PIL",
+    "httpx",
+    "sqlalchemy",
+    "pdf_generator",
+    "project_models",
+]
+
+# Default budget for the cumulative `import main` time, in milliseconds
+DEFAULT_BUDGET_MS = 1500
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_once(module: str = "main") -> dict:
+    """
+    Import `module` in a fresh interpreter and parse the -X importtime report.
+
+    Returns:
+        Dict with total_ms, the set of imported top-level packages and
+        the cumulative time (ms) per top-level import
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "WARMUP_ON_STARTUP": "false"},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+
+    total_us = 0
+    imported = set()
+    top_level = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_us = int(match.group(2))
+        depth = (len(match.group(3)) - 1) // 2
+        name = match.group(4)
+        imported.add(name.split(".")[0])
+        if name == module:
+            total_us = cumulative_us
+        elif depth == 1:
+            top_level[name] = cumulative_us / 1000
+
+    return {"total_ms": total_us / 1000, "imported": imported, "top_level": top_level}
+
+
+def run_benchmark(runs: int, module: str = "main") -> dict:
+    """Run the import measurement several times and summarize it."""
+    samples = [measure_once(module) for _ in range(runs)]
+    totals = [s["total_ms"] for s in samples]
+    last = samples[-1]
+    slowest = sorted(last["top_level"].items(), key=lambda x: x[1], reverse=True)[:10]
+
+    return {
+        "module": module,
+        "runs": runs,
+        "min_ms": round(min(totals), 1),
+        "median_ms": round(statistics.median(totals), 1),
+        "max_ms": round(max(totals), 1),
+        "slowest_imports": [{"module": m, "ms": round(ms, 1)} for m, ms in slowest],
+        "leaked_modules": sorted(m for m in DEFERRED_MODULES if m in last["imported"]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure backend cold start import time")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to sample")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Fail if the median import time exceeds this budget")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.runs)
+    result["budget_ms"] = args.budget_ms
+
+    print(f"import main: median {result['median_ms']} ms "
+          f"(min {result['min_ms']}, max {result['max_ms']}, {args.runs} runs)")
+    print("Slowest top-level imports:")
+    for item in result["slowest_imports"]:
+        print(f"  {item['module']:<30} {item['ms']:>8.1f} ms")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+    failed = False
+    if result["leaked_modules"]:
+        print(f"FAIL: deferred modules imported at startup: {', '.join(result['leaked_modules'])}")
+        failed = True
+    if result["median_ms"] > args.budget_ms:
+        print(f"FAIL: median import time {result['median_ms']} ms exceeds budget {args.budget_ms} ms")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
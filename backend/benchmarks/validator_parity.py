@@ -0,0 +1,172 @@
+"""
+validator_parity.py - Column Validator vs Pydantic Parity Check
+
+Validates a seeded corpus of rows (valid values, boundary values and the
+awkward inputs spreadsheets produce: numeric strings, whitespace,
+underscores, NaN/inf, booleans, None, missing keys) both with ROIInput and
+with the compiled column validator, and fails on any difference in the
+accepted values or in the reported errors (type, loc, msg, input, ctx).
+
+Usage (from backend/):
+    python benchmarks/validator_parity.py
+    python benchmarks/validator_parity.py --rows 20000 --seed 7
+
+Exit code is 1 when the two disagree, so it can run in CI.
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from pydantic import ValidationError  # noqa: E402
+
+from column_validation import MISSING, ColumnValidation, compile_validator  # noqa: E402
+from models import ROIInput  # noqa: E402
+
+# Cells tried for every field, whatever its type
+COMMON_CELLS = [None, "", " ", "abc", True, False, 0, 1, -1, 0.5, float("nan"), float("inf"), "nan", "inf",
+                "-inf", "1_0", "1__0", "٣", "0x10", "2.", "2.00", " 7 ", "+3", "1e2", 10 ** 30, [], "yes", "off",
+                -1.0, 2.0, 1e30, "\x1c5", "\xa05", "\u30005", "\u200b5", " yes"]
+
+
+def field_cells(rule) -> list:
+    """Candidate cells for one field: the common set plus values around its bounds."""
+    cells = list(COMMON_CELLS)
+    if rule.kind == "enum":
+        cells += list(rule.members) + [value.upper() for value in rule.members] + [f" {next(iter(rule.members))}"]
+    for _, _, _, _, limit in rule.bounds:
+        for delta in (-1, -0.5, -0.05, 0, 0.05, 0.5, 1):
+            value = limit + delta
+            cells += [value, repr(value), int(value) if float(value).is_integer() else value]
+    return cells
+
+
+def make_corpus(rows: int, seed: int) -> list:
+    """Rows as dicts; most cells valid so that errors are isolated, some fields omitted."""
+    rng = random.Random(seed)
+    validator = compile_validator(ROIInput)
+    valid_row = {
+        "process_name": "Parity", "frequency": "daily", "runs_per_period": 10, "hours_per_run": 1.5,
+        "staff_count": 2, "hourly_rate": 45, "implementation_cost": 10000,
+    }
+    pools = {rule.name: field_cells(rule) for rule in validator.rules}
+    corpus = []
+    for _ in range(rows):
+        row = dict(valid_row)
+        for name, pool in pools.items():
+            if rng.random() < 0.15:
+                row[name] = rng.choice(pool)
+            elif rng.random() < 0.02:
+                row.pop(name, None)
+        corpus.append(row)
+    return corpus
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    return type(a) is type(b) and a == b if isinstance(a, (bool, float)) or isinstance(b, (bool, float)) else a == b
+
+
+def make_array_columns(rows: int, seed: int) -> tuple[list, dict]:
+    """
+    Rows plus the same data as typed NumPy columns (the trusted fast path):
+    numeric fields as float64 or int64 arrays, the rest as lists.
+    """
+    import numpy as np
+
+    rng = random.Random(seed)
+    validator = compile_validator(ROIInput)
+    corpus = make_corpus(rows, seed)
+    columns = {}
+    for rule in validator.rules:
+        if rule.kind not in ("int", "float", "bool"):
+            columns[rule.name] = [row.get(rule.name, "daily" if rule.kind == "enum" else "Parity") for row in corpus]
+            continue
+        numbers = [c for c in field_cells(rule) if type(c) in (int, float) and abs(c) < 2 ** 53]
+        dtype = np.int64 if rng.random() < 0.5 and all(type(c) is int for c in numbers[:3]) else np.float64
+        pool = [c for c in numbers if dtype is np.float64 or type(c) is int]
+        columns[rule.name] = np.array([rng.choice(pool) for _ in corpus], dtype=dtype)
+    rows_as_dicts = [
+        {name: (cells[i].item() if hasattr(cells[i], "item") else cells[i]) for name, cells in columns.items()}
+        for i in range(rows)
+    ]
+    return rows_as_dicts, columns
+
+
+def _validate_in_slices(corpus: list, size: int):
+    """Validate a few rows at a time, so many columns are entirely clean and take the bulk path."""
+    import numpy as np
+
+    validator = compile_validator(ROIInput)
+    names = [rule.name for rule in validator.rules]
+    columns, errors = {name: [] for name in names}, {}
+    for start in range(0, len(corpus), size):
+        rows = corpus[start:start + size]
+        part = validator.validate({name: [row.get(name, MISSING) for row in rows] for name in names}, rows=len(rows))
+        for name in names:
+            columns[name].extend(list(part.columns[name]))
+        errors.update({start + offset: found for offset, found in part.errors.items()})
+    return ColumnValidation({name: np.array(values, dtype=object) for name, values in columns.items()}, None, errors)
+
+
+def compare(corpus: list, columns: dict = None, slice_rows: int = 0) -> list:
+    """Differences between Pydantic and the column validator, as readable strings."""
+    validator = compile_validator(ROIInput)
+    names = [rule.name for rule in validator.rules]
+    if slice_rows:
+        result = _validate_in_slices(corpus, slice_rows)
+    else:
+        if columns is None:
+            columns = {name: [row.get(name, MISSING) for row in corpus] for name in names}
+        result = validator.validate(columns, rows=len(corpus))
+
+    problems = []
+    for index, row in enumerate(corpus):
+        try:
+            model = ROIInput.model_validate(row)
+            expected = []
+        except ValidationError as e:
+            model = None
+            expected = e.errors(include_url=False)
+        actual = result.errors.get(index, [])
+
+        if len(expected) != len(actual) or not all(_same(x, y) for x, y in zip(expected, actual)):
+            problems.append(f"row {index} {row!r}\n  pydantic: {expected}\n  columns:  {actual}")
+        elif model is not None:
+            for rule in validator.rules:
+                value = getattr(model, rule.name)
+                got = result.columns[rule.name][index]
+                if rule.kind == "enum":
+                    value = -1 if value is None else rule.members[value.value]
+                if value != got:
+                    problems.append(f"row {index} field {rule.name}: pydantic {value!r}, columns {got!r}")
+        if len(problems) >= 20:
+            break
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    problems = compare(make_corpus(args.rows, args.seed))
+    problems += compare(make_corpus(args.rows, args.seed + 1), slice_rows=4)
+    problems += compare(*make_array_columns(args.rows, args.seed))
+    for problem in problems:
+        print(problem)
+    print(f"{args.rows} rows checked as lists, in slices and as arrays, {'no' if not problems else len(problems)} differences")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,10 @@ All savings projections are based on user-provided expectations.
 """
 
 from models import ROIInput, ROIOutput, Frequency
+from metrics import StageClock
+from cashflow import project
+from tool_pricing import TOOLS, license_cost, quote
+from ai_pricing import MODELS, ai_cost
 
 
 # =============================================================================
@@ -74,6 +78,7 @@ def calculate_roi(inputs: ROIInput) -> ROIOutput:
         ROIOutput containing all calculated metrics and recommendations
     """
     config = CalculatorConfig()
+    clock = StageClock("calculator")
     
     # Calculate annual run frequency
     periods_per_year = calculate_periods_per_year(
@@ -95,6 +100,7 @@ def calculate_roi(inputs: ROIInput) -> ROIOutput:
         annual_sla_cost +
         annual_tool_cost
     )
+    clock.mark("current_costs")
     
     # Projected savings calculations
     annual_savings = _calculate_savings(
@@ -109,18 +115,25 @@ def calculate_roi(inputs: ROIInput) -> ROIOutput:
     savings_percent = (annual_savings / total_current_cost * 100) if total_current_cost > 0 else 0
     
     # True Cost of Ownership calculations
-    annual_automation_cost = inputs.software_license_cost + inputs.annual_maintenance_cost
+    annual_automation_cost = (
+        _calculate_license_cost(inputs, runs_per_year)
+        + inputs.annual_maintenance_cost
+        + _calculate_ai_cost(inputs, runs_per_year)
+    )
     net_annual_savings = annual_savings - annual_automation_cost
     total_cost_of_ownership = inputs.implementation_cost + (annual_automation_cost * 5)
+    clock.mark("savings")
     
     # ROI metrics (using net savings for accurate calculations)
     payback_months = _calculate_payback(inputs.implementation_cost, net_annual_savings)
     roi_percentage = _calculate_roi_percentage(net_annual_savings, inputs.implementation_cost)
     five_year_savings = _calculate_five_year_value(
-        net_annual_savings,  # Use net savings 
+        annual_savings,  # Gross savings grow with volume, recurring costs stay flat
+        annual_automation_cost,
         inputs.implementation_cost,
         inputs.volume_growth
     )
+    clock.mark("roi_metrics")
     
     # Recommendations
     priority_score, recommendation = _generate_recommendation(
@@ -146,8 +159,9 @@ def calculate_roi(inputs: ROIInput) -> ROIOutput:
         automation_type=automation_type,
         automation_reasoning=automation_reasoning
     )
+    clock.mark("narrative")
     
-    return ROIOutput(
+    result = ROIOutput(
         process_name=inputs.process_name,
         annual_labor_cost=round(annual_labor_cost, 2),
         annual_error_cost=round(annual_error_cost, 2),
@@ -171,6 +185,8 @@ def calculate_roi(inputs: ROIInput) -> ROIOutput:
         recommended_automation_type=automation_type,
         automation_type_reasoning=automation_reasoning,
     )
+    clock.mark("output")
+    return result
 
 
 # =============================================================================
@@ -200,6 +216,18 @@ def _calculate_sla_cost(inputs: ROIInput) -> float:
     return inputs.sla_breaches_year * inputs.sla_penalty
 
 
+def _calculate_license_cost(inputs: ROIInput, runs_per_year: int) -> float:
+    """Annual license cost: the automation platform's tier price, else software_license_cost."""
+    platform = inputs.automation_platform.value if inputs.automation_platform else None
+    return license_cost(platform, runs_per_year / 12, inputs.software_license_cost)
+
+
+def _calculate_ai_cost(inputs: ROIInput, runs_per_year: int) -> float:
+    """Annual LLM inference cost of the process's AI step (0 without ai_model)."""
+    model = inputs.ai_model.value if inputs.ai_model else None
+    return ai_cost(model, runs_per_year, inputs.ai_input_tokens_per_run, inputs.ai_output_tokens_per_run)
+
+
 def _calculate_savings(
     labor_cost: float,
     error_cost: float,
@@ -236,19 +264,12 @@ def _calculate_roi_percentage(annual_savings: float, implementation_cost: float)
 
 def _calculate_five_year_value(
     annual_savings: float,
+    annual_automation_cost: float,
     implementation_cost: float,
     volume_growth: float
 ) -> float:
-    """Calculate cumulative 5-year net savings with volume growth."""
-    growth_rate = volume_growth / 100
-    cumulative = 0.0
-    current_savings = annual_savings
-    
-    for _ in range(5):
-        cumulative += current_savings
-        current_savings *= (1 + growth_rate)
-    
-    return cumulative - implementation_cost
+    """Calculate cumulative 5-year net savings (same projection as the PDF chart)."""
+    return project(annual_savings, annual_automation_cost, implementation_cost, volume_growth, horizon_years=5).cumulative[-1]
 
 
 def _generate_recommendation(
@@ -301,7 +322,7 @@ def _assess_confidence(inputs: ROIInput) -> str:
 
 def _build_assumptions_list(inputs: ROIInput, config: CalculatorConfig) -> list:
     """Build list of user-provided values used in calculations."""
-    return [
+    assumptions = [
         f"Labor reduction: {inputs.expected_labor_reduction}% (user provided)",
         f"Error reduction: {inputs.expected_error_reduction}% (user provided)",
         f"SLA improvement: {inputs.expected_sla_improvement}% (user provided)",
@@ -310,6 +331,24 @@ def _build_assumptions_list(inputs: ROIInput, config: CalculatorConfig) -> list:
         f"Hours/day: {inputs.hours_per_day}",
         f"Volume growth: {inputs.volume_growth}% annually",
     ]
+    if inputs.automation_platform:
+        runs_per_month = inputs.runs_per_period * calculate_periods_per_year(
+            inputs.frequency, inputs.working_days_per_year, inputs.hours_per_day
+        ) / 12
+        platform, tier, monthly = quote(inputs.automation_platform.value, runs_per_month)
+        price = "quote only, software license cost used" if monthly != monthly else f"${monthly:,.2f}/month"
+        assumptions.append(f"License: {TOOLS[platform]['name']} {tier} ({price}) at {runs_per_month:,.0f} runs/month")
+    if inputs.ai_model:
+        runs_per_year = inputs.runs_per_period * calculate_periods_per_year(
+            inputs.frequency, inputs.working_days_per_year, inputs.hours_per_day
+        )
+        _, name, input_price, output_price = MODELS[inputs.ai_model.value]
+        assumptions.append(
+            f"AI inference: {name} (${input_price:,.2f} in / ${output_price:,.2f} out per 1M tokens), "
+            f"{inputs.ai_input_tokens_per_run:,.0f} in + {inputs.ai_output_tokens_per_run:,.0f} out tokens/run "
+            f"= ${_calculate_ai_cost(inputs, runs_per_year):,.2f}/year"
+        )
+    return assumptions
 
 
 def _recommend_automation_type(inputs: ROIInput, runs_per_year: int) -> tuple[str, str]:
@@ -546,8 +585,9 @@ _calculate_payback(implementation_cost, annual_savings)
 _calculate_roi_percentage(annual_savings, implementation_cost)
     Formula: ((annual_savings - implementation_cost) / implementation_cost) * 100
 
-_calculate_five_year_value(annual_savings, implementation_cost, volume_growth)
-    Compounds annual savings with growth rate over 5 years, minus implementation cost.
+_calculate_five_year_value(annual_savings, annual_automation_cost, implementation_cost, volume_growth)
+    Final cumulative value of the 5-year cash-flow projection (cashflow.project):
+    gross savings compound with growth, recurring costs stay flat.
 
 _generate_recommendation(payback_months, roi_percentage, annual_savings, config)
     Returns priority score (High/Medium/Low) and actionable recommendation text.
@@ -585,5 +625,6 @@ ROI Percentage:
     ((annual_savings - implementation_cost) / implementation_cost) * 100
 
 5-Year Savings:
-    Sum of (annual_savings * (1 + growth_rate)^year) for years 0-4, minus implementation_cost
+    Sum of (annual_savings * (1 + growth_rate)^year - annual_automation_cost) for years 0-4,
+    minus implementation_cost
 """
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+cancellation.py - Cooperative Cancellation on Client Disconnect
+
+When a client disconnects (closes the tab mid-download), PDF and batch work
+for it is abandoned instead of running to completion on a worker:
+
+- A request still waiting for admission (admission.py) is cancelled and
+  leaves the queue without ever running.
+- A request already running in the thread pool cannot be interrupted from
+  outside. Its token is cancelled, and long-running code calls check()
+  between chunks and stages (PDF build, ingest chunks, portfolio search),
+  which raises Cancelled so the work stops at the next checkpoint.
+
+Cancelled derives from BaseException, like asyncio.CancelledError, so the
+endpoints' `except Exception` handlers do not turn it into a 500.
+
+Only routes whose work class is cancel_on_disconnect are watched; fast
+interactive calculations simply finish.
+"""
+
+import asyncio
+import threading
+from contextvars import ContextVar
+from typing import Optional
+
+from admission import ROUTES
+from metrics import CANCELLED_REQUESTS, CANCELLATION_CHECKPOINTS
+
+# Request body messages read ahead while the app is busy (bounds buffered uploads)
+READ_AHEAD_MESSAGES = 16
+
+
+class Cancelled(BaseException):
+    """The client that requested this work has disconnected."""
+
+
+class CancelToken:
+    """
+    Cancellation state of one request.
+
+    Attributes:
+        started: The endpoint began (it read the request body)
+        interrupted: A checkpoint has stopped the work
+    """
+
+    __slots__ = ("_event", "started", "interrupted")
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.started = False
+        self.interrupted = False
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+_current: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+
+def current() -> Optional[CancelToken]:
+    """Token of the request being handled (None outside watched requests)."""
+    return _current.get()
+
+
+def check(task: str) -> None:
+    """
+    Checkpoint: stop here if the client has gone away.
+
+    Cheap enough to call between chunks or every few thousand iterations.
+    Follows the current context, so it also works in thread pool workers.
+
+    Raises:
+        Cancelled: If the current request was cancelled
+    """
+    token = _current.get()
+    if token is None or not token.cancelled:
+        return
+    if not token.interrupted:
+        token.interrupted = True
+        CANCELLATION_CHECKPOINTS.inc(task=task)
+    raise Cancelled(task)
+
+
+class CancellationMiddleware:
+    """
+    ASGI middleware watching cancellable routes for client disconnects.
+
+    The request body is pumped from the server in a background task so a
+    disconnect is seen while the app is still queued or computing; the app
+    reads the same messages from a local queue.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        work = ROUTES.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if work is None or not work.cancel_on_disconnect:
+            await self.app(scope, receive, send)
+            return
+
+        token = CancelToken()
+        messages = asyncio.Queue(maxsize=READ_AHEAD_MESSAGES)
+        state = {"disconnected": False, "complete": False}
+
+        async def pump():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    state["disconnected"] = True
+                    return
+                await messages.put(message)
+
+        async def receive_wrapper():
+            token.started = True
+            if not messages.empty():
+                return messages.get_nowait()
+            if state["disconnected"]:
+                return {"type": "http.disconnect"}
+            getter = asyncio.ensure_future(messages.get())
+            try:
+                await asyncio.wait({getter, pump_task}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                if not getter.done():
+                    getter.cancel()
+            if getter.done() and not getter.cancelled():
+                return getter.result()
+            return {"type": "http.disconnect"}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                state["complete"] = True
+            await send(message)
+
+        async def run():
+            _current.set(token)
+            await self.app(scope, receive_wrapper, send_wrapper)
+
+        app_task = asyncio.ensure_future(run())
+        pump_task = asyncio.ensure_future(pump())
+        try:
+            await asyncio.wait({app_task, pump_task}, return_when=asyncio.FIRST_COMPLETED)
+            if app_task.done() or state["complete"]:
+                await app_task
+                return
+
+            # The client left while the work was queued or running. Admission
+            # may have read the body already, so it says whether it still waits.
+            token.cancel()
+            scope["client_disconnected"] = True
+            queued = not token.started or scope.get("admission_waiting", False)
+            if queued:
+                app_task.cancel()
+            try:
+                await app_task
+            except (Cancelled, asyncio.CancelledError):
+                pass
+            if queued:
+                stage = "queued"
+            else:
+                stage = "completed" if state["complete"] else "interrupted"
+            CANCELLED_REQUESTS.inc(work_class=work.name, stage=stage)
+        finally:
+            pump_task.cancel()
+            if not app_task.done():
+                app_task.cancel()
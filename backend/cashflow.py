@@ -0,0 +1,244 @@
+"""
+cashflow.py - Cash-Flow Projection Engine
+
+One model of how an automation pays off over time, shared by the API
+(five_year_savings, /cash-flow) and the PDF savings chart:
+
+    gross savings   grow with volume: annual_savings * (1 + growth)^year
+    recurring costs stay flat: license + maintenance
+    net             gross - recurring
+    cumulative      running total of net, starting from -implementation_cost
+
+Periods are years, quarters or months; shorter periods are the yearly
+figures spread evenly, with growth stepping once per year, so every view
+adds up to the same totals. NPV and IRR discount period-end cash flows with the
+implementation cost paid up front.
+
+project() handles one input with plain Python (it sits on the /calculate
+hot path). project_batch() takes arrays and computes every input at once
+with NumPy; npv() and irr() accept either.
+"""
+
+from typing import Optional
+
+PERIODS_PER_YEAR = {"year": 1, "quarter": 4, "month": 12}
+
+DEFAULT_HORIZON_YEARS = 5
+
+# IRR search bounds (per-period rate) and bisection steps
+IRR_MIN_RATE = -0.99
+IRR_MAX_RATE = 10.0
+IRR_ITERATIONS = 60
+
+
+class CashFlowProjection:
+    """
+    Per-period cash flows. Arrays are lists for project() and NumPy arrays
+    of shape (inputs, periods) for project_batch().
+    """
+
+    __slots__ = ("period", "horizon_years", "implementation_cost",
+                 "gross_savings", "recurring_costs", "net", "cumulative")
+
+    def __init__(self, period, horizon_years, implementation_cost, gross_savings, recurring_costs, net, cumulative):
+        self.period = period
+        self.horizon_years = horizon_years
+        self.implementation_cost = implementation_cost
+        self.gross_savings = gross_savings
+        self.recurring_costs = recurring_costs
+        self.net = net
+        self.cumulative = cumulative
+
+    @property
+    def periods_per_year(self) -> int:
+        return PERIODS_PER_YEAR[self.period]
+
+    def to_dict(self, decimals: int = 2) -> dict:
+        """JSON-ready view of a single-input projection."""
+        return {
+            "period": self.period,
+            "horizon_years": self.horizon_years,
+            "implementation_cost": round(self.implementation_cost, decimals),
+            "gross_savings": [round(x, decimals) for x in self.gross_savings],
+            "recurring_costs": [round(x, decimals) for x in self.recurring_costs],
+            "net": [round(x, decimals) for x in self.net],
+            "cumulative": [round(x, decimals) for x in self.cumulative],
+        }
+
+
+def _check_period(period: str) -> int:
+    if period not in PERIODS_PER_YEAR:
+        raise ValueError(f"period must be one of {', '.join(PERIODS_PER_YEAR)}")
+    return PERIODS_PER_YEAR[period]
+
+
+# =============================================================================
+# PROJECTION
+# =============================================================================
+
+def project(
+    annual_savings: float,
+    annual_cost: float,
+    implementation_cost: float,
+    volume_growth: float,
+    horizon_years: int = DEFAULT_HORIZON_YEARS,
+    period: str = "year",
+) -> CashFlowProjection:
+    """
+    Project cash flows for one process.
+
+    Args:
+        annual_savings: Gross savings in the first year
+        annual_cost: Recurring automation cost per year (license + maintenance)
+        implementation_cost: One-time cost paid before the first period
+        volume_growth: Annual volume growth in percent (grows gross savings)
+        horizon_years: Number of years to project
+        period: "year", "quarter" or "month"
+
+    Returns:
+        CashFlowProjection with list arrays
+    """
+    per_year = _check_period(period)
+    growth = 1 + volume_growth / 100
+    cost = annual_cost / per_year
+
+    gross, recurring, net, cumulative = [], [], [], []
+    running = -implementation_cost
+    year_savings = annual_savings / per_year
+    for _ in range(horizon_years):
+        for _ in range(per_year):
+            gross.append(year_savings)
+            recurring.append(cost)
+            net.append(year_savings - cost)
+            running += year_savings - cost
+            cumulative.append(running)
+        year_savings *= growth
+
+    return CashFlowProjection(period, horizon_years, implementation_cost, gross, recurring, net, cumulative)
+
+
+def project_batch(
+    annual_savings,
+    annual_cost,
+    implementation_cost,
+    volume_growth,
+    horizon_years: int = DEFAULT_HORIZON_YEARS,
+    period: str = "year",
+) -> CashFlowProjection:
+    """
+    Project cash flows for many processes at once.
+
+    Args are array-likes of equal length (or scalars, which broadcast), with
+    the same meaning as in project().
+
+    Returns:
+        CashFlowProjection with arrays of shape (inputs, periods)
+    """
+    import numpy as np
+
+    per_year = _check_period(period)
+    annual_savings = np.atleast_1d(np.asarray(annual_savings, dtype=float))
+    annual_cost = np.atleast_1d(np.asarray(annual_cost, dtype=float))
+    implementation_cost = np.atleast_1d(np.asarray(implementation_cost, dtype=float))
+    growth = 1 + np.atleast_1d(np.asarray(volume_growth, dtype=float)) / 100
+
+    # Same operation order as project() (repeated growth multiplication, running
+    # total from -implementation_cost) so results match it to the last bit
+    n = max(len(annual_savings), len(annual_cost), len(implementation_cost), len(growth))
+    factors = np.empty((n, horizon_years))
+    factors[:, 0] = annual_savings / per_year
+    factors[:, 1:] = growth[:, None]
+    yearly = np.cumprod(factors, axis=1)
+    gross = np.repeat(yearly, per_year, axis=1) if per_year > 1 else yearly
+    recurring = np.broadcast_to((annual_cost / per_year)[:, None], gross.shape)
+    net = gross - recurring
+    running = np.concatenate([np.broadcast_to(-implementation_cost[:, None], (n, 1)), net], axis=1)
+    cumulative = np.cumsum(running, axis=1)[:, 1:]
+
+    return CashFlowProjection(period, horizon_years, implementation_cost, gross, recurring, net, cumulative)
+
+
+# =============================================================================
+# DISCOUNTING
+# =============================================================================
+
+def _flows(projection: CashFlowProjection):
+    """Cash flows including the up-front cost at t=0, shape (inputs, periods + 1)."""
+    import numpy as np
+
+    net = np.atleast_2d(np.asarray(projection.net, dtype=float))
+    upfront = -np.atleast_1d(np.asarray(projection.implementation_cost, dtype=float))
+    return np.concatenate([np.broadcast_to(upfront[:, None], (net.shape[0], 1)), net], axis=1)
+
+
+def _scalar_or_array(values, projection: CashFlowProjection):
+    """Unwrap single-input results to floats (None for NaN)."""
+    if isinstance(projection.net, list):
+        value = float(values[0])
+        return None if value != value else value
+    return values
+
+
+def npv(projection: CashFlowProjection, discount_rate: float):
+    """
+    Net present value at an annual discount rate (percent).
+
+    Returns:
+        float for a project() result, array for project_batch()
+    """
+    import numpy as np
+
+    flows = _flows(projection)
+    period_rate = (1 + discount_rate / 100) ** (1 / projection.periods_per_year) - 1
+    discount = (1 + period_rate) ** -np.arange(flows.shape[1])
+    return _scalar_or_array(flows @ discount, projection)
+
+
+def irr(projection: CashFlowProjection):
+    """
+    Annualized internal rate of return in percent, found by bisection on
+    the per-period rate. Undefined (None / NaN) when NPV does not change
+    sign in the search range, e.g. the automation never pays back or
+    there is no up-front cost.
+
+    Returns:
+        float or None for a project() result, array for project_batch()
+    """
+    import numpy as np
+
+    flows = _flows(projection)
+    columns = [np.ascontiguousarray(flows[:, t]) for t in range(flows.shape[1] - 1, -1, -1)]
+
+    def npv_at(rates):
+        # Horner's rule in x = 1 / (1 + rate): no per-element powers
+        x = 1 / (1 + rates)
+        total = np.zeros_like(x)
+        for column in columns:
+            total = total * x + column
+        return total
+
+    n = flows.shape[0]
+    lo = np.full(n, IRR_MIN_RATE)
+    hi = np.full(n, IRR_MAX_RATE)
+    f_lo = npv_at(lo)
+    solvable = np.sign(f_lo) != np.sign(npv_at(hi))
+
+    for _ in range(IRR_ITERATIONS):
+        mid = (lo + hi) / 2
+        f_mid = npv_at(mid)
+        same_side = np.sign(f_mid) == np.sign(f_lo)
+        lo = np.where(same_side, mid, lo)
+        f_lo = np.where(same_side, f_mid, f_lo)
+        hi = np.where(same_side, hi, mid)
+
+    period_rate = (lo + hi) / 2
+    annual = ((1 + period_rate) ** projection.periods_per_year - 1) * 100
+    return _scalar_or_array(np.where(solvable, annual, np.nan), projection)
+
+
+def payback_period(projection: CashFlowProjection) -> Optional[int]:
+    """First period (1-based) where cumulative cash flow turns non-negative, or None."""
+    for index, value in enumerate(projection.cumulative, start=1):
+        if value >= 0:
+            return index
+    return None
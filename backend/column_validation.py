@@ -0,0 +1,452 @@
+"""
+column_validation.py - Column-wise Validation for Bulk Input
+
+Validates many rows of model input at once without building one Pydantic
+object per row. compile_validator() reads a model's fields (type, default,
+ge/gt/le/lt constraints) once; ColumnValidator.validate() then coerces each
+column and checks its bounds with array operations, reporting every
+violating row and field in a single pass.
+
+Errors follow Pydantic's lax-mode semantics and use the same dict shape as
+ValidationError.errors(include_url=False): type, loc, msg, input and ctx
+where Pydantic sets it. Supported field types are str, int, float, bool and
+str Enums, and Optional[...] of these (None cells allowed); supported cell values are str, int, float, bool, None and NumPy
+arrays or scalars. benchmarks/validator_parity.py checks the two stay in sync.
+
+Columns are dicts of field -> list or array. A MISSING cell means the key
+is absent: the field default is used, or a "missing" error is reported.
+Typed numeric arrays and columns whose cells are all valid ASCII strings
+are coerced in bulk; other columns fall back to per-cell coercion.
+"""
+
+import functools
+import math
+import re
+import types
+from enum import Enum
+from typing import Optional, Union, get_args, get_origin
+
+# Placeholder for a cell whose key is absent from the row
+MISSING = type("Missing", (), {"__repr__": lambda self: "MISSING"})()
+
+# Strings Pydantic accepts as booleans (compared case-insensitively)
+BOOL_STRINGS = {
+    "0": False, "off": False, "f": False, "false": False, "n": False, "no": False,
+    "1": True, "on": True, "t": True, "true": True, "y": True, "yes": True,
+}
+
+# Integer strings: digits with single underscores, optionally ".0..." (e.g. "2.00")
+# Unicode White_Space, which Pydantic trims from numeric strings (str.strip()
+# would also remove the \x1c-\x1f separators)
+_WHITESPACE = "\t\n\x0b\x0c\r \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006" \
+              "\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000"
+_INT_PATTERN = re.compile(r"[+-]?[0-9]+(?:_[0-9]+)*(?:\.0+)?")
+
+# Pydantic checks upper bounds before lower ones (visible for NaN)
+_BOUND_CHECKS = (
+    ("le", "less_than_equal", "less than or equal to", lambda v, c: v <= c),
+    ("lt", "less_than", "less than", lambda v, c: v < c),
+    ("ge", "greater_than_equal", "greater than or equal to", lambda v, c: v >= c),
+    ("gt", "greater_than", "greater than", lambda v, c: v > c),
+)
+
+_TYPE_ERRORS = {
+    "int": ("int_type", "Input should be a valid integer"),
+    "float": ("float_type", "Input should be a valid number"),
+    "bool": ("bool_type", "Input should be a valid boolean"),
+    "str": ("string_type", "Input should be a valid string"),
+}
+_NOT_FINITE = "Input should be a finite number"
+_FRACTIONAL = "Input should be a valid integer, got a number with a fractional part"
+# Whole floats outside the int64 range
+_TOO_BIG = ("int_parsing_size", "Unable to parse input string as an integer, exceeded maximum size")
+_PARSE_ERRORS = {
+    "int": ("int_parsing", "Input should be a valid integer, unable to parse string as an integer"),
+    "float": ("float_parsing", "Input should be a valid number, unable to parse string as a number"),
+    "bool": ("bool_parsing", "Input should be a valid boolean, unable to interpret input"),
+}
+
+
+def _display(value) -> str:
+    """Format a constraint as Pydantic does in messages (40.0 -> "40")."""
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e16:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _error(kind: str, field: str, msg: str, value, ctx: Optional[dict] = None) -> dict:
+    error = {"type": kind, "loc": (field,), "msg": msg, "input": value}
+    if ctx is not None:
+        error["ctx"] = ctx
+    return error
+
+
+# =============================================================================
+# SCALAR COERCION (Pydantic lax mode)
+# =============================================================================
+# Each returns (value, None) or (None, (error type, message)).
+
+def _to_float(value):
+    if isinstance(value, (bool, int, float)):
+        return float(value), None
+    if isinstance(value, str):
+        text = value.strip(_WHITESPACE)
+        if text.isascii():
+            try:
+                return float(text), None
+            except ValueError:
+                pass
+        return None, _PARSE_ERRORS["float"]
+    if hasattr(value, "dtype") and value.dtype.kind in "biuf":
+        return float(value), None
+    return None, _TYPE_ERRORS["float"]
+
+
+def _to_int(value):
+    if isinstance(value, (bool, int)):
+        return int(value), None
+    if isinstance(value, str):
+        text = value.strip(_WHITESPACE)
+        if text.isascii() and _INT_PATTERN.fullmatch(text):
+            return int(text.split(".")[0]), None
+        return None, _PARSE_ERRORS["int"]
+    if isinstance(value, float) or (hasattr(value, "dtype") and value.dtype.kind == "f"):
+        if not math.isfinite(value):
+            return None, ("finite_number", _NOT_FINITE)
+        if not float(value).is_integer():
+            return None, ("int_from_float", _FRACTIONAL)
+        if not -2.0 ** 63 < value < 2.0 ** 63:
+            return None, _TOO_BIG
+        return int(value), None
+    if hasattr(value, "dtype") and value.dtype.kind in "biu":
+        return int(value), None
+    return None, _TYPE_ERRORS["int"]
+
+
+def _to_bool(value):
+    if isinstance(value, bool) or (hasattr(value, "dtype") and value.dtype.kind == "b"):
+        return bool(value), None
+    if isinstance(value, str):
+        parsed = BOOL_STRINGS.get(value.lower())
+        return (parsed, None) if parsed is not None else (None, _PARSE_ERRORS["bool"])
+    is_int = isinstance(value, int) or (hasattr(value, "dtype") and value.dtype.kind in "iu")
+    is_float = isinstance(value, float) or (hasattr(value, "dtype") and value.dtype.kind == "f")
+    if (is_int or is_float) and (value == 0 or value == 1):
+        return bool(value), None
+    # Other whole numbers in int64 range cannot be interpreted; anything else is the wrong type
+    if (is_int or (is_float and math.isfinite(value) and float(value).is_integer())) and -2 ** 63 <= value < 2 ** 63:
+        return None, _PARSE_ERRORS["bool"]
+    return None, _TYPE_ERRORS["bool"]
+
+
+def _to_str(value):
+    if isinstance(value, str):
+        return str(value), None
+    return None, _TYPE_ERRORS["str"]
+
+
+_COERCERS = {"int": _to_int, "float": _to_float, "bool": _to_bool, "str": _to_str}
+
+
+# =============================================================================
+# COMPILED VALIDATOR
+# =============================================================================
+
+def _unwrap_optional(annotation) -> tuple:
+    """(X, True) for Optional[X], otherwise (annotation, False)."""
+    args = get_args(annotation)
+    if get_origin(annotation) in (Union, types.UnionType) and type(None) in args:
+        others = [arg for arg in args if arg is not type(None)]
+        if len(others) == 1:
+            return others[0], True
+    return annotation, False
+
+
+class FieldRule:
+    """How one model field is coerced and bounded."""
+
+    __slots__ = ("name", "type", "kind", "required", "nullable", "default", "bounds", "members", "expected")
+
+    def __init__(self, name: str, info):
+        annotation, self.nullable = _unwrap_optional(info.annotation)
+        self.name = name
+        self.type = annotation
+        self.required = info.is_required()
+        self.default = None if self.required else info.default
+        self.members = self.expected = None
+        if isinstance(annotation, type) and issubclass(annotation, Enum):
+            self.kind = "enum"
+            self.members = {member.value: code for code, member in enumerate(annotation)}
+            quoted = [repr(value) for value in self.members]
+            self.expected = quoted[0] if len(quoted) == 1 else f"{', '.join(quoted[:-1])} or {quoted[-1]}"
+        elif annotation in (int, float, bool, str):
+            self.kind = annotation.__name__
+        else:
+            raise TypeError(f"Field {name} has an unsupported type for column validation: {annotation}")
+
+        # (ctx key, error type, wording, check, limit) in Pydantic's order
+        self.bounds = []
+        for key, kind, wording, check in _BOUND_CHECKS:
+            for constraint in info.metadata:
+                limit = getattr(constraint, key, None)
+                if limit is not None:
+                    limit = float(limit) if self.kind == "float" else limit
+                    self.bounds.append((key, kind, wording, check, limit))
+
+
+class ColumnValidation:
+    """
+    Result of validating a set of columns.
+
+    Attributes:
+        columns: Field -> coerced NumPy array (float64, int64, bool; enum
+                 fields as member indexes in declaration order, -1 for
+                 None) or list (str).
+                 Entries for invalid rows are placeholders.
+        valid: Boolean array, True where the row has no errors
+        errors: Row index -> list of Pydantic-style error dicts in field order
+    """
+
+    __slots__ = ("columns", "valid", "errors")
+
+    def __init__(self, columns: dict, valid, errors: dict):
+        self.columns = columns
+        self.valid = valid
+        self.errors = errors
+
+
+class ColumnValidator:
+    """Validator for one model, compiled from its field definitions."""
+
+    def __init__(self, model):
+        self.model = model
+        self.rules = [FieldRule(name, info) for name, info in model.model_fields.items()]
+
+    def validate(self, columns: dict, rows: Optional[int] = None, scales: Optional[dict] = None) -> ColumnValidation:
+        """
+        Validate column data.
+
+        Args:
+            columns: Field -> list or array of cell values (MISSING where the
+                     key is absent). Fields without a column are absent in
+                     every row; unknown fields are ignored.
+            rows: Row count (required only if columns is empty)
+            scales: Optional field -> multiplier (scalar or per-row array)
+                    applied to numeric fields after parsing and before bounds,
+                    e.g. minutes -> hours
+
+        Returns:
+            ColumnValidation
+        """
+        import numpy as np
+
+        n = rows if rows is not None else len(next(iter(columns.values())))
+        scales = scales or {}
+        invalid = np.zeros(n, dtype=bool)
+        # Row -> [(field position, error)], sorted into field order at the end
+        found = {}
+        coerced = {}
+
+        for position, rule in enumerate(self.rules):
+            cells = columns.get(rule.name)
+            values, failed = self._coerce(rule, cells, n, found, position, columns)
+            if rule.kind in ("int", "float") and rule.name in scales:
+                values = values * scales[rule.name]
+                if rule.kind == "int":
+                    bad = ~failed & (values != np.round(values))
+                    self._report(found, position, rule, bad, cells, ("int_from_float", _FRACTIONAL))
+                    failed |= bad
+            if rule.bounds:
+                failed |= self._check_bounds(rule, values, failed, cells, found, position)
+            if rule.kind == "int":
+                # Checked as float64; rows that failed may hold anything
+                values = np.where(failed | ~(np.abs(values) < 2 ** 63), 0, values).astype(np.int64)
+            invalid |= failed
+            coerced[rule.name] = values
+
+        errors = {row: [error for _, error in sorted(items, key=lambda item: item[0])]
+                  for row, items in sorted(found.items())}
+        return ColumnValidation(coerced, ~invalid, errors)
+
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _report(found: dict, position: int, rule: FieldRule, mask, cells, problem: tuple) -> None:
+        for row in mask.nonzero()[0].tolist():
+            cell = cells[row]
+            found.setdefault(row, []).append((position, _error(
+                problem[0], rule.name, problem[1], cell.item() if hasattr(cell, "item") else cell
+            )))
+
+    def _coerce(self, rule: FieldRule, cells, n: int, found: dict, position: int, columns: dict):
+        """
+        Coerce one column; returns (values, failed mask) and records type errors.
+        int columns come back as float64 so bounds can be checked on big values.
+        """
+        import numpy as np
+
+        failed = np.zeros(n, dtype=bool)
+        dtype = {"int": np.float64, "float": np.float64, "bool": bool, "enum": np.int64}.get(rule.kind, object)
+
+        # Trusted fast path: already-typed numeric arrays need no per-cell work
+        if isinstance(cells, np.ndarray) and cells.dtype.kind in "biuf":
+            return self._coerce_array(rule, cells, failed, found, position)
+
+        default = rule.default
+        if rule.kind == "enum" and not rule.required:
+            default = -1 if default is None else rule.members[default.value if isinstance(default, Enum) else default]
+
+        # Bulk path for spreadsheet-style columns; falls through when any cell needs a closer look
+        if not rule.required or (cells is not None and MISSING not in cells):
+            values = self._coerce_strings(rule, cells if cells is not None else [], n, default, dtype)
+            if values is not None:
+                return values, failed
+
+        if cells is None:
+            cells = [MISSING] * n
+        values = [None] * n
+        coerce = _COERCERS.get(rule.kind)
+        for row, cell in enumerate(cells):
+            if cell is MISSING:
+                if rule.required:
+                    found.setdefault(row, []).append((position, _error(
+                        "missing", rule.name, "Field required", self._row_input(columns, row)
+                    )))
+                    failed[row] = True
+                else:
+                    values[row] = default
+                continue
+            if cell is None and rule.nullable:
+                values[row] = -1 if rule.kind == "enum" else None
+                continue
+            if rule.kind == "enum":
+                key = cell.value if isinstance(cell, Enum) else cell
+                code = rule.members.get(key) if isinstance(key, str) else None
+                if code is None:
+                    found.setdefault(row, []).append((position, _error(
+                        "enum", rule.name, f"Input should be {rule.expected}", cell, {"expected": rule.expected}
+                    )))
+                    failed[row] = True
+                else:
+                    values[row] = code
+                continue
+            value, problem = coerce(cell)
+            if problem is not None:
+                found.setdefault(row, []).append((position, _error(problem[0], rule.name, problem[1], cell)))
+                failed[row] = True
+            else:
+                values[row] = value
+
+        if dtype is object:
+            return values, failed
+        placeholder = False if rule.kind == "bool" else 0
+        return np.array([placeholder if v is None else v for v in values], dtype=dtype), failed
+
+    @staticmethod
+    def _coerce_strings(rule: FieldRule, cells, n: int, default, dtype):
+        """
+        Coerce a column of ASCII strings (MISSING allowed for optional fields)
+        in one pass, or return None if any cell is not accepted as-is.
+
+        For ASCII text NumPy parses numbers with the same rules as Pydantic
+        (underscores, surrounding whitespace, nan/inf; int64 range), so the
+        result is identical to the per-cell path.
+        """
+        import numpy as np
+
+        rows = None
+        if len(cells) < n or MISSING in cells:
+            rows = [row for row, cell in enumerate(cells) if cell is not MISSING]
+            cells = [cells[row] for row in rows]
+        try:
+            if not "".join(cells).isascii():
+                return None
+        except TypeError:
+            return None
+
+        if rule.kind in ("int", "float"):
+            try:
+                parsed = np.array(cells, dtype=np.int64 if rule.kind == "int" else np.float64).astype(np.float64)
+            except (ValueError, OverflowError):
+                return None
+        elif rule.kind in ("bool", "enum"):
+            lookup = rule.members if rule.kind == "enum" else None
+            parsed = [lookup.get(cell) for cell in cells] if lookup else [BOOL_STRINGS.get(cell.lower()) for cell in cells]
+            if None in parsed:
+                return None
+            parsed = np.array(parsed, dtype=dtype)
+        else:
+            parsed = cells
+
+        if rows is None:
+            return parsed
+        if dtype is object:
+            values = [default] * n
+            for row, value in zip(rows, parsed):
+                values[row] = value
+            return values
+        values = np.full(n, default, dtype=dtype)
+        values[rows] = parsed
+        return values
+
+    def _coerce_array(self, rule: FieldRule, cells, failed, found: dict, position: int):
+        import numpy as np
+
+        if rule.kind in ("int", "float"):
+            values = cells.astype(np.float64)
+            if rule.kind == "int" and cells.dtype.kind == "f":
+                finite = np.isfinite(values)
+                whole = finite & (values == np.round(np.where(finite, values, 0)))
+                self._report(found, position, rule, ~finite, cells, ("finite_number", _NOT_FINITE))
+                self._report(found, position, rule, finite & ~whole, cells, ("int_from_float", _FRACTIONAL))
+                too_big = whole & ~((values > -2.0 ** 63) & (values < 2.0 ** 63))
+                self._report(found, position, rule, too_big, cells, _TOO_BIG)
+                failed |= ~whole | too_big
+            return values, failed
+        if rule.kind == "bool":
+            ok = (cells == 0) | (cells == 1)
+            whole = np.ones(len(cells), dtype=bool)
+            if cells.dtype.kind == "f":
+                with np.errstate(invalid="ignore"):
+                    whole = np.isfinite(cells) & (cells == np.floor(cells)) & (np.abs(cells) < 2.0 ** 63)
+            self._report(found, position, rule, ~ok & whole, cells, _PARSE_ERRORS["bool"])
+            self._report(found, position, rule, ~ok & ~whole, cells, _TYPE_ERRORS["bool"])
+            failed |= ~ok
+            return cells.astype(bool), failed
+        # Numbers are never valid strings or enum values
+        cells = cells.tolist()
+        return self._coerce(rule, cells, len(cells), found, position, {})
+
+    def _check_bounds(self, rule: FieldRule, values, failed, cells, found: dict, position: int):
+        """Vectorized ge/gt/le/lt checks; the first violated bound is reported per row."""
+        import numpy as np
+
+        broken = np.zeros(len(failed), dtype=bool)
+        for key, kind, wording, check, limit in rule.bounds:
+            with np.errstate(invalid="ignore"):
+                bad = ~failed & ~broken & ~check(values, limit)
+            for row in np.flatnonzero(bad).tolist():
+                cell = cells[row] if cells is not None else None
+                if isinstance(cell, np.generic):
+                    cell = cell.item()
+                found.setdefault(row, []).append((position, _error(
+                    kind, rule.name, f"Input should be {wording} {_display(limit)}", cell, {key: limit}
+                )))
+            broken |= bad
+        return broken
+
+    @staticmethod
+    def _row_input(columns: dict, row: int) -> dict:
+        """The row as Pydantic sees it (used as the input of "missing" errors)."""
+        result = {}
+        for name, cells in columns.items():
+            cell = cells[row]
+            if cell is not MISSING:
+                result[name] = cell.item() if hasattr(cell, "item") else cell
+        return result
+
+
+@functools.lru_cache(maxsize=None)
+def compile_validator(model) -> ColumnValidator:
+    """Compiled ColumnValidator for a Pydantic model (cached per model)."""
+    return ColumnValidator(model)
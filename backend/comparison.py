@@ -0,0 +1,97 @@
+"""
+comparison.py - Side-by-Side Process Comparison
+
+Compares processes on the key ROIOutput fields shown by the Compare page.
+All processes are calculated in one batch pass (ResultSet), and every
+metric comes back as a column aligned with the process list, together with
+each process's rank and the pairwise differences between processes.
+
+Ranks are competition ranks (1, 2, 2, 4): processes with equal values
+share a rank. They are computed on the rounded values the response shows,
+so a tie on screen is a tie in the ranking. Payback with no viable return
+is reported as 999 months by the calculator and therefore ranks last.
+"""
+
+import time
+
+# Compared ROIOutput fields and whether higher values are better
+METRICS = (
+    ("roi_percentage", True),
+    ("payback_months", False),
+    ("net_annual_savings", True),
+    ("annual_savings", True),
+    ("five_year_savings", True),
+    ("implementation_cost", False),
+    ("annual_automation_cost", False),
+    ("total_cost_of_ownership", False),
+    ("annual_labor_cost", False),
+)
+
+# Processes per comparison (pairwise deltas grow with the square)
+MAX_PROCESSES = 50
+
+
+def _ranks(values, higher_is_better: bool) -> list:
+    """Competition rank of each value: 1 + the number of strictly better values."""
+    if higher_is_better:
+        better = values[None, :] > values[:, None]
+    else:
+        better = values[None, :] < values[:, None]
+    return (better.sum(axis=1) + 1).tolist()
+
+
+def compare(entries: list) -> dict:
+    """
+    Calculate and compare processes.
+
+    Args:
+        entries: Tuples of (id, name, validated ROIInput)
+
+    Returns:
+        Dict with processes (id, name, priority_score, confidence_level and
+        recommended_automation_type, in input order), metrics (per METRICS
+        field: values, ranks, higher_is_better, best id and deltas, where
+        deltas[i][j] is process j's value minus process i's) and evaluate_ms
+
+    Raises:
+        ValueError: With fewer than 2 or more than MAX_PROCESSES entries
+    """
+    import numpy as np
+    from result_set import ResultSet, _DECIMALS
+
+    if len(entries) < 2:
+        raise ValueError("At least 2 processes are needed for a comparison")
+    if len(entries) > MAX_PROCESSES:
+        raise ValueError(f"At most {MAX_PROCESSES} processes can be compared at once")
+
+    start = time.perf_counter()
+    results = ResultSet.from_inputs([inputs for _, _, inputs in entries])
+    ids = [entry_id for entry_id, _, _ in entries]
+
+    metrics = {}
+    for name, higher_is_better in METRICS:
+        decimals = _DECIMALS[name]
+        # Python's round(), as in ROIOutput, so values match /calculate exactly
+        values = [round(value, decimals) for value in results.column(name).tolist()]
+        column = np.array(values)
+        ranks = _ranks(column, higher_is_better)
+        # Differences of rounded values only need float noise removed
+        deltas = np.round(column[None, :] - column[:, None], decimals)
+        metrics[name] = {
+            "values": values,
+            "ranks": ranks,
+            "higher_is_better": higher_is_better,
+            "best": ids[ranks.index(1)],
+            "deltas": deltas.tolist(),
+        }
+
+    columns = {
+        name: results.column(name)
+        for name in ("priority_score", "confidence_level", "recommended_automation_type")
+    }
+    processes = [
+        {"id": entry_id, "name": name, **{field: values[index] for field, values in columns.items()}}
+        for index, (entry_id, name, _) in enumerate(entries)
+    ]
+    evaluate_ms = (time.perf_counter() - start) * 1000
+    return {"processes": processes, "metrics": metrics, "evaluate_ms": round(evaluate_ms, 3)}
@@ -6,10 +6,14 @@ Database file persists across Railway deployments via volumes.
 """
 
 import os
+import threading
 from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, declarative_base
 from contextlib import contextmanager
 
+from metrics import instrument_engine
+
 # Database URL - use environment variable or default to local file
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./projects.db")
 
@@ -19,6 +23,9 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
 )
 
+# Time every SQL statement for /metrics
+instrument_engine(engine)
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -26,14 +33,31 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+_initialized = False
+_init_lock = threading.Lock()
+
+
 def init_db():
-    """Create all tables. Call this on startup."""
-    Base.metadata.create_all(bind=engine)
+    """Create all tables. Safe to call more than once, from any thread."""
+    global _initialized
+    import project_models  # noqa: F401 - registers Project on Base.metadata
+    import api_key_models  # noqa: F401 - registers APIKey on Base.metadata
+    import snapshot_models  # noqa: F401 - registers Snapshot on Base.metadata
+    
+    with _init_lock:
+        try:
+            Base.metadata.create_all(bind=engine)
+        except OperationalError:
+            # Another worker process created the tables between check and create
+            Base.metadata.create_all(bind=engine)
+        _initialized = True
 
 
 @contextmanager
 def get_db():
     """Get a database session. Use as context manager."""
+    if not _initialized:
+        init_db()
     db = SessionLocal()
     try:
         yield db
@@ -42,7 +66,9 @@ def get_db():
 
 
 def get_db_session():
-    """Dependency for FastAPI endpoints."""
+    """Dependency for FastAPI endpoints. Creates tables on first use."""
+    if not _initialized:
+        init_db()
     db = SessionLocal()
     try:
         yield db
@@ -0,0 +1,398 @@
+"""
+incremental.py - Incremental ROI Recalculation
+
+The calculation expressed as a dependency graph: every node (runs_per_year,
+annual_error_cost, five_year_savings, the narrative...) declares the ROIInput
+fields and the other nodes it reads. After a slider change only the nodes
+downstream of the changed fields are recomputed; everything else is reused
+from the previous result.
+
+Results are kept per worker under an opaque token, so the client sends
+{token, changes} instead of the whole form and gets back only the outputs
+that changed. Tokens are evicted LRU; a client
+holding an unknown token (evicted, or served by another worker) resends the
+full inputs without a token.
+
+The node functions call the same helpers as calculator.calculate_roi, so
+both paths produce identical results.
+"""
+
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from models import ROIInput
+from metrics import record_cache, stage_timer
+from calculator import (
+    CalculatorConfig,
+    calculate_periods_per_year,
+    _calculate_labor_cost,
+    _calculate_error_cost,
+    _calculate_sla_cost,
+    _calculate_license_cost,
+    _calculate_ai_cost,
+    _calculate_savings,
+    _calculate_payback,
+    _calculate_roi_percentage,
+    _calculate_five_year_value,
+    _generate_recommendation,
+    _assess_confidence,
+    _build_assumptions_list,
+    _recommend_automation_type,
+    _generate_executive_summary,
+)
+
+# Results kept per worker for delta requests
+RESULT_CACHE_MAX_ENTRIES = 5000
+
+config = CalculatorConfig()
+
+
+# =============================================================================
+# DEPENDENCY GRAPH
+# =============================================================================
+
+class Node:
+    """One computed value, with the input fields and nodes it reads."""
+
+    __slots__ = ("name", "fields", "depends_on", "compute")
+
+    def __init__(self, name: str, fields: tuple, depends_on: tuple, compute):
+        self.name = name
+        self.fields = fields
+        self.depends_on = depends_on
+        self.compute = compute
+
+
+# Nodes in evaluation (topological) order
+NODES = []
+
+
+def node(name: str, fields: tuple = (), depends_on: tuple = ()):
+    """Register compute(inputs, values) as a graph node."""
+    def decorator(compute):
+        known = {n.name for n in NODES}
+        missing = [d for d in depends_on if d not in known]
+        if missing:
+            raise ValueError(f"Node {name} depends on undefined nodes {missing}")
+        NODES.append(Node(name, tuple(fields), tuple(depends_on), compute))
+        return compute
+    return decorator
+
+
+@node("runs_per_year", fields=("frequency", "working_days_per_year", "hours_per_day", "runs_per_period"))
+def _runs_per_year(inputs, v):
+    periods = calculate_periods_per_year(inputs.frequency, inputs.working_days_per_year, inputs.hours_per_day)
+    return inputs.runs_per_period * periods
+
+
+@node("annual_labor_cost", fields=("hours_per_run", "staff_count", "hourly_rate"), depends_on=("runs_per_year",))
+def _labor(inputs, v):
+    return _calculate_labor_cost(inputs, v["runs_per_year"])
+
+
+@node("annual_error_cost", fields=("error_rate", "error_fix_cost", "error_fix_hours", "hourly_rate"),
+      depends_on=("runs_per_year",))
+def _error(inputs, v):
+    return _calculate_error_cost(inputs, v["runs_per_year"])
+
+
+@node("annual_sla_cost", fields=("has_sla", "sla_breaches_year", "sla_penalty"))
+def _sla(inputs, v):
+    return _calculate_sla_cost(inputs)
+
+
+@node("annual_tool_cost", fields=("current_tool_cost",))
+def _tool(inputs, v):
+    return inputs.current_tool_cost
+
+
+@node("total_current_cost",
+      depends_on=("annual_labor_cost", "annual_error_cost", "annual_sla_cost", "annual_tool_cost"))
+def _total_current(inputs, v):
+    return v["annual_labor_cost"] + v["annual_error_cost"] + v["annual_sla_cost"] + v["annual_tool_cost"]
+
+
+@node("annual_savings",
+      fields=("expected_labor_reduction", "expected_error_reduction", "expected_sla_improvement"),
+      depends_on=("annual_labor_cost", "annual_error_cost", "annual_sla_cost", "annual_tool_cost"))
+def _savings(inputs, v):
+    return _calculate_savings(
+        v["annual_labor_cost"], v["annual_error_cost"], v["annual_sla_cost"], v["annual_tool_cost"], inputs, config
+    )
+
+
+@node("automation_savings_percent", depends_on=("annual_savings", "total_current_cost"))
+def _savings_percent(inputs, v):
+    total = v["total_current_cost"]
+    return (v["annual_savings"] / total * 100) if total > 0 else 0
+
+
+@node("annual_ai_cost", fields=("ai_model", "ai_input_tokens_per_run", "ai_output_tokens_per_run"),
+      depends_on=("runs_per_year",))
+def _ai_cost(inputs, v):
+    return _calculate_ai_cost(inputs, v["runs_per_year"])
+
+
+@node("annual_automation_cost", fields=("software_license_cost", "automation_platform", "annual_maintenance_cost"),
+      depends_on=("runs_per_year", "annual_ai_cost"))
+def _automation_cost(inputs, v):
+    return _calculate_license_cost(inputs, v["runs_per_year"]) + inputs.annual_maintenance_cost + v["annual_ai_cost"]
+
+
+@node("net_annual_savings", depends_on=("annual_savings", "annual_automation_cost"))
+def _net_savings(inputs, v):
+    return v["annual_savings"] - v["annual_automation_cost"]
+
+
+@node("total_cost_of_ownership", fields=("implementation_cost",), depends_on=("annual_automation_cost",))
+def _tco(inputs, v):
+    return inputs.implementation_cost + (v["annual_automation_cost"] * 5)
+
+
+@node("payback_months", fields=("implementation_cost",), depends_on=("net_annual_savings",))
+def _payback(inputs, v):
+    return _calculate_payback(inputs.implementation_cost, v["net_annual_savings"])
+
+
+@node("roi_percentage", fields=("implementation_cost",), depends_on=("net_annual_savings",))
+def _roi(inputs, v):
+    return _calculate_roi_percentage(v["net_annual_savings"], inputs.implementation_cost)
+
+
+@node("five_year_savings", fields=("implementation_cost", "volume_growth"),
+      depends_on=("annual_savings", "annual_automation_cost"))
+def _five_year(inputs, v):
+    return _calculate_five_year_value(
+        v["annual_savings"], v["annual_automation_cost"], inputs.implementation_cost, inputs.volume_growth
+    )
+
+
+@node("recommendation", depends_on=("payback_months", "roi_percentage", "net_annual_savings"))
+def _recommendation(inputs, v):
+    return _generate_recommendation(v["payback_months"], v["roi_percentage"], v["net_annual_savings"], config)
+
+
+@node("confidence_level",
+      fields=("error_rate", "error_fix_cost", "has_sla", "sla_penalty", "current_tool_cost", "volume_growth"))
+def _confidence(inputs, v):
+    return _assess_confidence(inputs)
+
+
+@node("assumptions",
+      fields=("expected_labor_reduction", "expected_error_reduction", "expected_sla_improvement",
+              "working_days_per_year", "hours_per_day", "volume_growth",
+              "automation_platform", "frequency", "runs_per_period",
+              "ai_model", "ai_input_tokens_per_run", "ai_output_tokens_per_run"))
+def _assumptions(inputs, v):
+    return _build_assumptions_list(inputs, config)
+
+
+@node("automation_type", fields=("error_rate", "hours_per_run", "frequency"), depends_on=("runs_per_year",))
+def _automation_type(inputs, v):
+    return _recommend_automation_type(inputs, v["runs_per_year"])
+
+
+@node("executive_summary",
+      fields=("process_name", "hours_per_run", "staff_count", "error_rate", "has_sla", "sla_breaches_year"),
+      depends_on=("net_annual_savings", "payback_months", "recommendation", "total_current_cost",
+                  "annual_labor_cost", "runs_per_year", "automation_type"))
+def _executive_summary(inputs, v):
+    automation_type, automation_reasoning = v["automation_type"]
+    return _generate_executive_summary(
+        inputs=inputs,
+        net_annual_savings=v["net_annual_savings"],
+        payback_months=v["payback_months"],
+        priority_score=v["recommendation"][0],
+        total_current_cost=v["total_current_cost"],
+        annual_labor_cost=v["annual_labor_cost"],
+        runs_per_year=v["runs_per_year"],
+        automation_type=automation_type,
+        automation_reasoning=automation_reasoning,
+    )
+
+
+def _build_field_dependents() -> dict:
+    """Map each ROIInput field to every node it affects, directly or transitively."""
+    dependents = {name: set() for name in ROIInput.model_fields}
+    affected_by_node = {}
+    for n in NODES:
+        affected = {n.name}
+        for field in n.fields:
+            dependents[field].add(n.name)
+        affected_by_node[n.name] = affected
+    # Walk in reverse topological order so downstream sets are complete
+    for n in reversed(NODES):
+        for upstream in n.depends_on:
+            affected_by_node[upstream] |= affected_by_node[n.name]
+    return {
+        field: set().union(*(affected_by_node[name] for name in names)) if names else set()
+        for field, names in dependents.items()
+    }
+
+
+FIELD_DEPENDENTS = _build_field_dependents()
+
+
+def evaluate(inputs: ROIInput, values: Optional[dict] = None, dirty: Optional[set] = None) -> tuple[dict, list]:
+    """
+    Evaluate the graph. With previous `values` and a `dirty` set only those
+    nodes are recomputed.
+
+    Returns:
+        Tuple of (node values, names of recomputed nodes)
+    """
+    if values is None:
+        values = {}
+        recomputed = [n.name for n in NODES]
+        for n in NODES:
+            values[n.name] = n.compute(inputs, values)
+        return values, recomputed
+
+    values = dict(values)
+    recomputed = []
+    for n in NODES:
+        if n.name in dirty:
+            values[n.name] = n.compute(inputs, values)
+            recomputed.append(n.name)
+    return values, recomputed
+
+
+def to_output(inputs: ROIInput, v: dict) -> dict:
+    """Shape node values like ROIOutput (same rounding and float types as calculate_roi)."""
+    priority_score, recommendation = v["recommendation"]
+    automation_type, automation_reasoning = v["automation_type"]
+    return {
+        "process_name": inputs.process_name,
+        "annual_labor_cost": round(float(v["annual_labor_cost"]), 2),
+        "annual_error_cost": round(float(v["annual_error_cost"]), 2),
+        "annual_sla_cost": round(float(v["annual_sla_cost"]), 2),
+        "annual_tool_cost": round(float(v["annual_tool_cost"]), 2),
+        "total_current_cost": round(float(v["total_current_cost"]), 2),
+        "automation_savings_percent": round(float(v["automation_savings_percent"]), 1),
+        "annual_savings": round(float(v["annual_savings"]), 2),
+        "implementation_cost": round(float(inputs.implementation_cost), 2),
+        "annual_automation_cost": round(float(v["annual_automation_cost"]), 2),
+        "net_annual_savings": round(float(v["net_annual_savings"]), 2),
+        "total_cost_of_ownership": round(float(v["total_cost_of_ownership"]), 2),
+        "payback_months": round(float(v["payback_months"]), 1),
+        "roi_percentage": round(float(v["roi_percentage"]), 1),
+        "five_year_savings": round(float(v["five_year_savings"]), 2),
+        "priority_score": priority_score,
+        "recommendation": recommendation,
+        "confidence_level": v["confidence_level"],
+        "assumptions": v["assumptions"],
+        "executive_summary": v["executive_summary"],
+        "recommended_automation_type": automation_type,
+        "automation_type_reasoning": automation_reasoning,
+    }
+
+
+# =============================================================================
+# RESULT STORE
+# =============================================================================
+
+class ResultStore:
+    """LRU of token -> (inputs, node values, output) for delta requests."""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                self._entries.move_to_end(token)
+            return entry
+
+    def put(self, inputs: ROIInput, values: dict, output: dict) -> str:
+        token = secrets.token_urlsafe(12)
+        with self._lock:
+            self._entries[token] = (inputs, values, output)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return token
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+result_store = ResultStore()
+
+
+class UnknownResultToken(KeyError):
+    """The token was evicted or issued by another worker."""
+
+
+def calculate(inputs: ROIInput) -> dict:
+    """Full calculation that also stores a token for later deltas."""
+    values, recomputed = evaluate(inputs)
+    output = to_output(inputs, values)
+    return {
+        "token": result_store.put(inputs, values, output),
+        "result": output,
+        "recomputed": recomputed,
+    }
+
+
+def apply_changes(state: tuple, changes: dict) -> tuple[tuple, dict, list]:
+    """
+    Apply changed fields to a (inputs, node values, output) state and
+    recompute only the affected nodes.
+
+    Returns:
+        Tuple of (new state, changed output fields, recomputed node names)
+
+    Raises:
+        ValueError for fields that are not ROIInput fields
+        pydantic.ValidationError if a changed value is invalid
+    """
+    unknown = [field for field in changes if field not in ROIInput.model_fields]
+    if unknown:
+        raise ValueError(f"Unknown input fields: {', '.join(sorted(unknown))}")
+
+    previous_inputs, previous_values, previous_output = state
+    # Validate only the changed fields against their Field constraints
+    inputs = previous_inputs.model_copy()
+    with stage_timer("calculator", "validation"):
+        for field, value in changes.items():
+            ROIInput.__pydantic_validator__.validate_assignment(inputs, field, value)
+
+    dirty = set()
+    for field in changes:
+        old, new = getattr(previous_inputs, field), getattr(inputs, field)
+        # 70 vs 70.0 compare equal but render differently in the narrative
+        if old != new or type(old) is not type(new):
+            dirty |= FIELD_DEPENDENTS[field]
+
+    values, recomputed = evaluate(inputs, previous_values, dirty)
+    output = to_output(inputs, values) if recomputed else previous_output
+    changed = {key: value for key, value in output.items() if previous_output[key] != value}
+    return (inputs, values, output), changed, recomputed
+
+
+def calculate_delta(token: str, changes: dict) -> dict:
+    """
+    Apply changed fields to a stored result and recompute only affected nodes.
+    Only the output fields whose values changed are returned.
+
+    Raises:
+        UnknownResultToken if the token is not in this worker's store
+        ValueError for fields that are not ROIInput fields
+        pydantic.ValidationError if the merged inputs are invalid
+    """
+    entry = result_store.get(token)
+    record_cache("result_token", entry is not None)
+    if entry is None:
+        raise UnknownResultToken(token)
+
+    state, changed, recomputed = apply_changes(entry, changes)
+    return {
+        "token": result_store.put(*state),
+        "changed": changed,
+        "recomputed": recomputed,
+    }
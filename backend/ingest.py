@@ -0,0 +1,488 @@
+"""
+ingest.py - Process Inventory Ingestion
+
+Reads CSV or XLSX process inventories in chunks, maps their columns onto
+ROIInput fields, validates and scores every chunk column-wise, and either
+writes an enriched CSV or saves the valid rows as projects. Only one chunk
+is held in memory at a time.
+
+Schema (JSON, every key optional):
+    {
+        "columns": {
+            "process_name": "Process",
+            "hours_per_run": {"column": "Minutes per run", "unit": "minutes"},
+            "error_rate": {"column": "Error rate", "unit": "fraction"}
+        },
+        "defaults": {"frequency": "daily", "hourly_rate": 45}
+    }
+
+Fields without a mapping are matched to headers by name, ignoring case,
+spaces, dashes and dots; enum cells are read the same way, so "Claude
+Sonnet 4.5" is claude_sonnet_4_5. Units: hours, minutes, seconds
+(durations, converted to hours), percent, fraction (rates, converted to
+percent), dollars, thousands (amounts). Blank cells take the schema default, then the
+ROIInput default. Cells are validated with ROIInput's own rules (see
+column_validation.py), so a row is accepted exactly when /calculate would
+accept the same values.
+
+Rows are numbered as in the spreadsheet: the header is row 1.
+
+Usage:
+    python ingest.py inventory.csv --schema schema.json --out enriched.csv
+    python ingest.py inventory.xlsx --save
+"""
+
+import csv
+import io
+import json
+import uuid
+from typing import Iterator, Optional
+
+import batch
+import cancellation
+from column_validation import MISSING, compile_validator
+from models import ROIInput
+
+# Rows validated and scored together
+CHUNK_ROWS = 5000
+
+# Per-row errors included in a summary (all are written to enriched output)
+MAX_REPORTED_ERRORS = 100
+
+# Unit name -> multiplier into the ROIInput unit
+UNITS = {
+    "hours": 1.0,
+    "minutes": 1 / 60,
+    "seconds": 1 / 3600,
+    "percent": 1.0,
+    "fraction": 100.0,
+    "dollars": 1.0,
+    "thousands": 1000.0,
+}
+
+# Result columns (as saved with projects)
+OUTPUT_COLUMNS = batch.NUMERIC_OUTPUTS + ("priority_score", "confidence_level", "recommended_automation_type")
+ERRORS_COLUMN = "errors"
+
+# Result columns appended to enriched output; inputs echoed in the results
+# (implementation_cost) are already in the row
+ENRICHED_COLUMNS = tuple(name for name in OUTPUT_COLUMNS if name not in ROIInput.model_fields)
+_ENRICHED_INDEXES = [OUTPUT_COLUMNS.index(name) for name in ENRICHED_COLUMNS]
+
+# Prefix for appended columns whose name the input already uses
+RESULT_PREFIX = "result_"
+
+# One decimal place in ROIOutput, two everywhere else
+_ONE_DECIMAL = {"automation_savings_percent", "payback_months", "roi_percentage"}
+
+
+def _normalize(header: str) -> str:
+    return str(header).strip().lower().replace(" ", "_").replace("-", "_").replace(".", "_")
+
+
+# =============================================================================
+# SCHEMA
+# =============================================================================
+
+class Schema:
+    """Mapping from spreadsheet columns to ROIInput fields."""
+
+    def __init__(self, columns: Optional[dict] = None, defaults: Optional[dict] = None):
+        self.columns = {}
+        for field, spec in (columns or {}).items():
+            if field not in ROIInput.model_fields:
+                raise ValueError(f"Unknown field in schema: {field}")
+            if isinstance(spec, str):
+                spec = {"column": spec}
+            unit = spec.get("unit")
+            if unit is not None and unit not in UNITS:
+                raise ValueError(f"Unknown unit for {field}: {unit}")
+            self.columns[field] = (spec["column"], UNITS[unit] if unit else 1.0)
+        unknown = set(defaults or {}) - set(ROIInput.model_fields)
+        if unknown:
+            raise ValueError(f"Unknown field in schema defaults: {', '.join(sorted(unknown))}")
+        self.defaults = dict(defaults or {})
+
+    @classmethod
+    def from_json(cls, text: Optional[str]) -> "Schema":
+        if not text:
+            return cls()
+        try:
+            config = json.loads(text)
+        except ValueError as e:
+            raise ValueError(f"Schema is not valid JSON: {e}")
+        if not isinstance(config, dict):
+            raise ValueError("Schema must be a JSON object")
+        return cls(config.get("columns"), config.get("defaults"))
+
+    def resolve(self, header: list) -> dict:
+        """
+        Locate each field's column in a header row.
+
+        Returns:
+            Dict of field -> (column index or None, unit multiplier)
+
+        Raises:
+            ValueError: If a required field has no column and no default
+        """
+        positions = {_normalize(name): index for index, name in enumerate(header)}
+        resolved, missing = {}, []
+        for field in ROIInput.model_fields:
+            column, scale = self.columns.get(field, (field, 1.0))
+            index = positions.get(_normalize(column))
+            required = ROIInput.model_fields[field].is_required()
+            if index is None and required and field not in self.defaults:
+                missing.append(f"{field} (column '{column}')")
+            resolved[field] = (index, scale)
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        return resolved
+
+
+# =============================================================================
+# READERS
+# =============================================================================
+
+def _chunked(rows: Iterator[list], chunk_rows: int) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_csv(stream, chunk_rows: int = CHUNK_ROWS) -> tuple[list, Iterator[list]]:
+    """
+    Read a CSV from a binary or text stream.
+
+    Returns:
+        Tuple of (header, iterator of row chunks)
+    """
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if not header:
+        raise ValueError("The file is empty")
+    return header, _chunked(reader, chunk_rows)
+
+
+def read_xlsx(stream, chunk_rows: int = CHUNK_ROWS) -> tuple[list, Iterator[list]]:
+    """
+    Read the first worksheet of an XLSX workbook in streaming mode.
+
+    Returns:
+        Tuple of (header, iterator of row chunks)
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX ingestion requires openpyxl (pip install openpyxl)")
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    rows = (
+        ["" if cell is None else str(cell) for cell in row]
+        for row in workbook.worksheets[0].iter_rows(values_only=True)
+    )
+    header = next(rows, None)
+    if not header:
+        raise ValueError("The worksheet is empty")
+    return header, _chunked(rows, chunk_rows)
+
+
+READERS = {"csv": read_csv, "xlsx": read_xlsx}
+
+
+# =============================================================================
+# PARSING, VALIDATION AND SCORING
+# =============================================================================
+
+class Chunk:
+    """One block of rows with parsed columns, per-row errors and results."""
+
+    __slots__ = ("first_row", "rows", "columns", "errors", "valid", "results")
+
+    def __init__(self, first_row: int, rows: list):
+        self.first_row = first_row
+        self.rows = rows
+        self.columns = {}
+        self.errors = {}  # row offset -> list of "field: message"
+        self.valid = None
+        self.results = None
+
+    def add_error(self, offset: int, field: str, message: str) -> None:
+        self.errors.setdefault(offset, []).append(f"{field}: {message}")
+
+    def row_number(self, offset: int) -> int:
+        return self.first_row + offset
+
+    def result_rows(self) -> list:
+        """OUTPUT_COLUMNS values for each valid row, rounded like ROIOutput."""
+        r = self.results
+        columns = [
+            [round(x, 1 if name in _ONE_DECIMAL else 2) for x in r[name].tolist()]
+            for name in batch.NUMERIC_OUTPUTS
+        ]
+        columns.append([batch.PRIORITY_LEVELS[code] for code in r["priority"].tolist()])
+        columns.append([batch.CONFIDENCE_LEVELS[code] for code in r["confidence"].tolist()])
+        columns.append(batch.automation_type_labels(
+            r["automation_primary"], r["automation_secondary"], r["automation_hybrid"]
+        ))
+        return [list(row) for row in zip(*columns)]
+
+    def input_rows(self) -> list:
+        """ROIInput-shaped dicts for each valid row."""
+        import numpy as np
+
+        keep = np.flatnonzero(self.valid)
+        columns = {}
+        for rule in compile_validator(ROIInput).rules:
+            values = self.columns[rule.name]
+            if rule.kind == "str":
+                columns[rule.name] = [values[offset] for offset in keep.tolist()]
+            elif rule.kind == "enum":
+                members = list(rule.members)
+                columns[rule.name] = [members[code] if code >= 0 else None for code in values[keep].tolist()]
+            else:
+                columns[rule.name] = values[keep].tolist()
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def parse_chunk(chunk: Chunk, resolved: dict, schema: Schema) -> None:
+    """Fill chunk.columns from its raw rows and record validation errors."""
+    import numpy as np
+
+    n = len(chunk.rows)
+    validator = compile_validator(ROIInput)
+    columns, scales = {}, {}
+    for rule in validator.rules:
+        index, scale = resolved[rule.name]
+        if index is None:
+            cells = [""] * n
+        else:
+            cells = [row[index].strip() if index < len(row) else "" for row in chunk.rows]
+        if rule.kind in ("int", "float"):
+            # Spreadsheet exports often keep currency formatting
+            cells = [cell.replace(",", "").lstrip("$") for cell in cells]
+        elif rule.kind == "enum":
+            cells = [_normalize(cell) for cell in cells]
+        default = schema.defaults.get(rule.name, MISSING)
+        columns[rule.name] = [cell if cell else default for cell in cells]
+        if scale != 1.0:
+            # Defaults are already in ROIInput units
+            scales[rule.name] = np.where([bool(cell) for cell in cells], scale, 1.0)
+
+    result = validator.validate(columns, rows=n, scales=scales)
+    chunk.columns = result.columns
+    chunk.valid = result.valid
+    for offset, errors in result.errors.items():
+        for error in errors:
+            chunk.add_error(offset, error["loc"][0], error["msg"])
+
+
+def score_chunk(chunk: Chunk) -> None:
+    """Run the batch engine over the chunk's valid rows."""
+    import numpy as np
+
+    keep = np.flatnonzero(chunk.valid)
+    columns = {
+        name: values[keep]
+        for name, values in chunk.columns.items()
+        if name != "process_name"
+    }
+    chunk.results = batch.calculate_batch(columns)
+
+
+def iter_chunks(stream, format: str = "csv", schema: Optional[Schema] = None,
+                chunk_rows: int = CHUNK_ROWS) -> tuple[list, Iterator[Chunk]]:
+    """
+    Open an inventory and return its header plus an iterator of scored chunks.
+
+    The header is read and the schema resolved immediately, so a bad file
+    or mapping fails before any output is produced.
+
+    Raises:
+        ValueError: On an unsupported format, empty file or unmapped required field
+    """
+    if format not in READERS:
+        raise ValueError(f"format must be one of {', '.join(READERS)}")
+    schema = schema or Schema()
+    header, row_chunks = READERS[format](stream, chunk_rows)
+    resolved = schema.resolve(header)
+
+    def chunks():
+        first_row = 2
+        for rows in row_chunks:
+            cancellation.check("ingest")
+            chunk = Chunk(first_row, rows)
+            parse_chunk(chunk, resolved, schema)
+            score_chunk(chunk)
+            first_row += len(rows)
+            yield chunk
+
+    return header, chunks()
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def enriched_header(header: list) -> list:
+    """
+    Input header plus the appended result and error columns. An appended
+    column whose name the input already has (e.g. re-uploaded enriched
+    output) gets RESULT_PREFIX, so every column name stays unique.
+    """
+    taken = {str(name) for name in header}
+    appended = []
+    for name in ENRICHED_COLUMNS + (ERRORS_COLUMN,):
+        while name in taken:
+            name = RESULT_PREFIX + name
+        taken.add(name)
+        appended.append(name)
+    return list(header) + appended
+
+
+def enriched_csv(header: list, chunks: Iterator[Chunk]) -> Iterator[str]:
+    """
+    Yield the input rows as CSV text with result and error columns appended,
+    one block per chunk.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    blank = [""] * len(ENRICHED_COLUMNS)
+    width = len(header)
+
+    writer.writerow(enriched_header(header))
+    for chunk in chunks:
+        results = iter(chunk.result_rows())
+        for offset, row in enumerate(chunk.rows):
+            row = row + [""] * (width - len(row))
+            if chunk.valid[offset]:
+                values = next(results)
+                writer.writerow(row + [values[index] for index in _ENRICHED_INDEXES] + [""])
+            else:
+                writer.writerow(row + blank + ["; ".join(chunk.errors[offset])])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _summarize(summary: dict, chunk: Chunk) -> None:
+    summary["rows"] += len(chunk.rows)
+    summary["valid"] += int(chunk.valid.sum())
+    for offset, messages in chunk.errors.items():
+        if len(summary["errors"]) >= MAX_REPORTED_ERRORS:
+            break
+        summary["errors"].append({"row": chunk.row_number(offset), "errors": messages})
+
+
+def save_projects(chunks: Iterator[Chunk], db) -> dict:
+    """
+    Insert every valid row as a project, one transaction per chunk.
+
+    Returns:
+        Summary with row, valid, invalid and saved counts plus the first
+        MAX_REPORTED_ERRORS row errors
+    """
+    from sqlalchemy import insert
+    import project_sync
+    from project_models import Project
+
+    summary = {"rows": 0, "valid": 0, "saved": 0, "errors": []}
+    for chunk in chunks:
+        _summarize(summary, chunk)
+        records = []
+        for inputs, values in zip(chunk.input_rows(), chunk.result_rows()):
+            results = {"process_name": inputs["process_name"], **dict(zip(OUTPUT_COLUMNS, values))}
+            records.append({
+                "id": str(uuid.uuid4()),
+                "name": inputs["process_name"],
+                "inputs": inputs,
+                "results": results,
+                "scenarios": {"base": {"inputs": inputs, "results": results}},
+            })
+        if not records:
+            continue
+        try:
+            db.execute(insert(Project), records)
+            project_sync.record_changes(db, [record["id"] for record in records])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        summary["saved"] += len(records)
+
+    summary["invalid"] = summary["rows"] - summary["valid"]
+    return summary
+
+
+def write_enriched(header: list, chunks: Iterator[Chunk], out) -> dict:
+    """Write enriched CSV to a text stream and return a summary like save_projects() (without saved)."""
+    summary = {"rows": 0, "valid": 0, "errors": []}
+
+    def counted():
+        for chunk in chunks:
+            _summarize(summary, chunk)
+            yield chunk
+
+    for block in enriched_csv(header, counted()):
+        out.write(block)
+    summary["invalid"] = summary["rows"] - summary["valid"]
+    return summary
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main() -> None:
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(description="Score a process inventory (CSV/XLSX)")
+    parser.add_argument("path", help="Inventory file (.csv or .xlsx)")
+    parser.add_argument("--schema", help="JSON schema file mapping columns to fields")
+    parser.add_argument("--out", help="Enriched CSV to write (default: stdout)")
+    parser.add_argument("--save", action="store_true", help="Save valid rows as projects instead")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    schema = Schema()
+    if args.schema:
+        with open(args.schema) as f:
+            schema = Schema.from_json(f.read())
+    format = "xlsx" if args.path.lower().endswith((".xlsx", ".xlsm")) else "csv"
+
+    start = time.perf_counter()
+    with open(args.path, "rb") as f:
+        try:
+            header, chunks = iter_chunks(f, format, schema, args.chunk_rows)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.save:
+            from database import SessionLocal, init_db
+
+            init_db()
+            db = SessionLocal()
+            try:
+                summary = save_projects(chunks, db)
+            finally:
+                db.close()
+        elif args.out:
+            with open(args.out, "w", newline="") as out:
+                summary = write_enriched(header, chunks, out)
+        else:
+            summary = write_enriched(header, chunks, sys.stdout)
+
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+live.py - Live Recalculation over WebSocket
+
+Keeps one session's ROIInput on the server while the user drags sliders on
+the Calculator or Playground page. The client sends small field patches and
+gets back only the outputs that changed.
+
+Protocol (JSON messages):
+    -> {"type": "init", "seq": 1, "inputs": {...full ROIInput...}}
+    <- {"type": "result", "seq": 1, "result": {...ROIOutput...}}
+    -> {"type": "patch", "seq": 2, "changes": {"hourly_rate": 55}}
+    <- {"type": "diff", "seq": 2, "changed": {...}, "coalesced": 1}
+    <- {"type": "error", "seq": n, "detail": ...}
+
+Patches that arrive while an update is being computed or sent are merged,
+so the server only computes the latest state; `seq` echoes the newest
+message included and `coalesced` counts how many were merged. A failed patch
+leaves the session state unchanged.
+
+Calculations and the connect quota check (a storage write) run in the thread
+pool, so the event loop keeps receiving (and merging) patches meanwhile and
+other connections are not stalled. An unexpected error ends the session with
+an error frame and close code 1011.
+"""
+
+import asyncio
+import json
+import logging
+
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+import incremental
+from metrics import LIVE_SESSIONS, LIVE_UPDATES, stage_timer
+from models import ROIInput
+from rate_limiting import hit_quota
+
+# New live sessions per client IP (messages within a session are not limited)
+LIVE_CONNECT_LIMIT = "20/minute"
+
+# WebSocket close codes (RFC 6455)
+POLICY_VIOLATION = 1008
+INTERNAL_ERROR = 1011
+
+logger = logging.getLogger(__name__)
+
+
+class LiveSession:
+    """One WebSocket connection and the calculator state behind it."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.state = None
+        # Pending work: full inputs from an init and/or merged patch fields
+        self.pending_inputs = None
+        self.pending_changes = {}
+        self.pending_seq = None
+        self.pending_count = 0
+        self.wakeup = asyncio.Event()
+
+    async def run(self) -> None:
+        client = self.websocket.client.host if self.websocket.client else "unknown"
+        if not await run_in_threadpool(hit_quota, LIVE_CONNECT_LIMIT, "live", client):
+            await self.websocket.close(code=POLICY_VIOLATION, reason="Too many live sessions")
+            return
+
+        await self.websocket.accept()
+        LIVE_SESSIONS.inc()
+        worker = asyncio.create_task(self._compute_loop())
+        try:
+            while True:
+                await self._enqueue(await self.websocket.receive_text())
+        except (WebSocketDisconnect, RuntimeError):
+            # RuntimeError: the compute loop closed the socket after a failure
+            pass
+        finally:
+            worker.cancel()
+            LIVE_SESSIONS.dec()
+
+    async def _enqueue(self, text: str) -> None:
+        try:
+            message = json.loads(text)
+            kind = message["type"]
+        except (ValueError, TypeError, KeyError):
+            await self._send_error(None, "Messages must be JSON objects with a type")
+            return
+
+        seq = message.get("seq")
+        fields = message.get("inputs" if kind == "init" else "changes") or {}
+        if kind not in ("init", "patch"):
+            await self._send_error(seq, f"Unknown message type: {kind}")
+            return
+        if not isinstance(fields, dict):
+            await self._send_error(seq, "inputs and changes must be JSON objects")
+            return
+
+        if kind == "init":
+            # A new baseline replaces anything still queued
+            self.pending_inputs = fields
+            self.pending_changes = {}
+        else:
+            self.pending_changes.update(fields)
+
+        self.pending_seq = seq
+        self.pending_count += 1
+        self.wakeup.set()
+
+    async def _compute_loop(self) -> None:
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+
+            inputs, changes, seq, count = (
+                self.pending_inputs, self.pending_changes, self.pending_seq, self.pending_count
+            )
+            self.pending_inputs, self.pending_changes, self.pending_count = None, {}, 0
+            if count > 1:
+                LIVE_UPDATES.inc(count - 1, outcome="coalesced")
+
+            try:
+                reply = await run_in_threadpool(self._compute, inputs, changes, seq, count)
+            except ValidationError as e:
+                LIVE_UPDATES.inc(outcome="error")
+                await self._send_error(seq, e.errors(include_url=False, include_context=False))
+                continue
+            except ValueError as e:
+                LIVE_UPDATES.inc(outcome="error")
+                await self._send_error(seq, str(e))
+                continue
+            except Exception:
+                logger.exception("Live session calculation failed")
+                LIVE_UPDATES.inc(outcome="error")
+                await self._send_error(seq, "Internal error, please reconnect")
+                await self._close(INTERNAL_ERROR)
+                return
+
+            LIVE_UPDATES.inc(outcome="computed")
+            await self._send(reply)
+
+    def _compute(self, inputs, changes: dict, seq, count: int) -> dict:
+        if inputs is not None:
+            with stage_timer("calculator", "validation"):
+                validated = ROIInput.model_validate({**inputs, **changes})
+            values, _ = incremental.evaluate(validated)
+            output = incremental.to_output(validated, values)
+            self.state = (validated, values, output)
+            return {"type": "result", "seq": seq, "result": output}
+
+        if self.state is None:
+            raise ValueError("Send an init message with the full inputs first")
+        self.state, changed, _ = incremental.apply_changes(self.state, changes)
+        return {"type": "diff", "seq": seq, "changed": changed, "coalesced": count}
+
+    async def _send(self, message: dict) -> None:
+        try:
+            await self.websocket.send_json(message)
+        except (WebSocketDisconnect, RuntimeError):
+            # Client went away; the receive loop ends the session
+            pass
+
+    async def _close(self, code: int) -> None:
+        try:
+            await self.websocket.close(code=code)
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+
+    async def _send_error(self, seq, detail) -> None:
+        await self._send({"type": "error", "seq": seq, "detail": detail})
@@ -0,0 +1,139 @@
+"""
+profiles.py - Traffic Profiles for the Load Test Harness
+
+Each profile is a weighted mix of operations modelled on how the frontend
+uses the API. An operation is an async function taking (client, user) and
+returning the httpx response; `user` holds per-virtual-user state such as the
+projects that user has saved.
+"""
+
+import base64
+import random
+from io import BytesIO
+
+FREQUENCIES = ["hourly", "daily", "weekly", "biweekly", "monthly"]
+
+
+def random_input(rng: random.Random) -> dict:
+    """A plausible ROIInput payload, like one typed into the Calculator page."""
+    return {
+        "process_name": rng.choice(["Invoice Processing", "Employee Onboarding", "Monthly Reporting",
+                                    "Order Entry", "Expense Approval"]),
+        "frequency": rng.choice(FREQUENCIES),
+        "runs_per_period": rng.randint(1, 50),
+        "hours_per_run": round(rng.uniform(0.1, 4), 2),
+        "staff_count": rng.randint(1, 10),
+        "hourly_rate": rng.randint(25, 120),
+        "error_rate": rng.randint(0, 20),
+        "error_fix_cost": rng.randint(0, 200),
+        "current_tool_cost": rng.randint(0, 5000),
+        "implementation_cost": rng.randint(2000, 80000),
+        "software_license_cost": rng.randint(0, 6000),
+        "annual_maintenance_cost": rng.randint(0, 3000),
+        "volume_growth": rng.randint(0, 25),
+    }
+
+
+def _make_logo() -> str:
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    image = Image.new("RGB", (600, 180), (15, 118, 110))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+LOGO_BASE64 = _make_logo()
+
+
+# =============================================================================
+# OPERATIONS
+# =============================================================================
+
+async def calculate(client, user):
+    return await client.post("/calculate", json=random_input(user.rng))
+
+
+async def health(client, user):
+    return await client.get("/health")
+
+
+async def pdf_plain(client, user):
+    return await client.post("/generate-pdf", json=random_input(user.rng))
+
+
+async def pdf_branded(client, user):
+    payload = {
+        **random_input(user.rng),
+        "company_name": "Acme Corp",
+        "brand_color": "#0f766e",
+        "logo_base64": LOGO_BASE64,
+    }
+    return await client.post("/generate-pdf", json=payload)
+
+
+async def list_projects(client, user):
+    return await client.get("/projects")
+
+
+async def save_project(client, user):
+    inputs = random_input(user.rng)
+    calc = await client.post("/calculate", json=inputs)
+    results = calc.json() if calc.status_code == 200 else {}
+    response = await client.post("/projects", json={"name": inputs["process_name"], "inputs": inputs, "results": results})
+    if response.status_code == 200:
+        user.project_ids.append(response.json()["id"])
+    return response
+
+
+async def update_project(client, user):
+    if not user.project_ids:
+        return await save_project(client, user)
+    project_id = user.rng.choice(user.project_ids)
+    inputs = random_input(user.rng)
+    return await client.put(f"/projects/{project_id}", json={"name": inputs["process_name"], "inputs": inputs,
+                                                              "results": {}, "scenarios": {}})
+
+
+async def delete_project(client, user):
+    if not user.project_ids:
+        return await list_projects(client, user)
+    project_id = user.project_ids.pop(user.rng.randrange(len(user.project_ids)))
+    return await client.delete(f"/projects/{project_id}")
+
+
+async def contact(client, user):
+    return await client.post("/contact", json={
+        "name": "Load Test",
+        "email": "loadtest@example.com",
+        "company": "Acme Corp",
+        "message": "Interested in an automation assessment.",
+        "recaptcha_token": "stub-token",
+    })
+
+
+# =============================================================================
+# PROFILES: name -> [(operation, weight)]
+# =============================================================================
+
+PROFILES = {
+    # Slider-driven what-if sessions on the Calculator page
+    "calculate": [(calculate, 95), (health, 5)],
+    # Teams exporting branded reports at the same time
+    "pdf_burst": [(pdf_branded, 70), (pdf_plain, 20), (calculate, 10)],
+    # Portfolio page: load the list, save and edit projects
+    "portfolio": [(list_projects, 50), (save_project, 25), (update_project, 15), (delete_project, 10)],
+    # Contact form submissions (reCAPTCHA is stubbed by the harness)
+    "contact": [(contact, 100)],
+    # Blend of everything, weighted towards calculation
+    "mixed": [(calculate, 60), (pdf_branded, 8), (pdf_plain, 7), (list_projects, 12), (save_project, 6),
+              (update_project, 3), (contact, 2), (health, 2)],
+}
+
+
+def pick(profile: list, rng: random.Random):
+    """Choose an operation from a weighted profile."""
+    operations, weights = zip(*profile)
+    return rng.choices(operations, weights=weights, k=1)[0]
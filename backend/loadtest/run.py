@@ -0,0 +1,251 @@
+"""
+run.py - Local Load Test Harness
+
+Boots the API with uvicorn, drives it with an asyncio closed-loop client
+(each virtual user sends its next request as soon as the last one returns),
+sweeps concurrency and worker counts, and reports throughput and latency so
+the saturation point per worker count can be read off the curve.
+
+Usage (from backend/):
+    python loadtest/run.py --profile mixed
+    python loadtest/run.py --profile pdf_burst --workers 1,2,4 --concurrency 1,4,16,64
+    python loadtest/run.py --profile calculate --url http://localhost:8007 --json out.json
+
+Profiles: calculate, pdf_burst, portfolio, contact, mixed (see profiles.py).
+
+While the harness owns the server it disables rate limiting, uses a fresh
+SQLite database and points reCAPTCHA verification at a local stub.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+LOADTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(LOADTEST_DIR)
+sys.path.insert(0, LOADTEST_DIR)
+
+from profiles import PROFILES, pick  # noqa: E402
+
+# A concurrency step is "saturated" when throughput grows less than this
+SATURATION_GAIN = 0.10
+
+
+# =============================================================================
+# LOCAL SERVERS
+# =============================================================================
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _RecaptchaStub(BaseHTTPRequestHandler):
+    """Always answers like a passing reCAPTCHA v3 verification."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"success": True, "score": 0.9}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_recaptcha_stub() -> tuple:
+    server = ThreadingHTTPServer(("127.0.0.1", _free_port()), _RecaptchaStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/siteverify"
+
+
+def start_app(workers: int, recaptcha_url: str, db_dir: str) -> tuple:
+    """Start uvicorn with `workers` processes and wait for /health."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "RATE_LIMIT_ENABLED": "false",
+        "RECAPTCHA_VERIFY_URL": recaptcha_url,
+        "DATABASE_URL": f"sqlite:///{os.path.join(db_dir, f'loadtest-{workers}.db')}",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/health", timeout=1).status_code == 200:
+                return proc, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"Server with {workers} worker(s) did not become healthy")
+
+
+# =============================================================================
+# LOAD GENERATION
+# =============================================================================
+
+class VirtualUser:
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.project_ids = []
+
+
+async def _user_loop(client, profile, user, stop_at: float, samples: list):
+    while time.perf_counter() < stop_at:
+        operation = pick(profile, user.rng)
+        start = time.perf_counter()
+        try:
+            response = await operation(client, user)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        samples.append((operation.__name__, time.perf_counter() - start, status))
+
+
+async def run_step(base_url: str, profile: list, concurrency: int, duration: float, warmup: float) -> dict:
+    """Run `concurrency` virtual users for `duration` seconds and summarize."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        users = [VirtualUser(seed=i) for i in range(concurrency)]
+        if warmup > 0:
+            stop_at = time.perf_counter() + warmup
+            await asyncio.gather(*(_user_loop(client, profile, u, stop_at, []) for u in users))
+
+        samples = []
+        start = time.perf_counter()
+        stop_at = start + duration
+        await asyncio.gather(*(_user_loop(client, profile, u, stop_at, samples) for u in users))
+        elapsed = time.perf_counter() - start
+
+    return summarize(samples, elapsed, concurrency)
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples: list, elapsed: float, concurrency: int) -> dict:
+    latencies = sorted(s[1] for s in samples)
+    errors = sum(1 for s in samples if s[2] == 0 or s[2] >= 500)
+    by_operation = {}
+    for name, latency, _ in samples:
+        by_operation.setdefault(name, []).append(latency)
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "operations": {
+            name: {"count": len(values), "p50_ms": round(statistics.median(values) * 1000, 1)}
+            for name, values in sorted(by_operation.items())
+        },
+    }
+
+
+def find_saturation(steps: list) -> dict:
+    """
+    The saturation point is the last concurrency level where adding users
+    still raised throughput by at least SATURATION_GAIN.
+    """
+    if not steps:
+        return {}
+    best = steps[0]
+    for previous, current in zip(steps, steps[1:]):
+        if previous["throughput_rps"] and (
+            current["throughput_rps"] - previous["throughput_rps"]
+        ) / previous["throughput_rps"] < SATURATION_GAIN:
+            break
+        best = current
+    return {"concurrency": best["concurrency"], "throughput_rps": best["throughput_rps"], "p95_ms": best["p95_ms"]}
+
+
+def print_curve(workers, steps: list, saturation: dict) -> None:
+    label = f"{workers} worker(s)" if workers else "external server"
+    print(f"\n== {label} ==")
+    print(f"{'users':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for s in steps:
+        print(f"{s['concurrency']:>6} {s['throughput_rps']:>9.1f} {s['p50_ms']:>9.1f} "
+              f"{s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['error_rate'] * 100:>7.1f}%")
+    if saturation:
+        print(f"Saturation: ~{saturation['throughput_rps']} req/s at {saturation['concurrency']} users "
+              f"(p95 {saturation['p95_ms']} ms)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sweep concurrency against the ROI API")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--workers", default="1", help="Comma-separated uvicorn worker counts to test")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32,64", help="Comma-separated virtual user counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds measured per step")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each step")
+    parser.add_argument("--url", help="Test an already running server instead of booting one")
+    parser.add_argument("--json", dest="json_path", help="Write the full results to this JSON file")
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    levels = [int(c) for c in args.concurrency.split(",")]
+    results = {"profile": args.profile, "duration_s": args.duration, "runs": []}
+
+    if args.url:
+        worker_counts = [None]
+    else:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+        stub, recaptcha_url = start_recaptcha_stub()
+        db_dir = tempfile.mkdtemp(prefix="roi-loadtest-")
+
+    for workers in worker_counts:
+        proc = None
+        base_url = args.url
+        if workers is not None:
+            proc, base_url = start_app(workers, recaptcha_url, db_dir)
+        try:
+            steps = [asyncio.run(run_step(base_url, profile, c, args.duration, args.warmup)) for c in levels]
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=10)
+        saturation = find_saturation(steps)
+        print_curve(workers, steps, saturation)
+        results["runs"].append({"workers": workers, "steps": steps, "saturation": saturation})
+
+    if not args.url:
+        stub.shutdown()
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
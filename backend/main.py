@@ -5,33 +5,48 @@ Web server that exposes the ROI calculator as an API.
 Configuration:
     Set REQUIRE_AUTH=true to enable JWT authentication
     Set RECAPTCHA_SECRET_KEY for production reCAPTCHA verification
+    Set WARMUP_ON_STARTUP=true to load PDF/DB/HTTP dependencies before serving
+    Set RATE_LIMIT_STORAGE_URI=sqlite:///./ratelimits.db to share limits across workers
+    Set ADMIN_TOKEN to enable admin endpoints (API keys, request profiles)
+    Set SINGLEFLIGHT_DIR to coalesce identical PDF renders across workers
+    Set ADMISSION_CAPACITY (default 8 per CPU) / ADMISSION_TARGET_MS to tune load shedding (ADMISSION_ENABLED=false disables it)
     By default, auth is disabled for simplicity
+
+Heavy dependencies (ReportLab, PIL, httpx, SQLAlchemy) are imported on first
+use so that cold starts only pay for what /calculate and /health need.
 """
 
 import os
-import httpx
-from typing import Optional
-from fastapi import FastAPI, HTTPException, Depends, Request
-from fastapi.responses import Response
+from typing import Literal, Optional
+from fastapi import FastAPI, HTTPException, Depends, Request, WebSocket
+from fastapi.responses import Response, PlainTextResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from pydantic import BaseModel, EmailStr, Field
 from slowapi.errors import RateLimitExceeded
 
-from models import ROIInput, ROIOutput, PDFRequest
+from models import AIModel, ROIInput, ROIOutput, PDFRequest, CashFlowRequest
 from calculator import calculate_roi
-from pdf_generator import generate_pdf_report
-from database import init_db, get_db_session
-from project_models import Project
+from admin import require_admin
+from metrics import MetricsMiddleware, render as render_metrics, stage_timer
+from admission import AdmissionMiddleware, controller as admission_controller
+from cancellation import CancellationMiddleware
+from profiling import profiled, list_profiles, profile_path
+from rate_limiting import create_limiter, rate_limit_exceeded_handler, throttle_metrics, RATE_LIMIT_STORAGE_URI
+import singleflight
 
 # Configuration
 REQUIRE_AUTH = os.getenv("REQUIRE_AUTH", "false").lower() == "true"
 # reCAPTCHA secret key - MUST be set via environment variable
 RECAPTCHA_SECRET_KEY = os.getenv("RECAPTCHA_SECRET_KEY", "")
+# Override to point reCAPTCHA verification at a stub (load tests)
+RECAPTCHA_VERIFY_URL = os.getenv("RECAPTCHA_VERIFY_URL", "https://www.google.com/recaptcha/api/siteverify")
+# Import heavy dependencies at startup instead of on the first request
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
+# Largest inventory upload accepted by /ingest (bytes)
+INGEST_MAX_BYTES = int(os.getenv("INGEST_MAX_BYTES", str(50 * 1024 * 1024)))
 
-# Rate Limiter setup
-limiter = Limiter(key_func=get_remote_address)
+# Rate Limiter setup (storage backend from RATE_LIMIT_STORAGE_URI)
+limiter = create_limiter()
 
 # Conditional import of auth module
 if REQUIRE_AUTH:
@@ -45,7 +60,19 @@ app = FastAPI(
 
 # Add rate limiter to app
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+
+# Cost-weighted admission: queues by priority and sheds batch/PDF work with 503
+# under overload. Added first so it runs inside the metrics middleware, which
+# then counts shed requests and includes queueing time in request latency.
+app.add_middleware(AdmissionMiddleware)
+
+# Abandons PDF and batch work (queued or at its next checkpoint) when the
+# client disconnects. Outside admission so queued requests can be cancelled.
+app.add_middleware(CancellationMiddleware)
+
+# Per-route request counters and latency histograms for /metrics
+app.add_middleware(MetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -60,10 +87,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database on startup
+def warm_up():
+    """
+    Import the lazily-loaded dependencies, create database tables and
+    precompute the template library with its sample PDFs.
+    
+    Call this (or set WARMUP_ON_STARTUP=true) to move the one-time import cost
+    out of the first /generate-pdf, /contact, /projects or /templates request.
+    """
+    import httpx  # noqa: F401
+    import pdf_generator  # noqa: F401
+    import template_library
+    from database import init_db
+    
+    init_db()
+    template_library.library().warm()
+
+
 @app.on_event("startup")
 def startup_event():
-    init_db()
+    if WARMUP_ON_STARTUP:
+        warm_up()
 
 
 # =============================================================================
@@ -79,6 +123,79 @@ class ContactFormInput(BaseModel):
     recaptcha_token: Optional[str] = None
 
 
+class APIKeyInput(BaseModel):
+    """Input for creating an API key."""
+    name: str
+    quota_per_minute: Optional[int] = None
+
+
+class DeltaInput(BaseModel):
+    """Input for incremental recalculation."""
+    token: Optional[str] = None  # From a previous /calculate/delta response
+    changes: dict = {}  # Changed ROIInput fields (all fields when there is no token)
+
+
+class PortfolioInput(BaseModel):
+    """Input for budget-constrained portfolio selection."""
+    budget: float = Field(..., ge=0, description="Total implementation_cost that may be spent")
+    project_ids: list[str] = []  # Saved projects to consider
+    inputs: list[ROIInput] = []  # Unsaved candidates (named by process_name)
+    max_staff: Optional[int] = Field(default=None, ge=0, description="Cap on summed staff_count")
+    objective: Literal["net_savings", "npv"] = "net_savings"
+    horizon_years: int = Field(default=5, ge=1, le=30)
+    discount_rate: float = Field(default=8, ge=0, le=100, description="Annual discount rate % (npv only)")
+    method: Literal["auto", "exact", "greedy"] = "auto"
+
+
+class PhasingInput(BaseModel):
+    """Input for quarterly rollout phasing of funded projects."""
+    project_ids: list[str] = []  # Saved projects to roll out
+    inputs: list[ROIInput] = []  # Unsaved projects (ids input-0, input-1, ...)
+    capacity: int = Field(..., ge=1, le=10000, description="Projects implemented at the same time")
+    implementation_quarters: int = Field(default=1, ge=1, le=40, description="Default implementation window")
+    durations: dict[str, int] = {}  # Per-project window overrides, by id
+    horizon_quarters: int = Field(default=20, ge=1, le=120)
+    order: Optional[list[str]] = None  # Simulate this order instead of searching
+
+
+class CompareInput(BaseModel):
+    """Input for comparing processes side by side."""
+    project_ids: list[str] = []  # Saved projects
+    inputs: list[ROIInput] = []  # Unsaved processes (ids input-0, input-1, ...)
+
+
+class ScenarioOverride(BaseModel):
+    """One named what-if: replaced fields and/or scale factors on the base."""
+    name: str = Field(..., min_length=1, max_length=60)
+    overrides: dict = {}  # ROIInput field -> value
+    scale: dict[str, float] = {}  # Numeric ROIInput field -> factor on the base value
+
+
+class ScenarioInput(BaseModel):
+    """Input for evaluating what-if scenarios side by side."""
+    base: ROIInput
+    scenarios: list[ScenarioOverride] = Field(default=[], max_length=50)
+    include_presets: bool = True  # conservative / realistic / aggressive
+    horizon_years: int = Field(default=5, ge=1, le=30)
+    period: Literal["year", "quarter", "month"] = "year"
+
+
+class ToolQuoteInput(BaseModel):
+    """Input for pricing processes on every automation platform."""
+    project_ids: list[str] = []  # Saved projects (volume from their inputs)
+    inputs: list[ROIInput] = []  # Unsaved processes (ids input-0, input-1, ...)
+    runs_per_month: list[float] = Field(default=[], max_length=100000)  # Plain volumes (ids volume-0, ...)
+
+
+class AIQuoteInput(BaseModel):
+    """Input for pricing processes' AI steps on every model."""
+    project_ids: list[str] = []  # Saved projects
+    inputs: list[ROIInput] = []  # Unsaved processes (ids input-0, input-1, ...)
+    input_tokens_per_run: Optional[float] = Field(default=None, ge=0)  # Replaces each process's ai_input_tokens_per_run
+    output_tokens_per_run: Optional[float] = Field(default=None, ge=0)  # Replaces each process's ai_output_tokens_per_run
+    models: list[AIModel] = []  # Models to compare (default: all)
+
+
 class ProjectInput(BaseModel):
     """Input for creating/updating a project."""
     name: str
@@ -87,18 +204,39 @@ class ProjectInput(BaseModel):
     scenarios: dict = {}
 
 
+class ProjectSyncChange(ProjectInput):
+    """One client-side project edit to upload."""
+    id: str = Field(..., min_length=1, max_length=64)
+    base_version: int = Field(default=0, ge=0)  # Version the edit started from (0 for a new project)
+    deleted: bool = False
+    name: str = "Untitled Project"
+
+
+class ProjectSyncInput(BaseModel):
+    """Batch of client-side project edits."""
+    changes: list[ProjectSyncChange] = Field(..., max_length=500)
+
+
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
 
+def get_db_session():
+    """Dependency for FastAPI endpoints. Imports SQLAlchemy on first use."""
+    from database import get_db_session as _get_db_session
+    yield from _get_db_session()
+
+
 async def verify_recaptcha(token: str) -> dict:
     """Verify reCAPTCHA token with Google's API."""
     if not token:
         return {"success": False, "score": 0}
     
+    import httpx
+    
     async with httpx.AsyncClient() as client:
         response = await client.post(
-            "https://www.google.com/recaptcha/api/siteverify",
+            RECAPTCHA_VERIFY_URL,
             data={
                 "secret": RECAPTCHA_SECRET_KEY,
                 "response": token
@@ -117,6 +255,23 @@ def health_check():
     return {"status": "healthy", "auth_required": REQUIRE_AUTH}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus metrics: request counts/latency, internal stage timers, caches, DB pool."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/rate-limits")
+def rate_limit_stats():
+    """Requests rejected by the rate limiter since this worker started, and current admission load."""
+    storage_scheme = RATE_LIMIT_STORAGE_URI.split("://", 1)[0]
+    return {
+        "storage": storage_scheme,
+        **throttle_metrics.snapshot(),
+        "admission": admission_controller.snapshot(),
+    }
+
+
 @app.get("/token")
 def get_token():
     """
@@ -130,6 +285,93 @@ def get_token():
     return {"access_token": token, "token_type": "bearer"}
 
 
+# =============================================================================
+# API KEY MANAGEMENT (admin only)
+# =============================================================================
+
+@app.post("/api-keys")
+def create_api_key(key_input: APIKeyInput, admin: bool = Depends(require_admin), db=Depends(get_db_session)):
+    """
+    Create a long-lived API key for service-to-service access.
+    The plaintext key is returned once; only its hash is stored.
+    """
+    from api_key_models import APIKey
+    from auth import generate_api_key, api_key_index
+    
+    try:
+        key, key_hash = generate_api_key()
+        db_key = APIKey(
+            name=key_input.name,
+            key_hash=key_hash,
+            prefix=key[:12],
+            quota_per_minute=key_input.quota_per_minute,
+        )
+        db.add(db_key)
+        db.commit()
+        db.refresh(db_key)
+        api_key_index.reload()
+        return {**db_key.to_dict(), "api_key": key}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api-keys")
+def list_api_keys(admin: bool = Depends(require_admin), db=Depends(get_db_session)):
+    """List API keys (without secrets)."""
+    from api_key_models import APIKey
+    
+    keys = db.query(APIKey).order_by(APIKey.created.desc()).all()
+    return [k.to_dict() for k in keys]
+
+
+@app.delete("/api-keys/{key_id}")
+def revoke_api_key(key_id: str, admin: bool = Depends(require_admin), db=Depends(get_db_session)):
+    """Revoke an API key. Other workers pick this up within API_KEY_INDEX_TTL."""
+    from api_key_models import APIKey
+    from auth import api_key_index
+    
+    try:
+        db_key = db.query(APIKey).filter(APIKey.id == key_id).first()
+        if not db_key:
+            raise HTTPException(status_code=404, detail="API key not found")
+        
+        db_key.revoked = True
+        db.commit()
+        api_key_index.reload()
+        return {"success": True, "message": "API key revoked"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# =============================================================================
+# PROFILES (admin only)
+# =============================================================================
+
+@app.get("/admin/profiles")
+def get_profiles(admin: bool = Depends(require_admin)):
+    """
+    List stored request profiles, newest first.
+    Capture one by sending X-Admin-Token with X-Profile: 1 (or ?profile=1)
+    to /calculate, /generate-pdf or /projects.
+    """
+    return list_profiles()
+
+
+@app.get("/admin/profiles/{profile_id}")
+def get_profile(profile_id: str, format: str = "html", admin: bool = Depends(require_admin)):
+    """Download a stored profile as HTML (default) or pstats."""
+    path = profile_path(profile_id, format)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "html":
+        return FileResponse(path, media_type="text/html")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.pstats")
+
+
 # =============================================================================
 # CONTACT FORM ENDPOINT (with rate limiting)
 # =============================================================================
@@ -173,6 +415,7 @@ async def submit_contact_form(request: Request, form_data: ContactFormInput):
 
 @app.post("/calculate")
 @limiter.limit("30/minute")  # Rate limit calculations
+@profiled
 def calculate(request: Request, inputs: ROIInput):
     """
     Calculate automation ROI based on provided inputs.
@@ -181,16 +424,65 @@ def calculate(request: Request, inputs: ROIInput):
     When REQUIRE_AUTH=true, requires Bearer token in Authorization header.
     """
     try:
-        result = calculate_roi(inputs)
+        # Identical concurrent requests share one calculation
+        result, _ = singleflight.calculations.do(singleflight.request_key(inputs), lambda: calculate_roi(inputs))
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/calculate/delta")
+@limiter.limit("120/minute")  # Slider drags send many small deltas
+@profiled
+def calculate_delta(request: Request, delta: DeltaInput):
+    """
+    Recalculate after a few inputs change, recomputing only affected outputs.
+    
+    Send the full inputs as `changes` without a token to start (the response
+    has the full `result`). Later responses carry only the `changed` outputs
+    and a new token to send with the next changes. A 404 means the token
+    expired (or was issued by another worker): resend the full inputs.
+    
+    Rate limit: 120 requests per minute per IP.
+    """
+    import incremental
+    from pydantic import ValidationError
+    
+    try:
+        if delta.token is None:
+            with stage_timer("calculator", "validation"):
+                inputs = ROIInput.model_validate(delta.changes)
+            return incremental.calculate(inputs)
+        return incremental.calculate_delta(delta.token, delta.changes)
+    except incremental.UnknownResultToken:
+        raise HTTPException(status_code=404, detail="Unknown or expired result token")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.websocket("/ws/calculate")
+async def live_calculate(websocket: WebSocket):
+    """
+    Live recalculation for slider-driven what-if analysis.
+    
+    Send an init message with the full inputs, then small field patches;
+    the server replies with the outputs that changed. See live.py for the
+    message format. New sessions are limited per IP, messages are not.
+    """
+    from live import LiveSession
+    
+    await LiveSession(websocket).run()
+
+
 @app.post("/calculate-auth")
 def calculate_with_auth(inputs: ROIInput, authenticated: bool = Depends(verify_token if REQUIRE_AUTH else lambda: True)):
     """
     Calculate automation ROI with authentication.
+    Accepts a Bearer token from /token or an X-API-Key header.
     Use /calculate for unauthenticated access when auth is disabled.
     """
     if not REQUIRE_AUTH:
@@ -202,8 +494,75 @@ def calculate_with_auth(inputs: ROIInput, authenticated: bool = Depends(verify_t
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/cash-flow")
+@limiter.limit("30/minute")
+@profiled
+def cash_flow(request: Request, inputs: CashFlowRequest):
+    """
+    Project cash flows per year, quarter or month over any horizon, with NPV and IRR.
+    
+    Uses the same projection as five_year_savings and the PDF chart.
+    Rate limit: 30 requests per minute per IP.
+    """
+    import cashflow
+    import incremental
+    
+    try:
+        values, _ = incremental.evaluate(inputs)
+        projection = cashflow.project(
+            values["annual_savings"],
+            values["annual_automation_cost"],
+            inputs.implementation_cost,
+            inputs.volume_growth,
+            horizon_years=inputs.horizon_years,
+            period=inputs.period,
+        )
+        npv = cashflow.npv(projection, inputs.discount_rate)
+        irr = cashflow.irr(projection)
+        return {
+            **projection.to_dict(),
+            "discount_rate": inputs.discount_rate,
+            "npv": round(npv, 2),
+            "irr": round(irr, 1) if irr is not None else None,
+            "payback_period": cashflow.payback_period(projection),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/calculate/scenarios")
+@limiter.limit("30/minute")
+@profiled
+def calculate_scenarios(request: Request, scenario_input: ScenarioInput):
+    """
+    Evaluate one base input under named scenarios in a single call.
+    
+    Returns the base, the conservative / realistic / aggressive presets
+    (unless include_presets is false) and up to 50 user-defined scenarios
+    side by side, each with its full result, plus one cumulative cash-flow
+    series per scenario for the chart.
+    
+    Rate limit: 30 requests per minute per IP.
+    """
+    import scenario_analysis
+    
+    try:
+        return scenario_analysis.evaluate(
+            scenario_input.base,
+            [(s.name, s.overrides, s.scale) for s in scenario_input.scenarios],
+            include_presets=scenario_input.include_presets,
+            horizon_years=scenario_input.horizon_years,
+            period=scenario_input.period,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/generate-pdf")
 @limiter.limit("10/minute")  # Rate limit PDF generation
+@profiled
 def generate_pdf(request: Request, inputs: PDFRequest):
     """
     Generate PDF report from ROI calculation results with optional branding.
@@ -215,30 +574,535 @@ def generate_pdf(request: Request, inputs: PDFRequest):
     
     Rate limit: 10 requests per minute per IP.
     """
-    try:
+    from pdf_generator import generate_pdf_report
+    
+    def render() -> bytes:
         # Calculate ROI (using only the ROIInput fields)
         result = calculate_roi(inputs)
         
         # Generate PDF with branding options
-        pdf_bytes = generate_pdf_report(
+        return generate_pdf_report(
             result,
             input_data=inputs,
             company_name=inputs.company_name,
             brand_color=inputs.brand_color,
             logo_base64=inputs.logo_base64
         )
+    
+    try:
+        # Identical concurrent requests (also from other workers) share one render
+        pdf_bytes, _ = singleflight.pdf_renders.do(singleflight.request_key(inputs), render)
         return Response(content=pdf_bytes, media_type="application/pdf")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# =============================================================================
+# TEMPLATE LIBRARY ENDPOINTS
+# =============================================================================
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already names this ETag."""
+    return etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+
+
+def _cached(request: Request, content: bytes, etag: str, media_type: str,
+            cache_control: Optional[str] = None) -> Response:
+    """
+    Serve precomputed content with long-lived cache headers and ETag
+    revalidation (template library max-age unless cache_control is given).
+    """
+    import template_library
+    
+    if cache_control is None:
+        cache_control = f"public, max-age={template_library.CACHE_MAX_AGE_SECONDS}"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+@app.get("/templates")
+def get_templates(request: Request):
+    """
+    Template library: templates and homepage scenarios with results from
+    calculate_roi, precomputed once per worker.
+    """
+    import template_library
+    
+    library = template_library.library()
+    return _cached(request, library.body, library.etag, "application/json")
+
+
+@app.get("/templates/{template_id}")
+def get_template(request: Request, template_id: str):
+    """One template with its precomputed ROIOutput."""
+    import template_library
+    
+    try:
+        body, etag = template_library.library().document("template", template_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Template not found")
+    return _cached(request, body, etag, "application/json")
+
+
+@app.get("/templates/{template_id}/sample.pdf")
+def get_template_pdf(request: Request, template_id: str):
+    """Sample PDF report for a template, rendered once per worker."""
+    import template_library
+    
+    try:
+        pdf, etag = template_library.library().sample_pdf(template_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Template not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return _cached(request, pdf, etag, "application/pdf")
+
+
+@app.get("/scenarios/{scenario_id}")
+def get_scenario(request: Request, scenario_id: str):
+    """One homepage scenario with its inputs, ROIOutput and monthly outputs."""
+    import template_library
+    
+    try:
+        body, etag = template_library.library().document("scenario", scenario_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return _cached(request, body, etag, "application/json")
+
+
+# =============================================================================
+# SHARE SNAPSHOT ENDPOINTS
+# =============================================================================
+
+@app.post("/share")
+@limiter.limit("10/minute")
+@profiled
+def create_share(request: Request, inputs: PDFRequest, db=Depends(get_db_session)):
+    """
+    Freeze a calculation (inputs, results and branded PDF) as a share link.
+    
+    The ID is a hash of the content, so sharing the same calculation again
+    returns the same link without rendering anything.
+    
+    Rate limit: 10 requests per minute per IP.
+    """
+    import snapshots
+    
+    try:
+        snapshot_id, new = snapshots.create(db, inputs)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "id": snapshot_id,
+        "new": new,
+        "url": f"/share/{snapshot_id}",
+        "pdf_url": f"/share/{snapshot_id}/report.pdf",
+    }
+
+
+def _serve_snapshot(request: Request, db, snapshot_id: str, kind: str) -> Response:
+    """Snapshot JSON or PDF; a matching If-None-Match is answered without loading it."""
+    import snapshots
+    
+    etag = snapshots.etag(snapshot_id, kind)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": snapshots.IMMUTABLE_CACHE_CONTROL})
+    entry = snapshots.load(db, snapshot_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    body, pdf = entry
+    if kind == "json":
+        return _cached(request, body, etag, "application/json", snapshots.IMMUTABLE_CACHE_CONTROL)
+    return _cached(request, pdf, etag, "application/pdf", snapshots.IMMUTABLE_CACHE_CONTROL)
+
+
+@app.get("/share/{snapshot_id}")
+def get_share(request: Request, snapshot_id: str, db=Depends(get_db_session)):
+    """A shared calculation's inputs and results, cached as immutable."""
+    return _serve_snapshot(request, db, snapshot_id, "json")
+
+
+@app.get("/share/{snapshot_id}/report.pdf")
+def get_share_pdf(request: Request, snapshot_id: str, db=Depends(get_db_session)):
+    """The PDF report rendered when the calculation was shared."""
+    return _serve_snapshot(request, db, snapshot_id, "pdf")
+
+
+# =============================================================================
+# INGESTION ENDPOINTS
+# =============================================================================
+
+@app.post("/ingest")
+@limiter.limit("5/minute")
+@profiled
+async def ingest_inventory(
+    request: Request,
+    format: Literal["csv", "xlsx"] = "csv",
+    output: Literal["enriched", "projects"] = "enriched",
+    schema: Optional[str] = None,
+    db=Depends(get_db_session),
+):
+    """
+    Score a process inventory spreadsheet sent as the raw request body.
+    
+    Columns are mapped onto ROIInput fields by `schema` (JSON, see
+    ingest.py) and rows are validated and scored in chunks. With
+    output=enriched the CSV is streamed back with result and error columns
+    appended; with output=projects valid rows are saved as projects and a
+    summary is returned.
+    
+    Rate limit: 5 requests per minute per IP.
+    """
+    import tempfile
+    from fastapi.responses import StreamingResponse
+    from starlette.concurrency import run_in_threadpool
+    import ingest
+    
+    # Spill to disk past a few MB so large uploads never sit in memory
+    body = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    try:
+        size = 0
+        async for block in request.stream():
+            size += len(block)
+            if size > INGEST_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds {INGEST_MAX_BYTES} bytes")
+            body.write(block)
+        body.seek(0)
+        header, chunks = await run_in_threadpool(
+            ingest.iter_chunks, body, format, ingest.Schema.from_json(schema)
+        )
+    except HTTPException:
+        body.close()
+        raise
+    except ValueError as e:
+        body.close()
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        body.close()
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if output == "projects":
+        try:
+            return await run_in_threadpool(ingest.save_projects, chunks, db)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            body.close()
+    
+    def stream():
+        try:
+            yield from ingest.enriched_csv(header, chunks)
+        finally:
+            body.close()
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="inventory-scored.csv"'},
+    )
+
+
+# =============================================================================
+# PORTFOLIO ENDPOINTS
+# =============================================================================
+
+def _load_portfolio_entries(db, project_ids: list[str], inputs: list[ROIInput]) -> tuple[list, list]:
+    """
+    Collect (id, name, ROIInput) entries from saved projects and inline inputs.
+    
+    Saved projects are fetched with a single IN query. Missing projects and
+    projects whose stored inputs no longer validate are reported as skipped.
+    
+    Returns:
+        Tuple of (entries, skipped)
+    """
+    from pydantic import ValidationError
+    from project_models import Project
+    
+    entries, skipped = [], []
+    if project_ids:
+        found = db.query(Project.id, Project.name, Project.inputs).filter(Project.id.in_(project_ids)).all()
+        by_id = {row.id: row for row in found}
+        for project_id in project_ids:
+            row = by_id.get(project_id)
+            if row is None:
+                skipped.append({"id": project_id, "reason": "Project not found"})
+                continue
+            try:
+                with stage_timer("calculator", "validation"):
+                    entries.append((row.id, row.name, ROIInput.model_validate(row.inputs or {})))
+            except ValidationError as e:
+                skipped.append({"id": project_id, "reason": f"Invalid inputs: {e.error_count()} error(s)"})
+    for index, roi_input in enumerate(inputs):
+        entries.append((f"input-{index}", roi_input.process_name, roi_input))
+    return entries, skipped
+
+
+@app.post("/portfolio/optimize")
+@limiter.limit("10/minute")
+@profiled
+def optimize_portfolio(request: Request, portfolio_input: PortfolioInput, db=Depends(get_db_session)):
+    """
+    Choose which candidate projects to fund within a budget.
+    
+    Candidates come from saved projects (project_ids) and/or inline inputs.
+    Maximizes cumulative net savings at the horizon (five_year_savings for
+    5 years) or NPV. Uses exact branch-and-bound for moderate candidate
+    counts and a greedy approximation beyond, reporting the optimality gap.
+    
+    Rate limit: 10 requests per minute per IP.
+    """
+    import time
+    import portfolio
+    
+    start = time.perf_counter()
+    entries, skipped = _load_portfolio_entries(db, portfolio_input.project_ids, portfolio_input.inputs)
+    
+    try:
+        candidates = portfolio.build_candidates(
+            entries,
+            objective=portfolio_input.objective,
+            horizon_years=portfolio_input.horizon_years,
+            discount_rate=portfolio_input.discount_rate,
+        )
+        evaluate_ms = (time.perf_counter() - start) * 1000
+        result = portfolio.optimize(
+            candidates, portfolio_input.budget, portfolio_input.max_staff, portfolio_input.method
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        **result,
+        "objective": portfolio_input.objective,
+        "budget": portfolio_input.budget,
+        "skipped": skipped,
+        "evaluate_ms": round(evaluate_ms, 3),
+    }
+
+
+@app.post("/portfolio/phasing")
+@limiter.limit("10/minute")
+@profiled
+def phase_portfolio(request: Request, phasing_input: PhasingInput, db=Depends(get_db_session)):
+    """
+    Plan the quarter-by-quarter rollout of funded projects.
+    
+    At most `capacity` projects are implemented at once; each starts saving
+    after its implementation window. Returns the schedule and the combined
+    cumulative cash-flow curve for the rollout order with the earliest
+    portfolio payback (or for `order`, when given).
+    
+    Rate limit: 10 requests per minute per IP.
+    """
+    import time
+    import phasing
+    
+    start = time.perf_counter()
+    entries, skipped = _load_portfolio_entries(db, phasing_input.project_ids, phasing_input.inputs)
+    if not entries:
+        raise HTTPException(status_code=422, detail="No valid projects to phase")
+    
+    try:
+        plan = phasing.build_plan(
+            entries,
+            capacity=phasing_input.capacity,
+            implementation_quarters=phasing_input.implementation_quarters,
+            durations=phasing_input.durations,
+            horizon_quarters=phasing_input.horizon_quarters,
+        )
+        evaluate_ms = (time.perf_counter() - start) * 1000
+        result = phasing.simulate(plan, order=phasing_input.order)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {**result, "skipped": skipped, "evaluate_ms": round(evaluate_ms, 3)}
+
+
+@app.post("/compare")
+@limiter.limit("30/minute")
+@profiled
+def compare_processes(request: Request, compare_input: CompareInput, db=Depends(get_db_session)):
+    """
+    Compare saved projects and/or inline inputs side by side.
+    
+    All processes are calculated in one batch. Returns each key metric as a
+    column aligned with the process list, with ranks, the best process and
+    pairwise deltas, so the Compare page needs a single request.
+    
+    Rate limit: 30 requests per minute per IP.
+    """
+    import comparison
+    
+    entries, skipped = _load_portfolio_entries(db, compare_input.project_ids, compare_input.inputs)
+    try:
+        result = comparison.compare(entries)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {**result, "skipped": skipped}
+
+
+# =============================================================================
+# TOOL AND AI PRICING ENDPOINTS
+# =============================================================================
+
+@app.get("/tool-pricing")
+def get_tool_pricing():
+    """Automation platform tiers used to price automation_platform licenses."""
+    import tool_pricing
+    
+    return tool_pricing.pricing_table()
+
+
+@app.post("/tool-pricing/quote")
+@limiter.limit("30/minute")
+@profiled
+def quote_tool_pricing(request: Request, quote_input: ToolQuoteInput, db=Depends(get_db_session)):
+    """
+    Price every process on every automation platform in one batched lookup.
+    
+    Volumes come from saved projects and inline inputs (runs per year / 12)
+    and/or plain runs_per_month values. Each process gets the tier and
+    monthly cost per platform (null cost for quote-only tiers) and its
+    cheapest platform.
+    
+    Rate limit: 30 requests per minute per IP.
+    """
+    import tool_pricing
+    from calculator import calculate_periods_per_year
+    
+    entries, skipped = _load_portfolio_entries(db, quote_input.project_ids, quote_input.inputs)
+    processes = [
+        (entry_id, name, inputs.runs_per_period * calculate_periods_per_year(
+            inputs.frequency, inputs.working_days_per_year, inputs.hours_per_day
+        ) / 12)
+        for entry_id, name, inputs in entries
+    ]
+    processes += [(f"volume-{index}", None, volume) for index, volume in enumerate(quote_input.runs_per_month)]
+    if not processes:
+        raise HTTPException(status_code=422, detail="No processes to price")
+    
+    try:
+        quotes = tool_pricing.quote_all([volume for _, _, volume in processes])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    compiled = tool_pricing.tables()
+    tiers, costs, cheapest = quotes["tier"].tolist(), quotes["monthly_cost"].tolist(), quotes["cheapest"].tolist()
+    results = []
+    for row, (entry_id, name, volume) in enumerate(processes):
+        results.append({
+            "id": entry_id,
+            "name": name,
+            "runs_per_month": round(volume, 2),
+            "quotes": {
+                platform: {
+                    "tier": compiled[platform].tier_names[tiers[row][column]],
+                    "monthly_cost": None if costs[row][column] != costs[row][column] else costs[row][column],
+                }
+                for column, platform in enumerate(tool_pricing.PLATFORMS)
+            },
+            "cheapest": tool_pricing.PLATFORMS[cheapest[row]],
+        })
+    return {"processes": results, "skipped": skipped, "pricing_last_updated": tool_pricing.PRICING_LAST_UPDATED}
+
+
+@app.get("/ai-pricing")
+def get_ai_pricing():
+    """AI model token prices used to cost ai_model inference."""
+    import ai_pricing
+    
+    return ai_pricing.pricing_table()
+
+
+@app.post("/ai-pricing/quote")
+@limiter.limit("30/minute")
+@profiled
+def quote_ai_pricing(request: Request, quote_input: AIQuoteInput, db=Depends(get_db_session)):
+    """
+    Annual inference cost of every process on every AI model in one call.
+    
+    Runs per year come from each process's inputs; token estimates from its
+    ai_*_tokens_per_run fields unless overridden for the whole request.
+    Returns each process's cost per model, its cheapest model and its cost
+    on the model it uses now, plus the portfolio total per model.
+    
+    Rate limit: 30 requests per minute per IP.
+    """
+    import ai_pricing
+    from calculator import calculate_periods_per_year
+    
+    entries, skipped = _load_portfolio_entries(db, quote_input.project_ids, quote_input.inputs)
+    if not entries:
+        raise HTTPException(status_code=422, detail="No processes to price")
+    
+    runs, tokens_in, tokens_out = [], [], []
+    for _, _, inputs in entries:
+        runs.append(inputs.runs_per_period * calculate_periods_per_year(
+            inputs.frequency, inputs.working_days_per_year, inputs.hours_per_day
+        ))
+        tokens_in.append(inputs.ai_input_tokens_per_run if quote_input.input_tokens_per_run is None
+                         else quote_input.input_tokens_per_run)
+        tokens_out.append(inputs.ai_output_tokens_per_run if quote_input.output_tokens_per_run is None
+                          else quote_input.output_tokens_per_run)
+    
+    models = [model.value for model in quote_input.models] or list(ai_pricing.MODEL_IDS)
+    try:
+        costs = ai_pricing.annual_costs_all(runs, tokens_in, tokens_out)
+        costs = costs[:, [ai_pricing.MODEL_IDS.index(model) for model in models]]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    cheapest = costs.argmin(axis=1).tolist()
+    totals = costs.sum(axis=0).tolist()
+    results = []
+    for row, ((entry_id, name, inputs), cost) in enumerate(zip(entries, costs.tolist())):
+        current = inputs.ai_model.value if inputs.ai_model else None
+        results.append({
+            "id": entry_id,
+            "name": name,
+            "runs_per_year": round(runs[row], 2),
+            "input_tokens_per_run": tokens_in[row],
+            "output_tokens_per_run": tokens_out[row],
+            "annual_cost": {model: round(value, 2) for model, value in zip(models, cost)},
+            "cheapest": models[cheapest[row]],
+            "current_model": current,
+            "current_annual_cost": None if current is None else round(
+                ai_pricing.ai_cost(current, runs[row], tokens_in[row], tokens_out[row]), 2
+            ),
+        })
+    return {
+        "processes": results,
+        "totals": {model: round(value, 2) for model, value in zip(models, totals)},
+        "cheapest": models[totals.index(min(totals))],
+        "models": {model: ai_pricing.MODELS[model][1] for model in models},
+        "skipped": skipped,
+        "pricing_last_updated": ai_pricing.PRICING_LAST_UPDATED,
+    }
+
+
 # =============================================================================
 # PROJECT CRUD ENDPOINTS
 # =============================================================================
 
 @app.get("/projects")
-def list_projects(db=Depends(get_db_session)):
+@profiled
+def list_projects(request: Request, db=Depends(get_db_session)):
     """List all saved projects."""
+    from project_models import Project
+    
     try:
         projects = db.query(Project).order_by(Project.updated.desc()).all()
         return [p.to_dict() for p in projects]
@@ -246,9 +1110,56 @@ def list_projects(db=Depends(get_db_session)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/projects/changes")
+@profiled
+def project_changes(request: Request, since: int = 0, limit: int = 500, db=Depends(get_db_session)):
+    """
+    Projects created, updated or deleted after a cursor.
+    
+    since=0 returns every project (full=true). Otherwise only the changes
+    after `since` are returned, deletions as tombstones, in pages of at most
+    `limit`; pass the returned cursor to the next request.
+    """
+    import project_sync
+    
+    if not 1 <= limit <= project_sync.MAX_CHANGES_PER_PAGE:
+        raise HTTPException(status_code=422, detail=f"limit must be between 1 and {project_sync.MAX_CHANGES_PER_PAGE}")
+    try:
+        return project_sync.changes_since(db, since, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/projects/sync")
+@limiter.limit("30/minute")
+@profiled
+def sync_projects(request: Request, sync_input: ProjectSyncInput, db=Depends(get_db_session)):
+    """
+    Upload a batch of client-side project edits.
+    
+    Each edit carries the version it started from; edits made on an outdated
+    copy are rejected as conflicts and come back with the server's copy.
+    The others are applied in one transaction.
+    
+    Rate limit: 30 requests per minute per IP.
+    """
+    import project_sync
+    
+    try:
+        return project_sync.apply_changes(db, sync_input.changes)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/projects")
-def create_project(project: ProjectInput, db=Depends(get_db_session)):
+@profiled
+def create_project(request: Request, project: ProjectInput, db=Depends(get_db_session)):
     """Create a new project."""
+    import project_sync
+    from project_models import Project
+    
     try:
         db_project = Project(
             name=project.name,
@@ -257,9 +1168,11 @@ def create_project(project: ProjectInput, db=Depends(get_db_session)):
             scenarios=project.scenarios or {"base": {"inputs": project.inputs, "results": project.results}}
         )
         db.add(db_project)
+        db.flush()
+        versions = project_sync.record_changes(db, [db_project.id])
         db.commit()
         db.refresh(db_project)
-        return db_project.to_dict()
+        return {**db_project.to_dict(), "version": versions[db_project.id]}
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
@@ -268,6 +1181,8 @@ def create_project(project: ProjectInput, db=Depends(get_db_session)):
 @app.get("/projects/{project_id}")
 def get_project(project_id: str, db=Depends(get_db_session)):
     """Get a single project by ID."""
+    from project_models import Project
+    
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -277,6 +1192,9 @@ def get_project(project_id: str, db=Depends(get_db_session)):
 @app.put("/projects/{project_id}")
 def update_project(project_id: str, updates: ProjectInput, db=Depends(get_db_session)):
     """Update an existing project."""
+    import project_sync
+    from project_models import Project
+    
     try:
         project = db.query(Project).filter(Project.id == project_id).first()
         if not project:
@@ -287,9 +1205,10 @@ def update_project(project_id: str, updates: ProjectInput, db=Depends(get_db_ses
         project.results = updates.results
         project.scenarios = updates.scenarios
         
+        versions = project_sync.record_changes(db, [project_id])
         db.commit()
         db.refresh(project)
-        return project.to_dict()
+        return {**project.to_dict(), "version": versions[project_id]}
     except HTTPException:
         raise
     except Exception as e:
@@ -300,12 +1219,16 @@ def update_project(project_id: str, updates: ProjectInput, db=Depends(get_db_ses
 @app.delete("/projects/{project_id}")
 def delete_project(project_id: str, db=Depends(get_db_session)):
     """Delete a project."""
+    import project_sync
+    from project_models import Project
+    
     try:
         project = db.query(Project).filter(Project.id == project_id).first()
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         
         db.delete(project)
+        project_sync.record_changes(db, [project_id], deleted=True)
         db.commit()
         return {"success": True, "message": "Project deleted"}
     except HTTPException:
@@ -0,0 +1,475 @@
+"""
+metrics.py - In-Process Prometheus Metrics
+
+Counters, gauges and latency histograms kept in memory and rendered in the
+Prometheus text exposition format at /metrics. No external service or client
+library is required.
+
+Recording is a lock plus a bisect per observation. Rendering walks the
+registry once, so a scrape does not slow down request handling.
+
+Configuration:
+    Set METRICS_ENABLED=false to turn off the internal stage timers
+    (calculator, PDF, SQL). Per-route request metrics are always recorded.
+"""
+
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Latency buckets in seconds (sub-millisecond calculator stages up to slow PDFs)
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+# =============================================================================
+# METRIC TYPES
+# =============================================================================
+
+class _Metric:
+    """Base class: a named metric with a fixed set of label names."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), collect=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Optional callable computing {label tuple: value} at scrape time
+        self.collect = collect
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _current(self) -> dict:
+        if self.collect is not None:
+            return self.collect() or {}
+        with self._lock:
+            return dict(self._values)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: tuple, extra: str = "") -> str:
+        parts = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def samples(self) -> list:
+        raise NotImplementedError
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list:
+        items = sorted(self._current().items())
+        return [f"{self.name}{self._format_labels(key)} {_num(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> list:
+        items = sorted(self._current().items())
+        return [f"{self.name}{self._format_labels(key)} {_num(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Latency distribution with cumulative buckets, sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def labels(self, **labels) -> "_HistogramChild":
+        """Bound histogram for one label set; cache it on hot paths."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        return _HistogramChild(self, state)
+
+    def observe(self, value: float, **labels) -> None:
+        self.labels(**labels).observe(value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list:
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._values.items())
+        lines = []
+        bounds = ['le="%s"' % _num(bound) for bound in self.buckets] + ['le="+Inf"']
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{self._format_labels(key, bound)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_num(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+
+class _HistogramChild:
+    """One label set of a Histogram: [bucket counts, sum, count]."""
+
+    __slots__ = ("buckets", "lock", "state")
+
+    def __init__(self, histogram: Histogram, state: list):
+        self.buckets = histogram.buckets
+        self.lock = histogram._lock
+        self.state = state
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        state = self.state
+        with self.lock:
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    """Render every registered metric in Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Requests
+REQUESTS = register(Counter(
+    "http_requests_total", "HTTP requests by route, method and status code.",
+    ("route", "method", "status"),
+))
+REQUEST_LATENCY = register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    ("route", "method"),
+))
+IN_PROGRESS = register(Gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled.",
+))
+
+# Internal stages
+STAGE_LATENCY = register(Histogram(
+    "stage_duration_seconds", "Time spent in internal processing stages.",
+    ("component", "stage"),
+))
+DB_QUERY_LATENCY = register(Histogram(
+    "db_query_duration_seconds", "SQLAlchemy statement execution time by statement type.",
+    ("statement",),
+))
+
+# Caches
+CACHE_REQUESTS = register(Counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit or miss).",
+    ("cache", "result"),
+))
+
+
+def _cache_hit_ratio() -> dict:
+    counts = CACHE_REQUESTS._current()
+    ratios = {}
+    for cache in {key[0] for key in counts}:
+        hits = counts.get((cache, "hit"), 0)
+        total = hits + counts.get((cache, "miss"), 0)
+        ratios[(cache,)] = hits / total if total else 0.0
+    return ratios
+
+
+CACHE_HIT_RATIO = register(Gauge(
+    "cache_hit_ratio", "Fraction of cache lookups that were hits.",
+    ("cache",), collect=_cache_hit_ratio,
+))
+
+
+# Database pool (only reported once the database layer has been imported)
+def _db_pool_connections() -> dict:
+    database = sys.modules.get("database")
+    if database is None:
+        return {}
+    pool = database.engine.pool
+    stats = {}
+    for state in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, state, None)
+        if callable(fn):
+            stats[(state,)] = fn()
+    return stats
+
+
+def _db_pool_saturation() -> dict:
+    database = sys.modules.get("database")
+    if database is None:
+        return {}
+    pool = database.engine.pool
+    if not all(hasattr(pool, attr) for attr in ("size", "checkedout", "_max_overflow")):
+        return {}
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    return {(): pool.checkedout() / capacity if capacity else 0.0}
+
+
+DB_POOL_CONNECTIONS = register(Gauge(
+    "db_pool_connections", "SQLAlchemy connection pool state.",
+    ("state",), collect=_db_pool_connections,
+))
+DB_POOL_SATURATION = register(Gauge(
+    "db_pool_saturation", "Checked-out connections as a fraction of pool capacity.",
+    collect=_db_pool_saturation,
+))
+
+
+# Rate limiting (counts kept by rate_limiting.throttle_metrics)
+def _throttled() -> dict:
+    rate_limiting = sys.modules.get("rate_limiting")
+    if rate_limiting is None:
+        return {}
+    return {
+        (item["route"], item["limit"]): item["count"]
+        for item in rate_limiting.throttle_metrics.snapshot()["throttled"]
+    }
+
+
+THROTTLED = register(Counter(
+    "rate_limit_throttled_total", "Requests rejected by the rate limiter.",
+    ("route", "limit"), collect=_throttled,
+))
+
+
+# Request coalescing (singleflight.py)
+SINGLEFLIGHT_REQUESTS = register(Counter(
+    "singleflight_requests_total",
+    "Coalesced work by flight and role (leader ran it, follower waited in-process, shared came from another "
+    "worker, fallback ran it after the follower timeout).",
+    ("flight", "role"),
+))
+
+
+# Admission control (admission.py)
+ADMISSION_REQUESTS = register(Counter(
+    "admission_requests_total",
+    "Admission decisions by work class and outcome (admitted at once, queued then admitted, coalesced with an "
+    "identical admitted request without being charged, shed with 503).",
+    ("work_class", "outcome"),
+))
+
+
+def _admission_state() -> dict:
+    admission = sys.modules.get("admission")
+    if admission is None:
+        return {}
+    return {(): admission.controller.in_flight}
+
+
+def _admission_delay() -> dict:
+    admission = sys.modules.get("admission")
+    if admission is None:
+        return {}
+    return {(): admission.controller.delay_ms() / 1000}
+
+
+ADMISSION_IN_FLIGHT = register(Gauge(
+    "admission_in_flight_cost", "Cost units of admitted requests still running.",
+    collect=_admission_state,
+))
+ADMISSION_QUEUE_DELAY = register(Gauge(
+    "admission_queue_delay_seconds", "Smoothed admission queueing delay (or the oldest waiter's age if longer).",
+    collect=_admission_delay,
+))
+
+
+# Cancellation on client disconnect (cancellation.py)
+CANCELLED_REQUESTS = register(Counter(
+    "cancelled_requests_total",
+    "Requests whose client disconnected, by how much work was saved (queued: never ran, "
+    "interrupted: stopped before finishing its response, completed: finished anyway).",
+    ("work_class", "stage"),
+))
+CANCELLATION_CHECKPOINTS = register(Counter(
+    "cancellation_checkpoints_total", "Abandoned work by the checkpoint that stopped it.",
+    ("task",),
+))
+
+
+# Live recalculation sessions (live.py)
+LIVE_SESSIONS = register(Gauge(
+    "live_sessions", "Open live recalculation WebSocket sessions.",
+))
+LIVE_UPDATES = register(Counter(
+    "live_updates_total", "Live recalculation messages by outcome (computed, coalesced, error).",
+    ("outcome",),
+))
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+@contextmanager
+def stage_timer(component: str, stage: str):
+    """Time a block as an internal stage, e.g. stage_timer("pdf", "chart")."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stage_child(component, stage).observe(time.perf_counter() - start)
+
+
+_stage_children = {}
+
+
+def _stage_child(component: str, stage: str) -> _HistogramChild:
+    child = _stage_children.get((component, stage))
+    if child is None:
+        child = _stage_children[(component, stage)] = STAGE_LATENCY.labels(component=component, stage=stage)
+    return child
+
+
+class StageClock:
+    """
+    Times consecutive stages of one function with a single clock:
+    each mark() records the time since the previous mark.
+
+        clock = StageClock("calculator")
+        ...costs...
+        clock.mark("current_costs")
+    """
+
+    __slots__ = ("component", "last")
+
+    def __init__(self, component: str):
+        self.component = component
+        self.last = time.perf_counter() if METRICS_ENABLED else 0.0
+
+    def mark(self, stage: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        now = time.perf_counter()
+        _stage_child(self.component, stage).observe(now - self.last)
+        self.last = now
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def instrument_engine(engine) -> None:
+    """Time every SQL statement executed through a SQLAlchemy engine."""
+    if not METRICS_ENABLED:
+        return
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        words = statement.split(None, 1)
+        verb = words[0].upper() if words else "OTHER"
+        DB_QUERY_LATENCY.observe(time.perf_counter() - start, statement=verb)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count and latency per route template
+    (e.g. /projects/{project_id}), so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_PROGRESS.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            if scope.get("client_disconnected") and status["code"] == 500:
+                status["code"] = 499  # Client closed the request before a response was sent
+            REQUEST_LATENCY.observe(time.perf_counter() - start, route=path, method=method)
+            REQUESTS.inc(route=path, method=method, status=status["code"])
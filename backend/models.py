@@ -3,6 +3,7 @@ models.py - Data structures for input validation and output formatting
 Pydantic models ensure users provide valid data before we calculate anything.
 """
 
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -22,6 +23,38 @@ class Frequency(str, Enum):
     QUARTERLY = "quarterly"
 
 
+class AutomationPlatform(str, Enum):
+    """Automation platform whose pricing tiers set the license cost (see tool_pricing.py)"""
+    ZAPIER = "zapier"
+    MAKE = "make"
+    N8N = "n8n"
+    POWER_AUTOMATE = "power_automate"
+    CHEAPEST = "cheapest"
+
+
+class AIModel(str, Enum):
+    """LLM used by AI-assisted automation steps (see ai_pricing.py)"""
+    GPT_5_2 = "gpt_5_2"
+    GPT_5_MINI = "gpt_5_mini"
+    GPT_4_1 = "gpt_4_1"
+    GPT_4O = "gpt_4o"
+    GPT_4O_MINI = "gpt_4o_mini"
+    O3 = "o3"
+    O4_MINI = "o4_mini"
+    CLAUDE_OPUS_4_5 = "claude_opus_4_5"
+    CLAUDE_SONNET_4_5 = "claude_sonnet_4_5"
+    CLAUDE_HAIKU_4_5 = "claude_haiku_4_5"
+    GEMINI_2_5_PRO = "gemini_2_5_pro"
+    GEMINI_2_5_FLASH = "gemini_2_5_flash"
+    GROK_4_1_FAST_REASONING = "grok_4_1_fast_reasoning"
+    GROK_4_FAST_REASONING = "grok_4_fast_reasoning"
+    GROK_CODE_FAST_1 = "grok_code_fast_1"
+    GROK_4 = "grok_4"
+    COMMAND_R_03_2024 = "command_r_03_2024"
+    COMMAND_R_PLUS_08_2024 = "command_r_plus_08_2024"
+    AYA_EXPANSE = "aya_expanse"
+
+
 # =============================================================================
 # INPUT MODEL
 # =============================================================================
@@ -57,7 +90,11 @@ class ROIInput(BaseModel):
     current_tool_cost: float = Field(default=0, ge=0, le=50000, description="Current annual tool costs. Enter 0 if none.")
     implementation_cost: float = Field(..., ge=0, le=500000, description="One-time setup/development cost")
     software_license_cost: float = Field(default=0, ge=0, le=100000, description="Annual software license/subscription cost")
+    automation_platform: Optional[AutomationPlatform] = Field(default=None, description="Price the license from this platform's tier for the monthly run volume (replaces software_license_cost; 'cheapest' picks the lowest list price)")
     annual_maintenance_cost: float = Field(default=0, ge=0, le=50000, description="Annual maintenance and support cost")
+    ai_model: Optional[AIModel] = Field(default=None, description="LLM called on every run; its token prices add inference cost to the annual automation cost")
+    ai_input_tokens_per_run: float = Field(default=0, ge=0, le=10000000, description="Input (prompt) tokens sent to ai_model per run")
+    ai_output_tokens_per_run: float = Field(default=0, ge=0, le=10000000, description="Output tokens (reasoning included) returned by ai_model per run")
     
     # Growth
     volume_growth: float = Field(default=0, ge=0, le=100, description="Expected annual volume growth %. Enter 0 if none.")
@@ -81,6 +118,18 @@ class PDFRequest(ROIInput):
     logo_base64: str = Field(default=None, description="Base64-encoded logo image (data:image/png;base64,...)")
 
 
+# =============================================================================
+# CASH-FLOW REQUEST MODEL (extends ROIInput with projection settings)
+# =============================================================================
+
+class CashFlowRequest(ROIInput):
+    """Cash-flow projection request: ROI inputs plus horizon and discounting."""
+    
+    horizon_years: int = Field(default=5, ge=1, le=30, description="Years to project")
+    period: Literal["year", "quarter", "month"] = Field(default="year", description="Granularity of the returned cash flows")
+    discount_rate: float = Field(default=8, ge=0, le=100, description="Annual discount rate % used for NPV")
+
+
 # =============================================================================
 # OUTPUT MODEL
 # =============================================================================
@@ -250,7 +299,7 @@ annual_savings:             Dollar amount saved per year after automation
 
 payback_months:         Months until automation investment pays for itself
 roi_percentage:         Return on investment for Year 1
-five_year_savings:      Total cumulative savings over 5 years
+five_year_savings:      Cumulative net cash flow after 5 years (see cashflow.py)
 
 priority_score:         "High", "Medium", or "Low" - should you automate?
 recommendation:         Human-readable advice
@@ -22,7 +22,10 @@ from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.graphics.charts.legends import Legend
 from io import BytesIO
 
+import cancellation
 from models import ROIOutput, ROIInput
+from metrics import stage_timer
+from cashflow import project
 
 
 # Enterprise Color Palette - Muted, professional
@@ -59,26 +62,14 @@ def create_savings_chart(data: ROIOutput, input_data: ROIInput = None):
     """Create a bar chart showing 5-year cumulative savings."""
     drawing = Drawing(400, 200)
     
-    # Calculate dataset
-    # If we have input_data, user growth rate. Otherwise flat.
-    growth_rate = (input_data.volume_growth / 100.0) if input_data else 0.0
-    
-    # Costs
-    annual_cost = data.annual_automation_cost
-    
-    # Savings (grows with volume)
-    base_savings = data.annual_savings # Gross savings
-    
-    # Calculate years
-    cumulative = []
-    running_total = -data.implementation_cost # Start with sunk cost
-    
-    # Year 1 to 5
-    for i in range(5):
-        year_savings = base_savings * ((1 + growth_rate) ** i)
-        net_year = year_savings - annual_cost
-        running_total += net_year
-        cumulative.append(running_total)
+    # Same projection as five_year_savings. If we have input_data, use its growth rate. Otherwise flat.
+    cumulative = project(
+        data.annual_savings,
+        data.annual_automation_cost,
+        data.implementation_cost,
+        input_data.volume_growth if input_data else 0.0,
+        horizon_years=5,
+    ).cumulative
     
     # Check if numbers are huge (millions) to scale labels
     is_millions = abs(cumulative[-1]) >= 1000000
@@ -130,6 +121,41 @@ def create_savings_chart(data: ROIOutput, input_data: ROIInput = None):
     return drawing
 
 
+def _build_logo_element(logo_base64: str, display_name: str, brand_color: str):
+    """Return the header logo: the decoded base64 image, or the company name as text."""
+    if logo_base64:
+        try:
+            from reportlab.platypus import Image
+            from PIL import Image as PILImage
+            import base64
+            # Decode base64 and create image
+            logo_data = base64.b64decode(logo_base64.split(',')[-1] if ',' in logo_base64 else logo_base64)
+            logo_buffer = BytesIO(logo_data)
+            
+            # Get original dimensions and calculate scaled size
+            pil_img = PILImage.open(BytesIO(logo_data))
+            orig_width, orig_height = pil_img.size
+            max_height = 0.5 * inch  # Max height in PDF
+            
+            # Preserve aspect ratio, only constrain by height
+            scale = max_height / orig_height if orig_height > max_height * 72 / inch else 1
+            pdf_width = (orig_width * scale / 72) * inch
+            pdf_height = (orig_height * scale / 72) * inch
+            
+            logo_buffer.seek(0)
+            logo_img = Image(logo_buffer, width=pdf_width, height=pdf_height)
+            logo_img.hAlign = 'LEFT'
+            return logo_img
+        except Exception:
+            # Fallback to text if image fails
+            pass
+    
+    return Paragraph(
+        f'<font name="{FONT_BOLD}" size="14" color="{brand_color or "#2563eb"}">{display_name}</font>', 
+        ParagraphStyle('Logo', alignment=TA_LEFT)
+    )
+
+
 def generate_pdf_report(
     data: ROIOutput,
     input_data: ROIInput = None,
@@ -168,40 +194,9 @@ def generate_pdf_report(
     
     # ==================== HEADER (enterprise-clean) ====================
     # Handle logo: either base64 image or text
-    if logo_base64:
-        try:
-            from reportlab.platypus import Image
-            from PIL import Image as PILImage
-            import base64
-            # Decode base64 and create image
-            logo_data = base64.b64decode(logo_base64.split(',')[-1] if ',' in logo_base64 else logo_base64)
-            logo_buffer = BytesIO(logo_data)
-            
-            # Get original dimensions and calculate scaled size
-            pil_img = PILImage.open(BytesIO(logo_data))
-            orig_width, orig_height = pil_img.size
-            max_height = 0.5 * inch  # Max height in PDF
-            
-            # Preserve aspect ratio, only constrain by height
-            scale = max_height / orig_height if orig_height > max_height * 72 / inch else 1
-            pdf_width = (orig_width * scale / 72) * inch
-            pdf_height = (orig_height * scale / 72) * inch
-            
-            logo_buffer.seek(0)
-            logo_img = Image(logo_buffer, width=pdf_width, height=pdf_height)
-            logo_img.hAlign = 'LEFT'
-            logo_element = logo_img
-        except Exception:
-            # Fallback to text if image fails
-            logo_element = Paragraph(
-                f'<font name="{FONT_BOLD}" size="14" color="{brand_color or "#2563eb"}">{display_name}</font>', 
-                ParagraphStyle('Logo', alignment=TA_LEFT)
-            )
-    else:
-        logo_element = Paragraph(
-            f'<font name="{FONT_BOLD}" size="14" color="{brand_color or "#2563eb"}">{display_name}</font>', 
-            ParagraphStyle('Logo', alignment=TA_LEFT)
-        )
+    cancellation.check("pdf")
+    with stage_timer("pdf", "logo"):
+        logo_element = _build_logo_element(logo_base64, display_name, brand_color)
     
     header_data = [[
         logo_element,
@@ -348,7 +343,9 @@ def generate_pdf_report(
     ]
     
     # Chart (Right Side)
-    chart = create_savings_chart(data, input_data)
+    cancellation.check("pdf")
+    with stage_timer("pdf", "chart"):
+        chart = create_savings_chart(data, input_data)
     
     # Combine into a 2-column layout
     split_table = Table([
@@ -398,8 +395,10 @@ def generate_pdf_report(
         ParagraphStyle('Footer', fontName=FONT, alignment=TA_CENTER, spaceBefore=4)
     ))
     
-    # Build PDF
-    doc.build(elements)
+    # Build PDF, checking for a disconnected client after each flowable
+    doc.afterFlowable = lambda flowable: cancellation.check("pdf")
+    with stage_timer("pdf", "build"):
+        doc.build(elements)
     
     pdf_bytes = buffer.getvalue()
     buffer.close()
@@ -0,0 +1,294 @@
+"""
+phasing.py - Portfolio Rollout Phasing
+
+Simulates rolling out a set of funded automations quarter by quarter when
+only a limited number can be implemented at the same time, and searches
+for the rollout order that makes the whole portfolio pay back soonest.
+
+Model (per project, quarters counted from 0):
+    start       first free implementation slot, taken in rollout order
+    go-live     start + implementation window
+    cost        implementation_cost paid in the start quarter
+    cash flow   quarterly net savings from the cash-flow engine (gross
+                savings growing with volume, minus recurring costs),
+                beginning in the go-live quarter
+
+The portfolio curve is the cumulative sum of every project's cash flow.
+Payback is the first quarter (1-based) where it is non-negative. Projects
+that do not start within the horizon contribute nothing to it.
+
+Ordering search: a few priority rules (fastest individual payback, highest
+quarterly net, net per slot-quarter) are simulated and the best is refined
+with adjacent swaps. Candidates are compared by payback, then by the area
+under the curve. Each simulation computes all projects × quarters at once
+with NumPy.
+"""
+
+import heapq
+import time
+from collections import Counter
+from typing import Optional
+
+import cancellation
+
+DEFAULT_HORIZON_QUARTERS = 20
+
+# Full simulations allowed for swap refinement after the priority rules
+SEARCH_MAX_EVALUATIONS = 500
+
+
+class PhasingPlan:
+    """
+    Projects and their quarterly cash-flow profiles, ready to simulate.
+
+    `profiles[i, k]` is project i's cumulative net cash flow k quarters
+    after go-live (implementation cost excluded).
+    """
+
+    def __init__(self, ids: list, names: list, costs, quarterly_net, profiles, durations, capacity: int,
+                 horizon_quarters: int):
+        import numpy as np
+
+        self.ids = ids
+        self.names = names
+        self.costs = costs
+        self.quarterly_net = quarterly_net
+        self.profiles = profiles
+        self.durations = durations
+        self.capacity = capacity
+        self.horizon_quarters = horizon_quarters
+        self.uniform_duration = bool((durations == durations[0]).all()) if len(durations) else True
+        self._duration_list = durations.tolist()
+        self._quarters = np.arange(horizon_quarters)
+        self._rows = np.arange(len(ids))[:, None]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # -------------------------------------------------------------------------
+    # Simulation
+    # -------------------------------------------------------------------------
+
+    def schedule(self, order):
+        """Start and go-live quarter per project (indexed by project) for a rollout order."""
+        import numpy as np
+
+        n = len(self)
+        if self.uniform_duration:
+            # Slots free up together, so each batch of `capacity` starts at once
+            rank = np.empty(n, dtype=int)
+            rank[order] = np.arange(n)
+            start = (rank // self.capacity) * (int(self.durations[0]) if n else 0)
+        else:
+            starts = [0] * n
+            slots = [0] * min(self.capacity, n)
+            durations = self._duration_list
+            for index in order.tolist():
+                free_at = slots[0]
+                starts[index] = free_at
+                heapq.heapreplace(slots, free_at + durations[index])
+            start = np.array(starts)
+        return start, start + self.durations
+
+    def curve(self, start, live):
+        """Portfolio cumulative cash flow per quarter for given start/go-live quarters."""
+        import numpy as np
+
+        offset = self._quarters[None, :] - live[:, None]
+        running = self.profiles[self._rows, np.clip(offset, 0, self.horizon_quarters - 1)]
+        savings = np.where(offset >= 0, running, 0.0).sum(axis=0)
+        in_horizon = start < self.horizon_quarters
+        spend = np.bincount(start[in_horizon], weights=self.costs[in_horizon], minlength=self.horizon_quarters)
+        return savings - np.cumsum(spend)
+
+    def evaluate(self, order) -> tuple:
+        """Sort key for an order (lower is better), plus its schedule and curve."""
+        start, live = self.schedule(order)
+        curve = self.curve(start, live)
+        payback = _payback_quarter(curve)
+        key = (payback if payback is not None else self.horizon_quarters + 1, -float(curve.sum()))
+        return key, start, live, curve
+
+
+def _payback_quarter(curve) -> Optional[int]:
+    """First quarter (1-based) where the curve is non-negative, or None."""
+    import numpy as np
+
+    hits = np.flatnonzero(curve >= 0)
+    return int(hits[0]) + 1 if len(hits) else None
+
+
+def build_plan(entries: list, capacity: int, implementation_quarters: int = 1, durations: Optional[dict] = None,
+               horizon_quarters: int = DEFAULT_HORIZON_QUARTERS) -> PhasingPlan:
+    """
+    Score (id, name, ROIInput) entries and build their quarterly profiles.
+
+    Args:
+        entries: Tuples of (id, name, validated ROIInput)
+        capacity: Projects that can be implemented at the same time
+        implementation_quarters: Default implementation window in quarters
+        durations: Optional per-id override of the implementation window
+        horizon_quarters: Quarters to simulate
+
+    Returns:
+        PhasingPlan
+
+    Raises:
+        ValueError: On a non-positive capacity, window or horizon, a duplicate
+                    id, or a duration for an id that is not in entries
+    """
+    import numpy as np
+    import cashflow
+    from calculator import calculate_roi
+
+    durations = durations or {}
+    if capacity < 1:
+        raise ValueError("capacity must be at least 1")
+    if horizon_quarters < 1:
+        raise ValueError("horizon_quarters must be at least 1")
+    ids = [id for id, _, _ in entries]
+    duplicates = sorted(id for id, count in Counter(ids).items() if count > 1)
+    if duplicates:
+        raise ValueError(f"Duplicate project ids: {', '.join(duplicates)}")
+    unknown = sorted(set(durations) - set(ids))
+    if unknown:
+        raise ValueError(f"durations given for unknown project ids: {', '.join(unknown)}")
+    windows = np.array([durations.get(id, implementation_quarters) for id, _, _ in entries], dtype=int)
+    if (windows < 1).any() or implementation_quarters < 1:
+        raise ValueError("Implementation windows must be at least 1 quarter")
+
+    results = [calculate_roi(inputs) for _, _, inputs in entries]
+    projection = cashflow.project_batch(
+        [r.annual_savings for r in results],
+        [r.annual_automation_cost for r in results],
+        0.0,
+        [inputs.volume_growth for _, _, inputs in entries],
+        horizon_years=-(-horizon_quarters // 4),
+        period="quarter",
+    )
+    net = np.asarray(projection.net)[:, :horizon_quarters].reshape(len(entries), horizon_quarters)
+    return PhasingPlan(
+        ids=ids,
+        names=[name for _, name, _ in entries],
+        costs=np.array([inputs.implementation_cost for _, _, inputs in entries], dtype=float),
+        quarterly_net=net[:, 0] if len(entries) else np.zeros(0),
+        profiles=np.cumsum(net, axis=1),
+        durations=windows,
+        capacity=capacity,
+        horizon_quarters=horizon_quarters,
+    )
+
+
+# =============================================================================
+# ORDERING SEARCH
+# =============================================================================
+
+def priority_orders(plan: PhasingPlan) -> dict:
+    """Candidate rollout orders from simple priority rules."""
+    import numpy as np
+
+    net = plan.quarterly_net
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Projects that never pay back individually go last
+        payback = np.where(net > 0, plan.costs / net, np.inf)
+    return {
+        "as_listed": np.arange(len(plan)),
+        "fastest_payback": np.lexsort((-net, payback)),
+        "highest_net": np.argsort(-net, kind="stable"),
+        "net_per_slot_quarter": np.argsort(-net / plan.durations, kind="stable"),
+    }
+
+
+def refine(plan: PhasingPlan, order, best: tuple, max_evaluations: int = SEARCH_MAX_EVALUATIONS) -> tuple:
+    """
+    Improve an order with adjacent swaps until a full pass finds nothing
+    better or the evaluation budget runs out.
+
+    Returns:
+        Tuple of (order, evaluation, evaluations used)
+    """
+    order = order.copy()
+    evaluations = 0
+    improved = True
+    while improved and evaluations < max_evaluations:
+        cancellation.check("phasing")
+        improved = False
+        start = best[1]
+        for i in range(len(order) - 1):
+            a, b = order[i], order[i + 1]
+            # Neighbours that start together swap to an identical schedule
+            if start[a] == start[b] and plan.durations[a] == plan.durations[b]:
+                continue
+            if evaluations >= max_evaluations:
+                break
+            order[i], order[i + 1] = b, a
+            candidate = plan.evaluate(order)
+            evaluations += 1
+            if candidate[0] < best[0]:
+                best, start, improved = candidate, candidate[1], True
+            else:
+                order[i], order[i + 1] = a, b
+    return order, best, evaluations
+
+
+def simulate(plan: PhasingPlan, order: Optional[list] = None, max_evaluations: int = SEARCH_MAX_EVALUATIONS) -> dict:
+    """
+    Simulate a rollout, searching for the fastest-payback order unless one is given.
+
+    Args:
+        plan: PhasingPlan from build_plan()
+        order: Optional project ids in rollout order (every id exactly once)
+        max_evaluations: Simulation budget for swap refinement
+
+    Returns:
+        Dict with the schedule, quarterly portfolio curve, payback and timing
+
+    Raises:
+        ValueError: If order is not a permutation of the plan's ids
+    """
+    import numpy as np
+
+    begin = time.perf_counter()
+    strategies = {}
+    if order is not None:
+        position = {id: index for index, id in enumerate(plan.ids)}
+        if sorted(order) != sorted(plan.ids):
+            raise ValueError("order must list every project id exactly once")
+        strategy = "given"
+        best_order = np.array([position[id] for id in order], dtype=int)
+        best = plan.evaluate(best_order)
+        evaluations = 1
+    else:
+        candidates = {name: (o, plan.evaluate(o)) for name, o in priority_orders(plan).items()}
+        strategies = {name: _payback_quarter(evaluation[3]) for name, (_, evaluation) in candidates.items()}
+        strategy, (best_order, best) = min(candidates.items(), key=lambda item: item[1][1][0])
+        best_order, refined, evaluations = refine(plan, best_order, best, max_evaluations)
+        if refined[0] < best[0]:
+            strategy, best = f"{strategy}+swaps", refined
+        evaluations += len(candidates)
+
+    _, start, live, curve = best
+    quarterly = np.diff(curve, prepend=0.0)
+    return {
+        "strategy": strategy,
+        "payback_quarter": _payback_quarter(curve),
+        "final_cumulative": round(float(curve[-1]), 2) if len(curve) else 0.0,
+        "horizon_quarters": plan.horizon_quarters,
+        "capacity": plan.capacity,
+        "schedule": [
+            {
+                "id": plan.ids[index],
+                "name": plan.names[index],
+                "start_quarter": int(start[index]) + 1,
+                "live_quarter": int(live[index]) + 1,
+                "implementation_cost": round(float(plan.costs[index]), 2),
+                "quarterly_net": round(float(plan.quarterly_net[index]), 2),
+            }
+            for index in best_order
+        ],
+        "net": [round(float(x), 2) for x in quarterly],
+        "cumulative": [round(float(x), 2) for x in curve],
+        "strategies": strategies,
+        "evaluations": evaluations,
+        "solve_ms": round((time.perf_counter() - begin) * 1000, 3),
+    }
@@ -0,0 +1,305 @@
+"""
+portfolio.py - Budget-Constrained Project Selection
+
+Chooses which candidate automations to fund so that total five-year net
+savings (or NPV) is as large as possible without exceeding the
+implementation budget and, optionally, a cap on the staff involved.
+
+Methods:
+    exact   Depth-first branch-and-bound over items sorted by value per
+            unit of weight, pruned with the fractional-knapsack (LP) bound.
+            Proven optimal unless BB_MAX_NODES is reached.
+    greedy  Greedy fill in the same order, compared with the single best
+            item. Runs in O(n log n) for thousands of candidates.
+    auto    exact up to EXACT_MAX_ITEMS candidates, greedy beyond.
+
+With a staff cap the two constraints are combined into one surrogate
+weight (see _Surrogate) for ordering and bounding; feasibility is always
+checked against the real budget and staff limits.
+
+Every result reports the LP upper bound and the optimality gap against it,
+plus timing, so a greedy answer can be judged without solving exactly.
+"""
+
+import math
+import time
+from typing import Optional
+
+import cancellation
+
+# Candidates above this count are solved greedily when method="auto"
+EXACT_MAX_ITEMS = 500
+
+# Branch-and-bound gives up (keeping its best answer) after this many nodes
+BB_MAX_NODES = 200_000
+
+# Branch-and-bound nodes between cancellation checks
+CANCEL_CHECK_NODES = 4096
+
+# Values within this many dollars are treated as equal when pruning
+EPSILON = 1e-6
+
+# Grid points tried when folding the staff cap into the budget constraint
+SURROGATE_STEPS = 20
+
+
+class Candidate:
+    """One project that could be funded."""
+
+    __slots__ = ("id", "name", "cost", "value", "staff")
+
+    def __init__(self, id: str, name: str, cost: float, value: float, staff: int = 0):
+        self.id = id
+        self.name = name
+        self.cost = cost
+        self.value = value
+        self.staff = staff
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "implementation_cost": round(self.cost, 2),
+            "value": round(self.value, 2),
+            "staff_count": self.staff,
+        }
+
+
+class _Surrogate:
+    """
+    Budget and staff constraints folded into one: each item weighs
+    lam * cost / budget + (1 - lam) * staff / max_staff against a capacity
+    of 1. Any lam in [0, 1] relaxes the problem, so its LP (fractional
+    knapsack) value is an upper bound; lam is chosen to make it tightest.
+    Without a staff cap this is the plain budget knapsack.
+    """
+
+    def __init__(self, items: list, budget: float, max_staff: Optional[int]):
+        import numpy as np
+
+        self.values = np.array([c.value for c in items], dtype=float)
+        # Items are pre-filtered to fit, so a zero limit only leaves zero-weight items
+        self.cost_share = np.array([c.cost for c in items], dtype=float) / (budget or 1)
+        self.staff_share = np.array([c.staff for c in items], dtype=float) / (max_staff or 1)
+        self.lam = 1.0
+        if max_staff is not None and items:
+            grid = np.linspace(0, 1, SURROGATE_STEPS + 1)
+            self.lam = float(min(grid, key=self._bound_for))
+        self.weights = self._weights(self.lam)
+        # Item indices by value per unit of weight, best first
+        self.order = self._order(self.weights)
+
+    def _weights(self, lam: float):
+        return lam * self.cost_share + (1 - lam) * self.staff_share
+
+    def _order(self, weights):
+        import numpy as np
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            density = np.where(weights > 0, self.values / weights, np.inf)
+        return np.argsort(-density, kind="stable")
+
+    def _bound_for(self, lam: float) -> float:
+        import numpy as np
+
+        weights = self._weights(lam)
+        order = self._order(weights)
+        w, v = weights[order], self.values[order]
+        used = np.cumsum(w)
+        full = int(np.searchsorted(used, 1.0, side="right"))
+        total = float(v[:full].sum())
+        if full < len(v):
+            room = 1.0 - (used[full - 1] if full else 0.0)
+            total += float(v[full]) * room / float(w[full])
+        return total
+
+    def bound(self) -> float:
+        return self._bound_for(self.lam)
+
+
+def upper_bound(items: list, budget: float, max_staff: Optional[int] = None) -> float:
+    """Upper bound on the best achievable value (surrogate LP relaxation)."""
+    return _Surrogate(items, budget, max_staff).bound()
+
+
+def build_candidates(entries: list, objective: str = "net_savings", horizon_years: int = 5,
+                     discount_rate: float = 8) -> list:
+    """
+    Score (id, name, ROIInput) entries with the cash-flow engine.
+
+    Args:
+        entries: Tuples of (id, name, validated ROIInput)
+        objective: "net_savings" (cumulative net cash flow at the horizon,
+                   five_year_savings for 5 years) or "npv"
+        horizon_years: Projection horizon
+        discount_rate: Annual discount rate % (npv only)
+
+    Returns:
+        List of Candidate
+    """
+    import cashflow
+    from calculator import calculate_roi
+
+    if not entries:
+        return []
+    results = [calculate_roi(inputs) for _, _, inputs in entries]
+    projection = cashflow.project_batch(
+        [r.annual_savings for r in results],
+        [r.annual_automation_cost for r in results],
+        [inputs.implementation_cost for _, _, inputs in entries],
+        [inputs.volume_growth for _, _, inputs in entries],
+        horizon_years=horizon_years,
+    )
+    if objective == "npv":
+        values = cashflow.npv(projection, discount_rate)
+    elif objective == "net_savings":
+        values = projection.cumulative[:, -1]
+    else:
+        raise ValueError("objective must be net_savings or npv")
+
+    return [
+        Candidate(id, name, inputs.implementation_cost, float(value), inputs.staff_count)
+        for (id, name, inputs), value in zip(entries, values)
+    ]
+
+
+# =============================================================================
+# SOLVERS
+# =============================================================================
+
+def solve_greedy(items: list, budget: float, max_staff: Optional[int] = None,
+                 surrogate: Optional[_Surrogate] = None) -> list:
+    """
+    Take items by value per unit of surrogate weight (value per dollar
+    without a staff cap) while they fit; keep the best single item if better.
+    """
+    surrogate = surrogate or _Surrogate(items, budget, max_staff)
+    staff_cap = math.inf if max_staff is None else max_staff
+    chosen, cost, staff = [], 0.0, 0
+    for index in surrogate.order:
+        c = items[index]
+        if cost + c.cost <= budget and staff + c.staff <= staff_cap:
+            chosen.append(c)
+            cost += c.cost
+            staff += c.staff
+
+    best_single = max(items, key=lambda c: c.value, default=None)
+    if best_single is not None and best_single.value > sum(c.value for c in chosen):
+        return [best_single]
+    return chosen
+
+
+def solve_exact(items: list, budget: float, max_staff: Optional[int] = None,
+                max_nodes: int = BB_MAX_NODES, surrogate: Optional[_Surrogate] = None) -> tuple[list, bool]:
+    """
+    Branch-and-bound for the 0/1 knapsack (with an optional staff cap),
+    pruned with the surrogate LP bound.
+
+    Returns:
+        Tuple of (chosen items, proven optimal)
+    """
+    surrogate = surrogate or _Surrogate(items, budget, max_staff)
+    ordered = [items[index] for index in surrogate.order]
+    n = len(ordered)
+    values = [c.value for c in ordered]
+    costs = [c.cost for c in ordered]
+    staff = [c.staff for c in ordered]
+    weights = surrogate.weights[surrogate.order].tolist()
+    staff_cap = math.inf if max_staff is None else max_staff
+
+    # Greedy answer as the starting incumbent makes early pruning effective
+    incumbent = solve_greedy(items, budget, max_staff, surrogate)
+    best_value = sum(c.value for c in incumbent)
+    best_path, found = None, False
+    nodes = 0
+
+    def bound(i: int, capacity: float, total: float) -> float:
+        for j in range(i, n):
+            if weights[j] <= capacity:
+                capacity -= weights[j]
+                total += values[j]
+            else:
+                return total + values[j] * capacity / weights[j]
+        return total
+
+    # Depth-first with an explicit stack; paths are (index, parent) chains.
+    # `room` is the unused surrogate capacity.
+    stack = [(0, budget, staff_cap, 1.0, 0.0, None)]
+    while stack and nodes < max_nodes:
+        i, capacity, staff_left, room, total, path = stack.pop()
+        if total > best_value + EPSILON:
+            best_value, best_path, found = total, path, True
+        if i == n:
+            continue
+        nodes += 1
+        if nodes % CANCEL_CHECK_NODES == 0:
+            cancellation.check("portfolio")
+        if bound(i, room, total) <= best_value + EPSILON:
+            continue
+        stack.append((i + 1, capacity, staff_left, room, total, path))
+        if costs[i] <= capacity and staff[i] <= staff_left:
+            # Pushed last so "take item i" is explored first
+            stack.append((i + 1, capacity - costs[i], staff_left - staff[i], room - weights[i],
+                          total + values[i], (i, path)))
+
+    if not found:
+        return incumbent, not stack
+    chosen = []
+    while best_path is not None:
+        index, best_path = best_path
+        chosen.append(ordered[index])
+    return chosen, not stack
+
+
+def optimize(
+    candidates: list,
+    budget: float,
+    max_staff: Optional[int] = None,
+    method: str = "auto",
+) -> dict:
+    """
+    Select the subset of candidates with the highest total value.
+
+    Args:
+        candidates: Candidate objects (value already in the chosen objective)
+        budget: Total implementation_cost that may be spent
+        max_staff: Optional cap on the summed staff_count of funded projects
+        method: "auto", "exact" or "greedy"
+
+    Returns:
+        Dict with the selection, totals, upper bound, optimality gap and timing
+    """
+    start = time.perf_counter()
+    staff_cap = math.inf if max_staff is None else max_staff
+    # Items that lose money or can never fit are never worth funding
+    items = [c for c in candidates if c.value > 0 and c.cost <= budget and c.staff <= staff_cap]
+
+    if method == "auto":
+        method = "exact" if len(items) <= EXACT_MAX_ITEMS else "greedy"
+    surrogate = _Surrogate(items, budget, max_staff)
+    if method == "exact":
+        chosen, optimal = solve_exact(items, budget, max_staff, surrogate=surrogate)
+    elif method == "greedy":
+        chosen, optimal = solve_greedy(items, budget, max_staff, surrogate), False
+    else:
+        raise ValueError("method must be auto, exact or greedy")
+
+    total_value = sum(c.value for c in chosen)
+    bound = surrogate.bound()
+    if total_value >= bound - EPSILON:
+        optimal = True
+    gap = 0.0 if optimal or bound <= 0 else (bound - total_value) / bound * 100
+
+    return {
+        "method": method,
+        "optimal": optimal,
+        "selected": [c.to_dict() for c in sorted(chosen, key=lambda c: c.value, reverse=True)],
+        "total_cost": round(sum(c.cost for c in chosen), 2),
+        "total_value": round(total_value, 2),
+        "total_staff": sum(c.staff for c in chosen),
+        "upper_bound": round(bound, 2),
+        "optimality_gap_percent": round(gap, 3),
+        "candidates": len(candidates),
+        "eligible": len(items),
+        "solve_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
@@ -0,0 +1,223 @@
+"""
+profiling.py - On-Demand Request Profiling
+
+Profiles a single live request when an admin asks for it, so slow PDFs and
+calculations reported by customers can be inspected without reproducing them.
+
+Usage:
+    Send X-Admin-Token plus either an `X-Profile: 1` header or a `?profile=1`
+    query parameter to a profiled endpoint. The response carries an
+    X-Profile-Id header; fetch the result from /admin/profiles/{id}.
+
+Configuration:
+    PROFILE_DIR        Where profiles are written (default: ./profiles)
+    PROFILE_MAX_FILES  Oldest profiles are deleted beyond this count (default: 50)
+    PROFILER           "pyinstrument" (sampling, if installed) or "cprofile".
+                       Default: pyinstrument when available, else cProfile.
+
+Requests without the flag only pay for one header and one query lookup.
+"""
+
+import functools
+import html
+import inspect
+import io
+import logging
+import os
+import time
+import uuid
+from typing import Optional
+
+from fastapi import Request
+
+from admin import is_admin
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILER = os.getenv("PROFILER", "").lower()
+
+PROFILE_FORMATS = ("html", "pstats")
+
+logger = logging.getLogger(__name__)
+
+
+def _profiling_requested(request: Optional[Request]) -> bool:
+    if request is None:
+        return False
+    flag = request.headers.get("x-profile") or request.query_params.get("profile")
+    if not flag or flag.lower() in ("0", "false", "no"):
+        return False
+    return is_admin(request.headers.get("x-admin-token"))
+
+
+def _use_pyinstrument() -> bool:
+    if PROFILER == "cprofile":
+        return False
+    try:
+        import pyinstrument  # noqa: F401
+        return True
+    except ImportError:
+        if PROFILER == "pyinstrument":
+            raise
+        return False
+
+
+# =============================================================================
+# PROFILE CAPTURE
+# =============================================================================
+
+class _Capture:
+    """Runs one profiler around a block and writes its output to PROFILE_DIR."""
+
+    def __init__(self, route: str, is_async: bool = False):
+        self.profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{route.strip('/').replace('/', '_') or 'root'}-{uuid.uuid4().hex[:8]}"
+        self.is_async = is_async
+        self.profiler = None
+        self.pyinstrument = _use_pyinstrument()
+
+    def start(self) -> None:
+        if self.pyinstrument:
+            from pyinstrument import Profiler
+            self.profiler = Profiler(async_mode="enabled" if self.is_async else "disabled")
+            self.profiler.start()
+        else:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop(self) -> None:
+        if self.pyinstrument:
+            self.profiler.stop()
+        else:
+            self.profiler.disable()
+        try:
+            self._save()
+        except Exception:
+            # A failed profile write must never fail the profiled request
+            logger.exception("Could not save profile %s", self.profile_id)
+
+    def _save(self) -> None:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, self.profile_id)
+        if self.pyinstrument:
+            with open(base + ".html", "w") as f:
+                f.write(self.profiler.output_html())
+            try:
+                from pyinstrument.renderers import PstatsRenderer
+                with open(base + ".pstats", "wb") as f:
+                    f.write(self.profiler.output(PstatsRenderer()).encode("utf-8", "surrogateescape"))
+            except (ImportError, AttributeError):
+                pass
+        else:
+            self.profiler.dump_stats(base + ".pstats")
+        _prune()
+
+
+def profiled(func):
+    """
+    Decorator for endpoints that can be profiled on demand.
+    The endpoint must take a `request: Request` parameter.
+    """
+    route = func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            request = kwargs.get("request")
+            if not _profiling_requested(request):
+                return await func(*args, **kwargs)
+            capture = _Capture(request.url.path or route, is_async=True)
+            capture.start()
+            try:
+                response = await func(*args, **kwargs)
+            finally:
+                capture.stop()
+            return _attach_profile_id(response, capture.profile_id)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        request = kwargs.get("request")
+        if not _profiling_requested(request):
+            return func(*args, **kwargs)
+        capture = _Capture(request.url.path or route)
+        capture.start()
+        try:
+            response = func(*args, **kwargs)
+        finally:
+            capture.stop()
+        return _attach_profile_id(response, capture.profile_id)
+    return wrapper
+
+
+def _attach_profile_id(response, profile_id: str):
+    """Expose the profile ID as a header (wrapping plain return values)."""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse, Response
+
+    if not isinstance(response, Response):
+        response = JSONResponse(jsonable_encoder(response))
+    response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
+# =============================================================================
+# PROFILE STORAGE
+# =============================================================================
+
+def _prune() -> None:
+    """Keep only the newest PROFILE_MAX_FILES profiles."""
+    profiles = list_profiles()
+    for profile in profiles[PROFILE_MAX_FILES:]:
+        for fmt in profile["formats"]:
+            try:
+                os.remove(os.path.join(PROFILE_DIR, f"{profile['id']}.{fmt}"))
+            except OSError:
+                pass
+
+
+def list_profiles() -> list:
+    """Stored profiles, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = {}
+    for filename in os.listdir(PROFILE_DIR):
+        profile_id, _, fmt = filename.rpartition(".")
+        if fmt not in PROFILE_FORMATS:
+            continue
+        path = os.path.join(PROFILE_DIR, filename)
+        entry = profiles.setdefault(profile_id, {"id": profile_id, "formats": [], "created": os.path.getmtime(path)})
+        entry["formats"].append(fmt)
+    return sorted(profiles.values(), key=lambda p: p["created"], reverse=True)
+
+
+def profile_path(profile_id: str, fmt: str) -> Optional[str]:
+    """
+    Path to a stored profile in the requested format, or None if missing.
+    HTML is rendered from pstats on demand when only cProfile output exists.
+    """
+    if fmt not in PROFILE_FORMATS or os.path.basename(profile_id) != profile_id:
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.{fmt}")
+    if os.path.exists(path):
+        return path
+
+    pstats_path = os.path.join(PROFILE_DIR, f"{profile_id}.pstats")
+    if fmt == "html" and os.path.exists(pstats_path):
+        _render_pstats_html(pstats_path, path)
+        return path
+    return None
+
+
+def _render_pstats_html(pstats_path: str, html_path: str) -> None:
+    import pstats
+
+    out = io.StringIO()
+    stats = pstats.Stats(pstats_path, stream=out)
+    stats.sort_stats("cumulative").print_stats(60)
+    with open(html_path, "w") as f:
+        f.write(
+            "<!doctype html><html><head><meta charset='utf-8'>"
+            f"<title>Profile {html.escape(os.path.basename(pstats_path))}</title></head>"
+            f"<body><pre>{html.escape(out.getvalue())}</pre></body></html>"
+        )
@@ -1,12 +1,14 @@
 """
 project_models.py - SQLAlchemy Models for Project Persistence
 
-Defines the Project model for storing ROI calculator projects.
+Defines the Project model for storing ROI calculator projects and the
+ProjectChange log (plus its writer lock) used for incremental sync (see
+project_sync.py).
 """
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, JSON
+from sqlalchemy import Column, String, DateTime, JSON, Integer, Boolean
 from database import Base
 
 
@@ -34,3 +36,31 @@ class Project(Base):
             "results": self.results or {},
             "scenarios": self.scenarios or {},
         }
+
+
+class ProjectChange(Base):
+    """
+    Latest change to each project. Every write replaces the project's row
+    with one under a new, higher seq, so rows after a cursor are exactly the
+    projects changed since then; deleted projects keep a tombstone row.
+    """
+    
+    __tablename__ = "project_changes"
+    __table_args__ = {"sqlite_autoincrement": True}  # Never reuse seqs of replaced rows
+    
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    project_id = Column(String, nullable=False, unique=True, index=True)
+    deleted = Column(Boolean, nullable=False, default=False)
+    changed = Column(DateTime, default=datetime.utcnow)
+
+
+class ProjectChangeLock(Base):
+    """
+    Single row locked (SELECT ... FOR UPDATE) by every transaction that
+    records changes, so on databases with concurrent writers seqs commit in
+    the order they were assigned. Unused on SQLite, which has one writer.
+    """
+    
+    __tablename__ = "project_change_lock"
+    
+    id = Column(Integer, primary_key=True)
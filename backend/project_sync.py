@@ -0,0 +1,216 @@
+"""
+project_sync.py - Incremental Project Sync
+
+Lets clients keep a local copy of the saved projects without downloading
+all of them on every page load.
+
+Every project write gets a new sequence number in project_changes, one row
+per project (deletes leave a tombstone). A project's current seq is its
+version, and the highest seq a client has seen is its cursor:
+
+    changes_since(db, 0)       every project, plus the cursor to continue from
+    changes_since(db, cursor)  only projects written or deleted after it
+
+Clients upload their own edits in batches with the version each edit was
+based on. An edit whose base version is not the project's current version
+was made against a stale copy; it is rejected as a conflict and the current
+server copy is returned so the client can merge and retry.
+
+A cursor only works if seqs become visible in the order they were
+assigned; otherwise a client could read seq 11 while seq 10 is still
+uncommitted and skip seq 10 forever. SQLite's single writer guarantees this.
+On databases with concurrent writers (Postgres, MySQL), every transaction
+that records changes first locks the ProjectChangeLock row, holding it until
+commit, so feed writers are serialized.
+"""
+
+# Changes returned per page of the feed
+MAX_CHANGES_PER_PAGE = 500
+
+# Edits accepted per upload batch
+MAX_UPLOAD_CHANGES = 500
+
+
+def _lock_feed(db) -> None:
+    """Serialize feed writers until the caller's transaction ends (not needed on SQLite)."""
+    from sqlalchemy.exc import IntegrityError
+    from project_models import ProjectChangeLock
+
+    if db.get_bind().dialect.name == "sqlite":
+        return
+    if db.get(ProjectChangeLock, 1, with_for_update=True) is not None:
+        return
+    # First write ever: create the row (a concurrent creator makes us wait, then fail)
+    try:
+        with db.begin_nested():
+            db.add(ProjectChangeLock(id=1))
+    except IntegrityError:
+        db.get(ProjectChangeLock, 1, with_for_update=True, populate_existing=True)
+
+
+def record_changes(db, project_ids: list, deleted: bool = False) -> dict:
+    """
+    Give projects new versions as part of the caller's transaction.
+
+    Returns:
+        Dict of project id -> new version (seq)
+    """
+    from sqlalchemy import delete
+    from project_models import ProjectChange
+
+    if not project_ids:
+        return {}
+    _lock_feed(db)
+    db.execute(delete(ProjectChange).where(ProjectChange.project_id.in_(project_ids)))
+    rows = [ProjectChange(project_id=project_id, deleted=deleted) for project_id in project_ids]
+    db.add_all(rows)
+    db.flush()
+    return {row.project_id: row.seq for row in rows}
+
+
+def _versions(db, project_ids: list) -> dict:
+    """Current version of each project (0 for projects saved before sync existed)."""
+    from project_models import ProjectChange
+
+    if not project_ids:
+        return {}
+    found = db.query(ProjectChange.project_id, ProjectChange.seq).filter(ProjectChange.project_id.in_(project_ids))
+    return dict(found.all())
+
+
+def _latest_seq(db) -> int:
+    from sqlalchemy import func
+    from project_models import ProjectChange
+
+    return db.query(func.max(ProjectChange.seq)).scalar() or 0
+
+
+def _entry(project_id: str, version: int, project) -> dict:
+    return {
+        "id": project_id,
+        "version": version,
+        "deleted": project is None,
+        "project": None if project is None else project.to_dict(),
+    }
+
+
+def changes_since(db, since: int = 0, limit: int = MAX_CHANGES_PER_PAGE) -> dict:
+    """
+    Projects changed after a cursor.
+
+    Args:
+        db: SQLAlchemy session
+        since: Cursor from a previous response; 0 (or a cursor from a reset
+               database) returns every project
+        limit: Changes per page
+
+    Returns:
+        Dict with changes (id, version, deleted and project, null when
+        deleted) in seq order, cursor for the next request, has_more and
+        full (true when changes is the complete list, replacing the client's)
+    """
+    from project_models import Project, ProjectChange
+
+    latest = _latest_seq(db)
+    if since <= 0 or since > latest:
+        # Read after the cursor, so a concurrent write shows up again next time
+        rows = (
+            db.query(Project, ProjectChange.seq)
+            .outerjoin(ProjectChange, ProjectChange.project_id == Project.id)
+            .order_by(Project.updated.desc())
+            .all()
+        )
+        return {
+            "changes": [_entry(project.id, seq or 0, project) for project, seq in rows],
+            "cursor": latest,
+            "has_more": False,
+            "full": True,
+        }
+
+    rows = (
+        db.query(ProjectChange.seq, ProjectChange.project_id, ProjectChange.deleted)
+        .filter(ProjectChange.seq > since)
+        .order_by(ProjectChange.seq)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    live = [row.project_id for row in rows if not row.deleted]
+    projects = {project.id: project for project in db.query(Project).filter(Project.id.in_(live)).all()} if live else {}
+    return {
+        "changes": [_entry(row.project_id, row.seq, projects.get(row.project_id)) for row in rows],
+        "cursor": rows[-1].seq if rows else since,
+        "has_more": has_more,
+        "full": False,
+    }
+
+
+def apply_changes(db, changes: list) -> dict:
+    """
+    Apply a batch of client edits, rejecting those made on stale copies.
+
+    Args:
+        db: SQLAlchemy session
+        changes: Objects with id, base_version (the version the edit started
+                 from, 0 for a project created on the client), deleted and,
+                 unless deleted, name, inputs, results and scenarios
+
+    Returns:
+        Dict with results in input order (id, status "applied" or
+        "conflict", version and the server's project, null when deleted)
+        and cursor (the latest seq after the batch)
+
+    Raises:
+        ValueError: If an id appears more than once or the batch is too large
+    """
+    from project_models import Project
+
+    if len(changes) > MAX_UPLOAD_CHANGES:
+        raise ValueError(f"At most {MAX_UPLOAD_CHANGES} changes per upload")
+    ids = [change.id for change in changes]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Each project may appear only once per upload")
+
+    projects = {project.id: project for project in db.query(Project).filter(Project.id.in_(ids)).all()} if ids else {}
+    versions = _versions(db, ids)
+
+    outcome, upserted, deleted = {}, [], []
+    for change in changes:
+        project = projects.get(change.id)
+        if change.base_version != versions.get(change.id, 0):
+            outcome[change.id] = "conflict"
+            continue
+        outcome[change.id] = "applied"
+        if change.deleted:
+            if project is not None:
+                db.delete(project)
+                projects[change.id] = None
+                deleted.append(change.id)
+            continue
+        if project is None:
+            project = Project(id=change.id)
+            db.add(project)
+            projects[change.id] = project
+        project.name = change.name
+        project.inputs = change.inputs
+        project.results = change.results
+        project.scenarios = change.scenarios or {"base": {"inputs": change.inputs, "results": change.results}}
+        upserted.append(change.id)
+
+    try:
+        db.flush()
+        versions.update(record_changes(db, upserted))
+        versions.update(record_changes(db, deleted, deleted=True))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    # One query for the committed rows instead of a refresh per project
+    projects = {project.id: project for project in db.query(Project).filter(Project.id.in_(ids)).all()} if ids else {}
+    results = [
+        {**_entry(project_id, versions.get(project_id, 0), projects.get(project_id)), "status": outcome[project_id]}
+        for project_id in ids
+    ]
+    return {"results": results, "cursor": _latest_seq(db)}
@@ -0,0 +1,251 @@
+"""
+rate_limiting.py - Pluggable Rate Limit Storage
+
+Builds the slowapi Limiter used by main.py with a configurable storage backend,
+so every uvicorn worker enforces the same per-IP buckets.
+
+Configuration:
+    RATE_LIMIT_STORAGE_URI   Where counters live (default: memory://)
+        memory://                       Per-process, resets on restart
+        sqlite:///./ratelimits.db       Shared by all workers on one host
+        redis://localhost:6379          Shared across hosts (needs `redis`)
+    RATE_LIMIT_STRATEGY      limits strategy (default: sliding-window-counter)
+    RATE_LIMIT_ENABLED       Set to false to disable limits (load tests only)
+
+The Redis backend is the one shipped with `limits`. Any server that speaks the
+Redis protocol and supports Lua scripting (Valkey, KeyDB, Dragonfly, or
+fakeredis for local testing) can stand in for Redis.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from math import floor
+
+from limits import parse
+from limits.storage import Storage, SlidingWindowCounterSupport, storage_from_string
+from limits.storage.base import TimestampedSlidingWindow
+from limits.strategies import STRATEGIES
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.util import get_remote_address
+
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "sliding-window-counter")
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+
+# =============================================================================
+# SQLITE STORAGE
+# =============================================================================
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    Rate limit counters in a SQLite file shared by every process on the host.
+
+    Each sliding-window check-and-increment runs in one BEGIN IMMEDIATE
+    transaction, so concurrent workers can never both take the last slot.
+    WAL mode keeps the per-request cost to a single small write.
+
+    URI format: sqlite:///relative/path.db or sqlite:////absolute/path.db
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    # Delete expired rows after this many writes
+    CLEANUP_INTERVAL = 1000
+
+    def __init__(self, uri: str = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        path = uri.split("://", 1)[1] if uri else ""
+        self.path = path[1:] if path.startswith("/") else path
+        self.path = self.path or "ratelimits.db"
+        self._local = threading.local()
+        self._writes = 0
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, reopened after a fork."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._connection())
+
+    def _get_count(self, conn: sqlite3.Connection, key: str, now: float) -> int:
+        row = conn.execute(
+            "SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _incr(self, conn: sqlite3.Connection, key: str, expiry: float, amount: int, now: float) -> int:
+        row = conn.execute(
+            "INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END, "
+            "expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END "
+            "RETURNING count",
+            (key, amount, now + expiry, now, now),
+        ).fetchone()
+        self._writes += 1
+        if self._writes % self.CLEANUP_INTERVAL == 0:
+            conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+        return row[0]
+
+    # Fixed window / basic counter API
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._transaction() as conn:
+            return self._incr(conn, key, expiry, amount, now)
+
+    def get(self, key: str) -> int:
+        return self._get_count(self._connection(), key, time.time())
+
+    def get_expiry(self, key: str) -> float:
+        row = self._connection().execute(
+            "SELECT expires_at FROM rate_limits WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    # Sliding window counter API
+
+    def _window_info(self, conn, key: str, expiry: int, now: float) -> tuple:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self._get_count(conn, previous_key, now)
+        current_count = self._get_count(conn, current_key, now)
+        previous_ttl = 0.0 if previous_count == 0 else (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl, current_key
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        with self._transaction() as conn:
+            previous_count, previous_ttl, current_count, _, current_key = self._window_info(
+                conn, key, expiry, now
+            )
+            weighted_count = previous_count * previous_ttl / expiry + current_count
+            if floor(weighted_count) + amount > limit:
+                return False
+            self._incr(conn, current_key, 2 * expiry, amount, now)
+            return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple:
+        return self._window_info(self._connection(), key, expiry, time.time())[:4]
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM rate_limits WHERE key IN (?, ?)", (previous_key, current_key))
+
+
+class _ImmediateTransaction:
+    """Context manager for a write-locked SQLite transaction."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# =============================================================================
+# THROTTLE METRICS
+# =============================================================================
+
+class ThrottleMetrics:
+    """Counts requests rejected by the rate limiter, per route and limit."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, route: str, limit: str) -> None:
+        with self._lock:
+            key = (route, limit)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            "throttled_total": sum(counts.values()),
+            "throttled": [
+                {"route": route, "limit": limit, "count": count}
+                for (route, limit), count in sorted(counts.items())
+            ],
+        }
+
+
+throttle_metrics = ThrottleMetrics()
+
+
+def create_limiter() -> Limiter:
+    """Create the application Limiter from the environment configuration."""
+    return Limiter(
+        key_func=get_remote_address,
+        storage_uri=RATE_LIMIT_STORAGE_URI,
+        strategy=RATE_LIMIT_STRATEGY,
+        enabled=RATE_LIMIT_ENABLED,
+    )
+
+
+_quota_limiter = None
+
+
+def hit_quota(limit: str, *identifiers: str) -> bool:
+    """
+    Consume one unit of an ad-hoc quota (e.g. a per-API-key limit) from the
+    configured storage. Returns False when the quota is exhausted.
+    """
+    global _quota_limiter
+    if not RATE_LIMIT_ENABLED:
+        return True
+    if _quota_limiter is None:
+        _quota_limiter = STRATEGIES[RATE_LIMIT_STRATEGY](storage_from_string(RATE_LIMIT_STORAGE_URI))
+    allowed = _quota_limiter.hit(parse(limit), "quota", *identifiers)
+    if not allowed:
+        throttle_metrics.record("quota:" + identifiers[0], limit)
+    return allowed
+
+
+def rate_limit_exceeded_handler(request, exc):
+    """Record the rejection, then return slowapi's standard 429 response."""
+    throttle_metrics.record(request.url.path, str(exc.limit.limit))
+    return _rate_limit_exceeded_handler(request, exc)
@@ -0,0 +1,280 @@
+"""
+result_set.py - Compact Container for Many ROI Results
+
+Holds the inputs and results of many calculations column-wise: numeric
+fields in float64/int64 arrays, frequency, priority, confidence and
+automation type as small integer codes, and only process names as Python
+strings. A ResultSet costs a few hundred bytes per row where a list of
+ROIOutput objects costs several kilobytes (per-instance dicts plus the
+assumptions list, executive summary and recommendation text of every row).
+
+Narrative fields are not stored. They are generated from the row's inputs
+and unrounded results when a row is read, with the same calculator
+functions calculate_roi() uses, so ResultSet[i].to_output() equals
+calculate_roi(inputs[i]).
+
+Usage:
+    results = ResultSet.from_inputs(inputs)
+    best = results.take(results.column("net_annual_savings").argsort()[::-1][:10])
+    outputs = best.to_outputs()
+"""
+
+from typing import Iterable, Iterator, Optional
+
+import batch
+from column_validation import compile_validator
+from models import ROIInput, ROIOutput
+
+# Decimal places of each numeric ROIOutput field
+_DECIMALS = {name: 1 if name in ("automation_savings_percent", "payback_months", "roi_percentage") else 2
+             for name in batch.NUMERIC_OUTPUTS}
+
+# Fields generated on access
+NARRATIVE_FIELDS = ("recommendation", "assumptions", "executive_summary", "automation_type_reasoning")
+
+
+class ResultSet:
+    """
+    Column-wise ROI results.
+
+    Attributes:
+        inputs: ROIInput field -> array (enums as codes, see batch) or, for
+                process_name, list of str
+        outputs: NUMERIC_OUTPUTS name -> unrounded float64 array
+        priority: int8 indexes into batch.PRIORITY_LEVELS
+        confidence: int8 indexes into batch.CONFIDENCE_LEVELS
+        automation_type: int8 indexes into batch.AUTOMATION_TYPES
+        int_inputs: float field -> bool array marking rows where the value
+                    was a Python int. ROIInput keeps ints as given, and the
+                    narrative prints them that way ("70%", not "70.0%").
+    """
+
+    __slots__ = ("inputs", "outputs", "priority", "confidence", "automation_type", "int_inputs")
+
+    def __init__(self, inputs: dict, outputs: dict, priority, confidence, automation_type,
+                 int_inputs: Optional[dict] = None):
+        self.inputs = inputs
+        self.outputs = outputs
+        self.priority = priority
+        self.confidence = confidence
+        self.automation_type = automation_type
+        self.int_inputs = int_inputs or {}
+
+    @classmethod
+    def from_columns(cls, columns: dict, int_inputs: Optional[dict] = None) -> "ResultSet":
+        """
+        Calculate results for validated input columns.
+
+        Args:
+            columns: Every ROIInput field -> equal-length array (list for
+                     process_name, FREQUENCY_CODES for frequency), e.g. the
+                     valid rows of a ColumnValidation
+            int_inputs: Optional, see the class attribute
+        """
+        import numpy as np
+
+        results = batch.calculate_batch({name: values for name, values in columns.items() if name != "process_name"})
+        return cls(
+            inputs=dict(columns),
+            outputs={name: np.asarray(results[name], dtype=np.float64) for name in batch.NUMERIC_OUTPUTS},
+            priority=results["priority"].astype(np.int8),
+            confidence=results["confidence"].astype(np.int8),
+            automation_type=batch.automation_type_codes(
+                results["automation_primary"], results["automation_secondary"], results["automation_hybrid"]
+            ),
+            int_inputs=int_inputs,
+        )
+
+    @classmethod
+    def from_inputs(cls, inputs: Iterable[ROIInput]) -> "ResultSet":
+        """Calculate results for ROIInput objects."""
+        import numpy as np
+
+        inputs = list(inputs)
+        columns, int_inputs = {}, {}
+        for rule in compile_validator(ROIInput).rules:
+            values = [getattr(item, rule.name) for item in inputs]
+            if rule.kind == "str":
+                columns[rule.name] = values
+            elif rule.kind == "enum":
+                columns[rule.name] = np.array([-1 if value is None else rule.members[value.value] for value in values],
+                                              dtype=np.int8)
+            else:
+                columns[rule.name] = np.array(values, dtype={"int": np.int64, "float": np.float64, "bool": bool}[rule.kind])
+            if rule.kind == "float":
+                given_as_int = np.array([type(value) is int for value in values], dtype=bool)
+                if given_as_int.any():
+                    int_inputs[rule.name] = given_as_int
+        return cls.from_columns(columns, int_inputs)
+
+    def __len__(self) -> int:
+        return len(self.priority)
+
+    def __getitem__(self, index: int) -> "ResultRow":
+        n = len(self)
+        if not -n <= index < n:
+            raise IndexError("ResultSet index out of range")
+        return ResultRow(self, index % n)
+
+    def __iter__(self) -> Iterator["ResultRow"]:
+        return (ResultRow(self, index) for index in range(len(self)))
+
+    def column(self, name: str):
+        """
+        One field for every row: numeric outputs unrounded (float64 array),
+        categorical outputs as lists of labels, inputs as stored.
+        """
+        if name in self.outputs:
+            return self.outputs[name]
+        if name in self.inputs:
+            return self.inputs[name]
+        labels = {
+            "priority_score": (self.priority, batch.PRIORITY_LEVELS),
+            "confidence_level": (self.confidence, batch.CONFIDENCE_LEVELS),
+            "recommended_automation_type": (self.automation_type, batch.AUTOMATION_TYPES),
+        }
+        if name not in labels:
+            raise KeyError(name)
+        codes, levels = labels[name]
+        return [levels[code] for code in codes.tolist()]
+
+    def take(self, indexes) -> "ResultSet":
+        """Rows at the given indexes (or boolean mask), in that order."""
+        import numpy as np
+
+        indexes = np.asarray(indexes)
+        if indexes.dtype == bool:
+            indexes = np.flatnonzero(indexes)
+        names = self.inputs["process_name"]
+        return ResultSet(
+            inputs={
+                name: [names[i] for i in indexes.tolist()] if name == "process_name" else values[indexes]
+                for name, values in self.inputs.items()
+            },
+            outputs={name: values[indexes] for name, values in self.outputs.items()},
+            priority=self.priority[indexes],
+            confidence=self.confidence[indexes],
+            automation_type=self.automation_type[indexes],
+            int_inputs={name: values[indexes] for name, values in self.int_inputs.items()},
+        )
+
+    def to_outputs(self) -> list:
+        """Materialize every row as an ROIOutput."""
+        return [row.to_output() for row in self]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns, process names included."""
+        import sys
+
+        arrays = list(self.outputs.values()) + list(self.int_inputs.values())
+        arrays += [self.priority, self.confidence, self.automation_type]
+        total = sum(values.nbytes for values in arrays)
+        for name, values in self.inputs.items():
+            if name == "process_name":
+                total += sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+            else:
+                total += values.nbytes
+        return total
+
+
+class ResultRow:
+    """
+    View of one row of a ResultSet with ROIOutput's attributes. Numbers are
+    rounded like ROIOutput; narrative fields are generated on each access.
+    """
+
+    __slots__ = ("_results", "_index")
+
+    def __init__(self, results: ResultSet, index: int):
+        self._results = results
+        self._index = index
+
+    def __getattr__(self, name: str):
+        results, index = self._results, self._index
+        if name in _DECIMALS:
+            return round(float(results.outputs[name][index]), _DECIMALS[name])
+        if name == "process_name":
+            return results.inputs["process_name"][index]
+        if name == "priority_score":
+            return batch.PRIORITY_LEVELS[results.priority[index]]
+        if name == "confidence_level":
+            return batch.CONFIDENCE_LEVELS[results.confidence[index]]
+        if name == "recommended_automation_type":
+            return batch.AUTOMATION_TYPES[results.automation_type[index]]
+        if name in NARRATIVE_FIELDS:
+            return self.narrative()[name]
+        raise AttributeError(f"'ResultRow' object has no attribute '{name}'")
+
+    def __repr__(self) -> str:
+        return f"ResultRow({self._index}, process_name={self.process_name!r})"
+
+    def inputs(self) -> ROIInput:
+        """The row's inputs as an ROIInput (not re-validated)."""
+        values = {}
+        for rule in compile_validator(ROIInput).rules:
+            value = self._results.inputs[rule.name][self._index]
+            if rule.kind == "enum":
+                value = None if value < 0 else rule.type(list(rule.members)[value])
+            elif rule.kind != "str":
+                value = value.item()
+                given_as_int = self._results.int_inputs.get(rule.name)
+                if given_as_int is not None and given_as_int[self._index]:
+                    value = int(value)
+            values[rule.name] = value
+        return ROIInput.model_construct(**values)
+
+    def narrative(self) -> dict:
+        """recommendation, assumptions, executive_summary and automation_type_reasoning."""
+        from calculator import (
+            CalculatorConfig,
+            calculate_periods_per_year,
+            _build_assumptions_list,
+            _generate_executive_summary,
+            _generate_recommendation,
+            _recommend_automation_type,
+        )
+
+        config = CalculatorConfig()
+        inputs = self.inputs()
+        outputs, index = self._results.outputs, self._index
+
+        def value(name):
+            return float(outputs[name][index])
+
+        runs_per_year = inputs.runs_per_period * calculate_periods_per_year(
+            inputs.frequency, inputs.working_days_per_year, inputs.hours_per_day
+        )
+        priority_score, recommendation = _generate_recommendation(
+            value("payback_months"), value("roi_percentage"), value("net_annual_savings"), config
+        )
+        automation_type, reasoning = _recommend_automation_type(inputs, runs_per_year)
+        executive_summary = _generate_executive_summary(
+            inputs=inputs,
+            net_annual_savings=value("net_annual_savings"),
+            payback_months=value("payback_months"),
+            priority_score=priority_score,
+            total_current_cost=value("total_current_cost"),
+            annual_labor_cost=value("annual_labor_cost"),
+            runs_per_year=runs_per_year,
+            automation_type=automation_type,
+            automation_reasoning=reasoning,
+        )
+        return {
+            "recommendation": recommendation,
+            "assumptions": _build_assumptions_list(inputs, config),
+            "executive_summary": executive_summary,
+            "automation_type_reasoning": reasoning,
+        }
+
+    def to_output(self) -> ROIOutput:
+        """Materialize the row as an ROIOutput."""
+        fields = {name: getattr(self, name) for name in _DECIMALS}
+        return ROIOutput(
+            process_name=self.process_name,
+            **fields,
+            priority_score=self.priority_score,
+            confidence_level=self.confidence_level,
+            recommended_automation_type=self.recommended_automation_type,
+            **self.narrative(),
+        )
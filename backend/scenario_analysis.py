@@ -0,0 +1,167 @@
+"""
+scenario_analysis.py - What-If Scenarios
+
+Evaluates one base ROIInput under named override sets side by side: the
+conservative / realistic / aggressive presets of the scenario toggle plus
+any user-defined sets. An override set replaces fields (overrides) and/or
+multiplies numeric fields of the base (scale, clamped to the field's
+limits so a preset stays valid for any base), e.g.
+
+    {"name": "late", "overrides": {"expected_labor_reduction": 60},
+     "scale": {"implementation_cost": 1.5}}
+
+The base is evaluated once on the incremental dependency graph; each
+scenario recomputes only the nodes downstream of the fields it changes and
+reuses the rest, so its result equals calculate_roi() on its inputs. The
+cash flows of all scenarios are then projected together with
+cashflow.project_batch(). The cumulative series start at period 0 with the
+implementation cost, ready to be drawn as one line per scenario.
+"""
+
+import time
+
+from pydantic import ValidationError
+
+import incremental
+from metrics import stage_timer
+from models import ROIInput
+
+# Scenario toggle presets: labor reduction and implementation cost bands
+PRESETS = {
+    "conservative": {"overrides": {"expected_labor_reduction": 50}, "scale": {"implementation_cost": 1.25}},
+    "realistic": {"overrides": {"expected_labor_reduction": 70}, "scale": {}},
+    "aggressive": {"overrides": {"expected_labor_reduction": 90}, "scale": {"implementation_cost": 0.75}},
+}
+
+BASE_SCENARIO = "base"
+
+
+def _apply(base: dict, name: str, overrides: dict, scale: dict) -> dict:
+    """Base field values with a scenario's scale factors, then overrides, applied."""
+    unknown = sorted(set(overrides) - set(ROIInput.model_fields)) + sorted(set(scale) - set(ROIInput.model_fields))
+    if unknown:
+        raise ValueError(f"Scenario '{name}': unknown fields {', '.join(unknown)}")
+    values = dict(base)
+    for field, factor in scale.items():
+        info = ROIInput.model_fields[field]
+        value = values.get(field, info.default)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Scenario '{name}': cannot scale non-numeric field {field}")
+        value = value * factor
+        if info.annotation is int:
+            value = round(value)
+        for constraint in info.metadata:
+            if getattr(constraint, "le", None) is not None:
+                value = min(value, constraint.le)
+            if getattr(constraint, "ge", None) is not None:
+                value = max(value, constraint.ge)
+        values[field] = value
+    values.update(overrides)
+    return values
+
+
+def _dirty_nodes(base: ROIInput, inputs: ROIInput) -> set:
+    """Graph nodes affected by the fields in which inputs differ from base."""
+    dirty = set()
+    for field in ROIInput.model_fields:
+        old, new = getattr(base, field), getattr(inputs, field)
+        # 70 vs 70.0 compare equal but render differently in the narrative
+        if old != new or type(old) is not type(new):
+            dirty |= incremental.FIELD_DEPENDENTS[field]
+    return dirty
+
+
+def evaluate(
+    base: ROIInput,
+    scenarios: list,
+    include_presets: bool = True,
+    horizon_years: int = 5,
+    period: str = "year",
+) -> dict:
+    """
+    Calculate the base input and every scenario.
+
+    Args:
+        base: Input the scenarios modify
+        scenarios: (name, overrides, scale) tuples; a name that matches a
+                   preset replaces it
+        include_presets: Add the PRESETS scenarios after the base
+        horizon_years: Years of the cumulative cash-flow series
+        period: "year", "quarter" or "month"
+
+    Returns:
+        Dict with scenarios in order (name, fields changed from the base,
+        ROIOutput fields, payback period and final cumulative cash flow),
+        chart (periods and one cumulative series per scenario, period 0
+        being the implementation cost) and evaluate_ms
+
+    Raises:
+        ValueError: On duplicate or unknown names/fields, or scenario inputs
+                    that fail ROIInput validation
+    """
+    import numpy as np
+    import cashflow
+
+    start = time.perf_counter()
+    specs = {}
+    if include_presets:
+        specs.update({name: (preset["overrides"], preset["scale"]) for name, preset in PRESETS.items()})
+    seen = set()
+    for name, overrides, scale in scenarios:
+        if name == BASE_SCENARIO or name in seen:
+            raise ValueError(f"Duplicate scenario name: {name}")
+        seen.add(name)
+        specs[name] = (overrides, scale)
+
+    base_values, _ = incremental.evaluate(base)
+    # Unset fields stay unset so they take their defaults, exactly as in base
+    base_fields = base.model_dump(exclude_unset=True)
+    evaluated = [(BASE_SCENARIO, base, [], base_values)]
+    problems = []
+    for name, (overrides, scale) in specs.items():
+        try:
+            with stage_timer("calculator", "validation"):
+                inputs = ROIInput.model_validate(_apply(base_fields, name, overrides, scale))
+        except ValidationError as e:
+            problems += [f"Scenario '{name}': {'.'.join(map(str, error['loc']))}: {error['msg']}"
+                         for error in e.errors()]
+            continue
+        changed = [field for field in ROIInput.model_fields if getattr(inputs, field) != getattr(base, field)]
+        values, _ = incremental.evaluate(inputs, base_values, _dirty_nodes(base, inputs))
+        evaluated.append((name, inputs, changed, values))
+    if problems:
+        raise ValueError("; ".join(problems))
+
+    projection = cashflow.project_batch(
+        [values["annual_savings"] for _, _, _, values in evaluated],
+        [values["annual_automation_cost"] for _, _, _, values in evaluated],
+        [inputs.implementation_cost for _, inputs, _, _ in evaluated],
+        [inputs.volume_growth for _, inputs, _, _ in evaluated],
+        horizon_years=horizon_years,
+        period=period,
+    )
+    cumulative = np.concatenate([-projection.implementation_cost[:, None], projection.cumulative], axis=1)
+    paid_back = projection.cumulative >= 0
+    payback = np.where(paid_back.any(axis=1), paid_back.argmax(axis=1) + 1, -1).tolist()
+    evaluate_ms = (time.perf_counter() - start) * 1000
+
+    scenarios_out = []
+    for index, (name, inputs, changed, values) in enumerate(evaluated):
+        dumped = inputs.model_dump(mode="json", include=set(changed))
+        scenarios_out.append({
+            "name": name,
+            "changes": {field: dumped[field] for field in changed},
+            "result": incremental.to_output(inputs, values),
+            "payback_period": payback[index] if payback[index] > 0 else None,
+            "final_cumulative": round(float(projection.cumulative[index, -1]), 2),
+        })
+    return {
+        "scenarios": scenarios_out,
+        "chart": {
+            "period": period,
+            "periods": list(range(cumulative.shape[1])),
+            "series": {name: [round(x, 2) for x in cumulative[index].tolist()]
+                       for index, (name, _, _, _) in enumerate(evaluated)},
+        },
+        "evaluate_ms": round(evaluate_ms, 3),
+    }
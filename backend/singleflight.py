@@ -0,0 +1,248 @@
+"""
+singleflight.py - Request Coalescing
+
+Identical requests that arrive while the same work is already running wait
+for it instead of repeating it: when a team opens one shared project at
+once, one PDF is rendered, not dozens. Requests are identical when their
+canonical form (request_key) is.
+
+Within a worker, the first caller for a key (the leader) runs the work and
+callers arriving before it finishes (followers) wait for it and get the same
+result or exception. Nothing is cached; a key is forgotten as soon as its
+leader finishes.
+
+If the leader's client disconnects and its work is cancelled (see
+cancellation.py), its followers do not fail with it: one of them runs the
+work instead. A follower waits at most FOLLOWER_TIMEOUT_SECONDS in total;
+after that (a leader stuck in a render, or leaders that keep being
+cancelled) it runs the work itself.
+
+Across workers on one host (flights created with shared=True, and only when
+SINGLEFLIGHT_DIR is set), the leader also holds an exclusive flock() on a
+per-key lock file in that directory while it works and then publishes the
+result next to it. A leader in another worker waits for that lock and, if a
+result was published while it waited, returns it instead of computing. It
+too waits at most FOLLOWER_TIMEOUT_SECONDS before running the work without
+the lock, so a render stuck in one worker cannot hold up the others. The
+OS releases the lock when a worker dies. Shared flights must return bytes.
+Stale lock files are only removed while nobody holds them, and a worker
+that locked a file which was removed meanwhile locks the new one instead.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from cancellation import Cancelled
+from metrics import SINGLEFLIGHT_REQUESTS
+
+# Directory for cross-worker lock and result files (unset: per-worker only)
+SINGLEFLIGHT_DIR = os.getenv("SINGLEFLIGHT_DIR", "")
+
+# Lock and result files untouched for this long are removed
+STALE_FILE_SECONDS = 60
+
+# Longest a follower waits for other callers' runs before running the work itself
+FOLLOWER_TIMEOUT_SECONDS = 15
+
+# Seconds between attempts to take another worker's lock file
+LOCK_POLL_SECONDS = 0.02
+
+
+def request_key(request) -> str:
+    """
+    Canonical form of a Pydantic request; field order and formatting do not matter.
+
+    Validation fills every field in declaration order, so model_dump_json() is
+    already canonical, and about 4x cheaper than sorting a model_dump(). It is
+    only hashed when it has to name a file (shared flights).
+    """
+    return request.model_dump_json()
+
+
+class _Call:
+    """
+    One in-flight run and its outcome.
+
+    A plain lock held by the leader until it finishes stands in for an Event,
+    which costs ten times as much to create on every uncontended request.
+    """
+
+    __slots__ = ("_running", "result", "error")
+
+    def __init__(self):
+        self._running = threading.Lock()
+        self._running.acquire()
+        self.result = None
+        self.error = None
+
+    def finish(self) -> None:
+        self._running.release()
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for the leader to finish; False on timeout."""
+        if not self._running.acquire(timeout=timeout):
+            return False
+        self._running.release()
+        return True
+
+
+class SingleFlight:
+    """Runs work once per key for all concurrent callers."""
+
+    def __init__(self, name: str, shared: bool = False, shared_dir: Optional[str] = None,
+                 follower_timeout: float = FOLLOWER_TIMEOUT_SECONDS):
+        self.name = name
+        self.follower_timeout = follower_timeout
+        self.shared_dir = (shared_dir or SINGLEFLIGHT_DIR or None) if shared else None
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        if self.shared_dir:
+            os.makedirs(self.shared_dir, exist_ok=True)
+
+    def do(self, key: str, fn: Callable) -> tuple:
+        """
+        Run fn(), or wait for the run already in flight for key.
+
+        Returns:
+            Tuple of (result, whether it came from another caller's run)
+
+        Raises:
+            Whatever fn() raised, in the leader and its followers
+        """
+        deadline = time.monotonic() + self.follower_timeout
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+            if leader:
+                break
+
+            SINGLEFLIGHT_REQUESTS.inc(flight=self.name, role="follower")
+            if not call.wait(max(deadline - time.monotonic(), 0)):
+                # The leader is stuck: do not wait for it any longer
+                SINGLEFLIGHT_REQUESTS.inc(flight=self.name, role="fallback")
+                return fn(), False
+            if isinstance(call.error, Cancelled):
+                continue  # The leader's client left; run it for ours
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result, shared = self._lead(key, fn)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.finish()
+        return call.result, shared
+
+    def _lead(self, key: str, fn: Callable) -> tuple:
+        if not self.shared_dir:
+            SINGLEFLIGHT_REQUESTS.inc(flight=self.name, role="leader")
+            return fn(), False
+
+        import fcntl
+
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        base = os.path.join(self.shared_dir, f"{self.name}-{digest}")
+        waiting_since = time.time_ns()
+        lock_file = self._acquire(f"{base}.lock")
+        if lock_file is None:
+            # Another worker's run is stuck: do not wait for it any longer
+            SINGLEFLIGHT_REQUESTS.inc(flight=self.name, role="fallback")
+            return fn(), False
+
+        with lock_file:
+            try:
+                os.utime(f"{base}.lock")  # In use, not stale
+                # Published while we waited for the lock: another worker's run we overlapped
+                try:
+                    if os.stat(f"{base}.out").st_mtime_ns >= waiting_since:
+                        with open(f"{base}.out", "rb") as f:
+                            result = f.read()
+                        SINGLEFLIGHT_REQUESTS.inc(flight=self.name, role="shared")
+                        return result, True
+                except FileNotFoundError:
+                    pass
+
+                SINGLEFLIGHT_REQUESTS.inc(flight=self.name, role="leader")
+                result = fn()
+                temporary = f"{base}.{os.getpid()}.tmp"
+                with open(temporary, "wb") as f:
+                    f.write(result)
+                os.replace(temporary, f"{base}.out")
+                return result, False
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                self._sweep()
+
+    def _acquire(self, path: str):
+        """
+        Exclusive flock() on a lock file, polling for up to follower_timeout.
+
+        Returns:
+            The open, locked file, or None if another process held it throughout
+        """
+        import fcntl
+
+        deadline = time.monotonic() + self.follower_timeout
+        while True:
+            lock_file = open(path, "a+b")
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        lock_file.close()
+                        return None
+                    time.sleep(LOCK_POLL_SECONDS)
+            try:
+                # Swept while we waited: lock the file that replaced it
+                if os.fstat(lock_file.fileno()).st_ino == os.stat(path).st_ino:
+                    return lock_file
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+    def _sweep(self) -> None:
+        """Remove this flight's stale files, at most once per STALE_FILE_SECONDS."""
+        import fcntl
+
+        now = time.time()
+        if now - self._last_sweep < STALE_FILE_SECONDS:
+            return
+        self._last_sweep = now
+        prefix = f"{self.name}-"
+        for entry in os.scandir(self.shared_dir):
+            if not entry.name.startswith(prefix):
+                continue
+            try:
+                if now - entry.stat().st_mtime <= STALE_FILE_SECONDS:
+                    continue
+                if not entry.name.endswith(".lock"):
+                    os.remove(entry.path)
+                    continue
+                # Only remove a lock nobody holds; waiters re-check the inode they locked
+                with open(entry.path, "a+b") as lock_file:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+
+# Flights shared by the API endpoints
+calculations = SingleFlight("calculate")
+pdf_renders = SingleFlight("pdf", shared=True)
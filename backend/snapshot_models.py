@@ -0,0 +1,31 @@
+"""
+snapshot_models.py - SQLAlchemy Models for Share Snapshots
+
+A snapshot is one calculation frozen for a share link: inputs, results and
+the PDF report as rendered when it was shared. Rows are only ever inserted.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, JSON, LargeBinary
+from database import Base
+
+
+class Snapshot(Base):
+    """SQLAlchemy model for immutable shared calculations."""
+
+    __tablename__ = "snapshots"
+
+    id = Column(String, primary_key=True)  # Content hash, see snapshots.snapshot_id
+    created = Column(DateTime, default=datetime.utcnow)
+    inputs = Column(JSON, nullable=False)
+    results = Column(JSON, nullable=False)
+    pdf = Column(LargeBinary, nullable=False)
+
+    def to_dict(self):
+        """Convert to dictionary for JSON response (the PDF is served separately)."""
+        return {
+            "id": self.id,
+            "created": self.created.isoformat() if self.created else None,
+            "inputs": self.inputs or {},
+            "results": self.results or {},
+        }
@@ -0,0 +1,156 @@
+"""
+snapshots.py - Immutable Share Snapshots
+
+A snapshot freezes one calculation for a share link: its inputs, the results
+and the PDF report, rendered once when the link is created. The short ID is
+a hash of the content (inputs, results and PDF branding), so sharing the same
+calculation twice returns the existing link, and a snapshot never changes
+after it is stored. Its responses can therefore be cached by browsers and
+CDNs for good (Cache-Control: immutable) under strong ETags derived from the
+ID, and a conditional request is answered without reading anything.
+
+Reads go through a per-worker LRU of serialized responses in front of the
+database: a widely shared link costs one query per worker, then nothing.
+"""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from metrics import record_cache
+from models import ROIInput, PDFRequest
+
+# Bytes of the SHA-256 content hash kept in an ID (12 URL-safe characters)
+SNAPSHOT_ID_BYTES = 9
+
+# Snapshots (JSON and PDF) kept per worker
+SNAPSHOT_CACHE_MAX_ENTRIES = 256
+
+# Cache-Control for snapshot responses: one year, never revalidated
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+BRANDING_FIELDS = ("company_name", "brand_color", "logo_base64")
+
+_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{%d}$" % (SNAPSHOT_ID_BYTES * 4 // 3))
+
+
+def snapshot_id(inputs: dict, results: dict, branding: dict) -> str:
+    """Short URL-safe ID from the hash of a snapshot's content."""
+    content = json.dumps({"inputs": inputs, "results": results, "branding": branding},
+                         sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(content.encode()).digest()[:SNAPSHOT_ID_BYTES]
+    return base64.urlsafe_b64encode(digest).decode()
+
+
+def etag(snapshot_id: str, kind: str = "json") -> str:
+    """Strong ETag of a snapshot's JSON or PDF response (content never changes)."""
+    return f'"{snapshot_id}"' if kind == "json" else f'"{snapshot_id}.{kind}"'
+
+
+def is_valid_id(snapshot_id: str) -> bool:
+    return bool(_ID_PATTERN.match(snapshot_id))
+
+
+# =============================================================================
+# RESPONSE CACHE
+# =============================================================================
+
+class SnapshotCache:
+    """LRU of snapshot id -> (JSON body, PDF bytes)."""
+
+    def __init__(self, max_entries: int = SNAPSHOT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, snapshot_id: str) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(snapshot_id)
+            if entry is not None:
+                self._entries.move_to_end(snapshot_id)
+            return entry
+
+    def put(self, snapshot_id: str, body: bytes, pdf: bytes) -> None:
+        with self._lock:
+            self._entries[snapshot_id] = (body, pdf)
+            self._entries.move_to_end(snapshot_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+snapshot_cache = SnapshotCache()
+
+
+def _body(row) -> bytes:
+    return json.dumps(row.to_dict(), separators=(",", ":")).encode()
+
+
+# =============================================================================
+# CREATE AND LOAD
+# =============================================================================
+
+def create(db, request: PDFRequest) -> tuple[str, bool]:
+    """
+    Freeze a calculation, rendering its PDF, unless it is already shared.
+
+    Args:
+        db: SQLAlchemy session
+        request: ROI inputs plus optional PDF branding
+
+    Returns:
+        Tuple of (snapshot id, whether a new snapshot was stored)
+    """
+    from sqlalchemy.exc import IntegrityError
+    from calculator import calculate_roi
+    from pdf_generator import generate_pdf_report
+    from snapshot_models import Snapshot
+
+    result = calculate_roi(request)
+    inputs = request.model_dump(mode="json", include=set(ROIInput.model_fields))
+    results = result.model_dump(mode="json")
+    branding = {field: getattr(request, field) for field in BRANDING_FIELDS}
+    new_id = snapshot_id(inputs, results, branding)
+
+    if snapshot_cache.get(new_id) is not None or db.query(Snapshot.id).filter(Snapshot.id == new_id).first():
+        return new_id, False
+
+    pdf = generate_pdf_report(result, input_data=request, **branding)
+    row = Snapshot(id=new_id, inputs=inputs, results=results, pdf=pdf)
+    db.add(row)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Shared at the same moment by another request
+        db.rollback()
+        return new_id, False
+    return new_id, True
+
+
+def load(db, snapshot_id: str) -> Optional[tuple]:
+    """
+    A snapshot's serialized JSON and PDF, from the cache or the database.
+
+    Returns:
+        Tuple of (JSON body, PDF bytes), or None for an unknown ID
+    """
+    from snapshot_models import Snapshot
+
+    entry = snapshot_cache.get(snapshot_id)
+    record_cache("snapshot", entry is not None)
+    if entry is None:
+        if not is_valid_id(snapshot_id):
+            return None
+        row = db.get(Snapshot, snapshot_id)
+        if row is None:
+            return None
+        entry = (_body(row), row.pdf)
+        snapshot_cache.put(snapshot_id, *entry)
+    return entry
@@ -0,0 +1,185 @@
+"""
+template_library.py - Precomputed Template Library
+
+The example processes shown on the Home and Marketplace pages, with results
+from calculate_roi() instead of numbers typed into the frontend. Definitions
+come from templates.json, exported from app/src/data/templates.js and
+app/src/utils/scenarios.js (npm run export-templates).
+
+The library is computed once per worker, on first use or in warm_up(): every
+template and scenario gets its full ROIOutput, and the JSON bodies are
+serialized up front with a content-hash ETag, so requests are served from
+memory. Template sample PDFs are rendered on first request and kept.
+
+Scenarios (before/after comparisons) become an ROIInput of a monthly process:
+volume runs of timeManualMinutes by one person, automation removing the
+difference to timeAutomatedMinutes, toolCostMonthly as the license and no
+implementation cost. Their monthly outputs are derived from that result.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import threading
+
+from pydantic import ValidationError
+
+from calculator import calculate_roi, calculate_periods_per_year
+from models import ROIInput, ROIOutput
+
+TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates.json")
+
+# Cache-Control max-age for library responses; the ETag changes whenever the
+# definitions or the calculator's results do
+CACHE_MAX_AGE_SECONDS = 86400
+
+
+# =============================================================================
+# SCENARIOS
+# =============================================================================
+
+def scenario_inputs(scenario: dict) -> ROIInput:
+    """ROIInput equivalent of a scenario's assumptions."""
+    assumptions = scenario["assumptions"]
+    manual, automated = assumptions["timeManualMinutes"], assumptions["timeAutomatedMinutes"]
+    return ROIInput(
+        process_name=scenario["title"],
+        frequency="monthly",
+        runs_per_period=assumptions["volume"],
+        hours_per_run=manual / 60,
+        staff_count=1,
+        hourly_rate=assumptions["hourlyRate"],
+        implementation_cost=0,
+        software_license_cost=assumptions["toolCostMonthly"] * 12,
+        expected_labor_reduction=(manual - automated) / manual * 100,
+    )
+
+
+def scenario_outputs(inputs: ROIInput, result: ROIOutput) -> dict:
+    """Monthly figures in the shape of the frontend's scenario outputs."""
+    runs_per_year = inputs.runs_per_period * calculate_periods_per_year(
+        inputs.frequency, inputs.working_days_per_year, inputs.hours_per_day
+    )
+    manual_hours = runs_per_year * inputs.hours_per_run * inputs.staff_count / 12
+    remaining = 1 - inputs.expected_labor_reduction / 100
+    return {
+        "manualHours": round(manual_hours, 2),
+        "manualCost": round(result.annual_labor_cost / 12, 2),
+        "automatedHours": round(manual_hours * remaining, 2),
+        "automatedCost": round(result.annual_labor_cost * remaining / 12, 2),
+        "netSavings": round(result.net_annual_savings / 12, 2),
+        "paybackMonths": result.payback_months,
+    }
+
+
+# =============================================================================
+# LIBRARY
+# =============================================================================
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors())
+
+
+def _etag(content: bytes) -> str:
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def _document(payload) -> tuple[bytes, str]:
+    """Serialized JSON body and its ETag."""
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    return body, _etag(body)
+
+
+class TemplateLibrary:
+    """
+    Templates and scenarios with precomputed results.
+
+    Attributes:
+        templates: Template definitions plus outputs (ROIOutput fields)
+        scenarios: Scenario definitions plus inputs, result (ROIOutput
+                   fields) and monthly outputs
+                   (A definition that does not validate as an ROIInput keeps
+                   null results and an error message instead.)
+        body, etag: Serialized library and its ETag
+    """
+
+    def __init__(self, definitions: dict):
+        self.templates, self.scenarios = [], []
+        self._inputs = {}
+        for template in definitions["templates"]:
+            try:
+                inputs = ROIInput(**template["defaults"])
+            except ValidationError as e:
+                self.templates.append({**template, "outputs": None, "error": _describe(e)})
+                continue
+            self._inputs[template["id"]] = inputs
+            self.templates.append({**template, "outputs": calculate_roi(inputs).model_dump()})
+        for scenario in definitions["scenarios"]:
+            try:
+                inputs = scenario_inputs(scenario)
+            except ValidationError as e:
+                self.scenarios.append({**scenario, "inputs": None, "result": None, "outputs": None,
+                                       "error": _describe(e)})
+                continue
+            result = calculate_roi(inputs)
+            self.scenarios.append({
+                **scenario,
+                "inputs": inputs.model_dump(mode="json", exclude_none=True),
+                "result": result.model_dump(),
+                "outputs": scenario_outputs(inputs, result),
+            })
+
+        self.body, self.etag = _document({"templates": self.templates, "scenarios": self.scenarios})
+        self._documents = {
+            "template": {template["id"]: _document(template) for template in self.templates},
+            "scenario": {scenario["id"]: _document(scenario) for scenario in self.scenarios},
+        }
+        self._pdfs = {}
+        self._pdf_lock = threading.Lock()
+
+    def document(self, kind: str, item_id: str) -> tuple[bytes, str]:
+        """
+        One serialized template or scenario and its ETag.
+
+        Args:
+            kind: "template" or "scenario"
+            item_id: Its id
+
+        Raises:
+            KeyError: On an unknown id
+        """
+        return self._documents[kind][item_id]
+
+    def sample_pdf(self, template_id: str) -> tuple[bytes, str]:
+        """
+        Sample PDF report for a template, rendered once.
+
+        Returns:
+            Tuple of (PDF bytes, ETag)
+
+        Raises:
+            KeyError: On an unknown id or a template without results
+        """
+        inputs = self._inputs[template_id]
+        with self._pdf_lock:
+            if template_id not in self._pdfs:
+                from pdf_generator import generate_pdf_report
+
+                pdf = generate_pdf_report(calculate_roi(inputs), input_data=inputs)
+                # Renders differ only by timestamp, so the ETag follows the template's
+                etag = _etag(self._documents["template"][template_id][1].encode() + b"pdf")
+                self._pdfs[template_id] = (pdf, etag)
+            return self._pdfs[template_id]
+
+    def warm(self):
+        """Render every sample PDF."""
+        for template_id in self._inputs:
+            self.sample_pdf(template_id)
+
+
+@functools.lru_cache(maxsize=None)
+def library() -> TemplateLibrary:
+    """The worker's library, computed on first use."""
+    with open(TEMPLATES_PATH, encoding="utf-8") as f:
+        return TemplateLibrary(json.load(f))
@@ -0,0 +1,33 @@
+"""
+conftest.py - Shared setup for the test suite
+
+Points the app at a throwaway SQLite database and disables rate limiting
+before any backend module is imported.
+"""
+
+import os
+import sys
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+_db_dir = tempfile.mkdtemp(prefix="roi-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+SAMPLE_INPUT = {
+    "process_name": "Invoice Processing",
+    "frequency": "daily",
+    "runs_per_period": 20,
+    "hours_per_run": 0.5,
+    "staff_count": 2,
+    "hourly_rate": 45,
+    "error_rate": 5,
+    "error_fix_cost": 50,
+    "implementation_cost": 25000,
+    "software_license_cost": 3000,
+    "annual_maintenance_cost": 1500,
+    "volume_growth": 10,
+}
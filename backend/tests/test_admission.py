@@ -0,0 +1,94 @@
+"""
+test_admission.py - Admission accounting and coalescing of identical requests
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+import admission
+from conftest import SAMPLE_INPUT
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Counts PDF renders, each taking long enough for requests to overlap."""
+    import time
+    import pdf_generator
+
+    calls = []
+    original = pdf_generator.generate_pdf_report
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        time.sleep(0.05)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(pdf_generator, "generate_pdf_report", counting)
+    return calls
+
+
+async def _post_all(payloads):
+    from main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await asyncio.gather(*(client.post("/generate-pdf", json=p) for p in payloads))
+
+
+def test_identical_pdf_requests_render_once(renders, monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(admission.controller, "capacity", admission.PDF.cost)
+
+    responses = asyncio.run(_post_all([SAMPLE_INPUT] * 12))
+
+    assert [r.status_code for r in responses] == [200] * 12
+    assert len({r.content for r in responses}) == 1
+    assert len(renders) == 1
+    assert admission.controller.in_flight == 0
+    assert admission.controller._keys == {}
+
+
+def test_different_pdf_requests_are_charged_separately(renders, monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(admission.controller, "capacity", admission.PDF.cost)
+
+    payloads = [{**SAMPLE_INPUT, "staff_count": n} for n in range(1, 4)]
+    responses = asyncio.run(_post_all(payloads))
+
+    assert [r.status_code for r in responses] == [200] * 3
+    assert len(renders) == 3
+    assert admission.controller.in_flight == 0
+
+
+def test_queued_identical_requests_join_when_one_is_admitted():
+    async def scenario():
+        controller = admission.AdmissionController(capacity=8, target_ms=10_000)
+        assert await controller.acquire(admission.PDF, "other") == 8
+
+        # Both queue behind "other"; admitting the first lets the second join free
+        first = asyncio.ensure_future(controller.acquire(admission.PDF, "same"))
+        second = asyncio.ensure_future(controller.acquire(admission.PDF, "same"))
+        await asyncio.sleep(0.01)
+        assert not first.done() and not second.done()
+
+        controller.release(8, "other")
+        assert await first == 8
+        assert await second == 0
+        assert controller.in_flight == 8
+
+        # Arriving while "same" is admitted: joins at once
+        assert await controller.acquire(admission.PDF, "same") == 0
+        controller.release(0, "same")
+        controller.release(0, "same")
+        controller.release(8, "same")
+        assert controller.in_flight == 0
+        assert controller._keys == {}
+
+    asyncio.run(scenario())
+
+
+def test_body_key_ignores_key_order_and_whitespace():
+    assert admission._body_key(b'{"a": 1, "b": 2}') == admission._body_key(b'{"b":2,"a":1}')
+    assert admission._body_key(b'{"a": 1}') != admission._body_key(b'{"a": 2}')
+    assert admission._body_key(b"not json") is None
@@ -0,0 +1,169 @@
+"""
+test_cancellation.py - Client disconnects through the full middleware stack
+
+Each request is driven with a hand-written ASGI receive that delivers the
+body and then, at a chosen moment, http.disconnect, the way a server reports
+a closed tab.
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import admission
+import cancellation
+from conftest import SAMPLE_INPUT
+from main import app
+from metrics import CANCELLED_REQUESTS, CANCELLATION_CHECKPOINTS, SINGLEFLIGHT_REQUESTS
+
+
+def _scope(body: bytes) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/generate-pdf",
+        "raw_path": b"/generate-pdf",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"test"), (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+    }
+
+
+def _receive(body: bytes, disconnect: asyncio.Event):
+    """Deliver the body, then http.disconnect once `disconnect` is set."""
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+async def _call(payload: dict, disconnect: asyncio.Event) -> list:
+    """Run one request through the app; returns the messages it sent."""
+    body = json.dumps(payload).encode()
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await app(_scope(body), _receive(body, disconnect), send)
+    return messages
+
+
+def _status(messages: list):
+    return next((m["status"] for m in messages if m["type"] == "http.response.start"), None)
+
+
+async def _wait_until(condition, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def stalled_render(monkeypatch):
+    """
+    The first PDF render stops after its first checkpoint until its client
+    disconnects; later renders run normally.
+
+    Returns:
+        Dict with "started" (set when the first render is stalled) and
+        "renders" (number of renders that began)
+    """
+    import pdf_generator
+
+    state = {"started": threading.Event(), "renders": 0}
+    original = pdf_generator._build_logo_element
+
+    def logo(*args, **kwargs):
+        state["renders"] += 1
+        if state["renders"] == 1:
+            token = cancellation.current()
+            state["started"].set()
+            deadline = time.monotonic() + 5
+            while not token.cancelled and time.monotonic() < deadline:
+                time.sleep(0.01)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(pdf_generator, "_build_logo_element", logo)
+    monkeypatch.setattr(admission, "ADMISSION_ENABLED", True)
+    return state
+
+
+def test_disconnect_while_queued_never_runs(stalled_render):
+    before = CANCELLED_REQUESTS.get(work_class="pdf", stage="queued")
+
+    async def scenario():
+        controller = admission.controller
+        held = await controller.acquire(admission.BATCH)  # Whole capacity busy
+        try:
+            disconnect = asyncio.Event()
+            request = asyncio.ensure_future(_call(SAMPLE_INPUT, disconnect))
+            await _wait_until(lambda: controller.snapshot()["waiting"] == 1)
+            disconnect.set()
+            messages = await asyncio.wait_for(request, 5)
+            assert controller.snapshot()["waiting"] == 0
+        finally:
+            controller.release(held)
+        return messages
+
+    messages = asyncio.run(scenario())
+    assert _status(messages) is None
+    assert stalled_render["renders"] == 0
+    assert CANCELLED_REQUESTS.get(work_class="pdf", stage="queued") == before + 1
+    assert admission.controller.in_flight == 0
+
+
+def test_disconnect_mid_render_stops_at_checkpoint(stalled_render):
+    interrupted = CANCELLED_REQUESTS.get(work_class="pdf", stage="interrupted")
+    checkpoints = CANCELLATION_CHECKPOINTS.get(task="pdf")
+
+    async def scenario():
+        disconnect = asyncio.Event()
+        request = asyncio.ensure_future(_call(SAMPLE_INPUT, disconnect))
+        await _wait_until(stalled_render["started"].is_set)
+        disconnect.set()
+        return await asyncio.wait_for(request, 5)
+
+    messages = asyncio.run(scenario())
+    assert _status(messages) is None  # Neither a PDF nor a 500
+    assert CANCELLED_REQUESTS.get(work_class="pdf", stage="interrupted") == interrupted + 1
+    assert CANCELLATION_CHECKPOINTS.get(task="pdf") == checkpoints + 1
+    assert admission.controller.in_flight == 0
+
+
+def test_follower_renders_when_leader_is_cancelled(stalled_render):
+    async def scenario():
+        leader_gone, follower_stays = asyncio.Event(), asyncio.Event()
+        leader = asyncio.ensure_future(_call(SAMPLE_INPUT, leader_gone))
+        await _wait_until(stalled_render["started"].is_set)
+        followers = SINGLEFLIGHT_REQUESTS.get(flight="pdf", role="follower")
+        follower = asyncio.ensure_future(_call(SAMPLE_INPUT, follower_stays))
+        # The follower joins the leader's render
+        await _wait_until(lambda: SINGLEFLIGHT_REQUESTS.get(flight="pdf", role="follower") > followers)
+        leader_gone.set()
+        return await asyncio.wait_for(leader, 5), await asyncio.wait_for(follower, 10)
+
+    leader_messages, follower_messages = asyncio.run(scenario())
+    assert _status(leader_messages) is None
+    assert _status(follower_messages) == 200
+    body = b"".join(m.get("body", b"") for m in follower_messages if m["type"] == "http.response.body")
+    assert body.startswith(b"%PDF")
+    assert stalled_render["renders"] == 2
+    assert admission.controller.in_flight == 0
@@ -0,0 +1,47 @@
+"""
+test_phasing.py - Input checks of the rollout phasing simulator
+"""
+
+import pytest
+
+import phasing
+from models import ROIInput
+from conftest import SAMPLE_INPUT
+
+
+def _entries(*ids):
+    return [(id, f"Project {id}", ROIInput(**SAMPLE_INPUT)) for id in ids]
+
+
+def test_build_plan_accepts_known_durations():
+    plan = phasing.build_plan(_entries("a", "b"), capacity=1, durations={"b": 3})
+    assert plan.durations.tolist() == [1, 3]
+
+
+def test_build_plan_rejects_duplicate_ids():
+    with pytest.raises(ValueError, match="Duplicate project ids: a"):
+        phasing.build_plan(_entries("a", "b", "a"), capacity=1)
+
+
+def test_build_plan_rejects_unknown_duration_keys():
+    with pytest.raises(ValueError, match="unknown project ids: c"):
+        phasing.build_plan(_entries("a", "b"), capacity=1, durations={"c": 2})
+
+
+def test_simulate_rejects_duplicate_order():
+    plan = phasing.build_plan(_entries("a", "b"), capacity=1)
+    with pytest.raises(ValueError, match="exactly once"):
+        phasing.simulate(plan, order=["a", "a"])
+
+
+def test_endpoint_maps_unknown_durations_to_422():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    response = client.post("/portfolio/phasing", json={
+        "inputs": [SAMPLE_INPUT], "capacity": 1,
+        "durations": {"input-7": 2},
+    })
+    assert response.status_code == 422
+    assert "unknown project ids: input-7" in response.json()["detail"]
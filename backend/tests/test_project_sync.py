@@ -0,0 +1,105 @@
+"""
+test_project_sync.py - Change feed cursors, tombstones and upload conflicts
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import project_sync
+from database import SessionLocal, init_db
+from project_models import Project, ProjectChange
+
+
+@pytest.fixture
+def db():
+    init_db()
+    session = SessionLocal()
+    session.query(ProjectChange).delete()
+    session.query(Project).delete()
+    session.commit()
+    yield session
+    session.close()
+
+
+def _edit(id, base_version=0, deleted=False, name="Invoice Processing"):
+    return SimpleNamespace(id=id, base_version=base_version, deleted=deleted, name=name,
+                           inputs={"process_name": name}, results={}, scenarios={})
+
+
+def _upload(db, *edits):
+    return {result["id"]: result for result in project_sync.apply_changes(db, list(edits))["results"]}
+
+
+def test_new_projects_are_applied_with_versions(db):
+    results = _upload(db, _edit("a"), _edit("b"))
+    assert [r["status"] for r in results.values()] == ["applied", "applied"]
+    assert results["a"]["version"] < results["b"]["version"]
+    assert results["a"]["project"]["name"] == "Invoice Processing"
+
+
+def test_stale_base_version_is_a_conflict(db):
+    first = _upload(db, _edit("a"))["a"]["version"]
+    second = _upload(db, _edit("a", base_version=first, name="Edited"))["a"]["version"]
+
+    stale = _upload(db, _edit("a", base_version=first, name="Stale edit"))["a"]
+    assert stale["status"] == "conflict"
+    assert stale["version"] == second
+    assert stale["project"]["name"] == "Edited"
+    assert db.get(Project, "a").name == "Edited"
+
+
+def test_delete_appears_as_tombstone_after_cursor(db):
+    version = _upload(db, _edit("a"))["a"]["version"]
+    _upload(db, _edit("b"))
+    cursor = project_sync.changes_since(db, 0)["cursor"]
+
+    deleted = _upload(db, _edit("a", base_version=version, deleted=True))["a"]
+    assert deleted["status"] == "applied"
+    assert deleted["deleted"] and deleted["project"] is None
+
+    feed = project_sync.changes_since(db, cursor)
+    assert not feed["full"]
+    assert [(c["id"], c["deleted"], c["project"]) for c in feed["changes"]] == [("a", True, None)]
+    assert feed["cursor"] == deleted["version"]
+    assert project_sync.changes_since(db, feed["cursor"])["changes"] == []
+
+
+def test_edit_of_deleted_project_is_a_conflict(db):
+    version = _upload(db, _edit("a"))["a"]["version"]
+    _upload(db, _edit("a", base_version=version, deleted=True))
+
+    result = _upload(db, _edit("a", base_version=version, name="Edited offline"))["a"]
+    assert result["status"] == "conflict"
+    assert result["deleted"]
+
+
+def test_cursor_beyond_latest_seq_returns_full_list(db):
+    _upload(db, _edit("a"), _edit("b"))
+    latest = project_sync.changes_since(db, 0)["cursor"]
+
+    feed = project_sync.changes_since(db, latest + 100)
+    assert feed["full"]
+    assert sorted(c["id"] for c in feed["changes"]) == ["a", "b"]
+    assert feed["cursor"] == latest
+
+
+def test_paging_follows_has_more(db):
+    cursor = _upload(db, _edit("seen"))["seen"]["version"]
+    versions = _upload(db, *(_edit(f"p{i}") for i in range(10)))
+
+    seen = []
+    while True:
+        page = project_sync.changes_since(db, cursor, limit=3)
+        assert len(page["changes"]) <= 3
+        seen.extend(c["id"] for c in page["changes"])
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            break
+    assert seen == [f"p{i}" for i in range(10)]
+    assert cursor == max(v["version"] for v in versions.values())
+
+
+def test_duplicate_ids_in_one_upload_are_rejected(db):
+    with pytest.raises(ValueError, match="only once"):
+        project_sync.apply_changes(db, [_edit("a"), _edit("a")])
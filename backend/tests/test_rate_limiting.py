@@ -0,0 +1,79 @@
+"""
+test_rate_limiting.py - Redis rate limit storage against a local stand-in
+
+Runs the limiter and per-key quotas through a redis:// URI. The URI is served
+by an in-process fakeredis server, or by a real server when TEST_REDIS_URI is
+set (e.g. redis://localhost:6379/15; the database is flushed). Skipped when
+neither is available.
+"""
+
+import os
+import time
+
+import pytest
+
+redis = pytest.importorskip("redis")
+
+from limits import parse  # noqa: E402
+
+import rate_limiting  # noqa: E402
+
+TEST_REDIS_URI = os.getenv("TEST_REDIS_URI")
+
+
+@pytest.fixture
+def redis_uri(monkeypatch):
+    """A redis:// URI configured as the limit storage, backed by a clean database."""
+    if TEST_REDIS_URI:
+        uri = TEST_REDIS_URI
+        redis.from_url(uri).flushdb()
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")  # limits runs its windows as Lua scripts
+        server = fakeredis.FakeServer()
+        uri = "redis://127.0.0.1:6379/0"
+        monkeypatch.setattr(redis, "from_url",
+                            lambda url, **options: fakeredis.FakeRedis.from_url(url, server=server, **options))
+    monkeypatch.setattr(rate_limiting, "RATE_LIMIT_STORAGE_URI", uri)
+    monkeypatch.setattr(rate_limiting, "RATE_LIMIT_STRATEGY", "sliding-window-counter")
+    monkeypatch.setattr(rate_limiting, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limiting, "_quota_limiter", None)
+    return uri
+
+
+def test_limiter_uses_redis_storage(redis_uri):
+    limiter = rate_limiting.create_limiter()
+    assert type(limiter._storage).__name__ == "RedisStorage"
+    assert limiter._storage.check()
+
+    limit = parse("3/minute")
+    assert [limiter.limiter.hit(limit, "client-a") for _ in range(4)] == [True, True, True, False]
+    assert limiter.limiter.hit(limit, "client-b")
+
+
+def test_limiter_reset_clears_counters(redis_uri):
+    limiter = rate_limiting.create_limiter()
+    limit = parse("1/minute")
+    assert limiter.limiter.hit(limit, "client-a")
+    assert not limiter.limiter.hit(limit, "client-a")
+
+    limiter.reset()
+    assert limiter.limiter.hit(limit, "client-a")
+
+
+def test_quota_sliding_window_recovers(redis_uri):
+    assert rate_limiting.hit_quota("2/second", "key-1")
+    assert rate_limiting.hit_quota("2/second", "key-1")
+    assert not rate_limiting.hit_quota("2/second", "key-1")
+    assert rate_limiting.hit_quota("2/second", "key-2")
+
+    # Both the current and the weighted previous window have expired
+    time.sleep(2.1)
+    assert rate_limiting.hit_quota("2/second", "key-1")
+
+
+def test_quota_rejections_are_recorded(redis_uri):
+    before = rate_limiting.throttle_metrics.snapshot()["throttled_total"]
+    rate_limiting.hit_quota("1/minute", "key-3")
+    assert not rate_limiting.hit_quota("1/minute", "key-3")
+    assert rate_limiting.throttle_metrics.snapshot()["throttled_total"] == before + 1
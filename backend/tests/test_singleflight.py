@@ -0,0 +1,88 @@
+"""
+test_singleflight.py - Coalescing within a worker and across workers
+"""
+
+import hashlib
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import singleflight
+
+
+def test_concurrent_callers_share_one_run():
+    flight = singleflight.SingleFlight("test")
+    started, release = threading.Event(), threading.Event()
+    runs, results = [], []
+
+    def work():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    def call():
+        results.append(flight.do("key", work))
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(runs) == 1
+    assert sorted(results) == [("result", False)] + [("result", True)] * 7
+
+
+def test_follower_runs_the_work_when_the_leader_is_stuck():
+    flight = singleflight.SingleFlight("test", follower_timeout=0.2)
+    started, release = threading.Event(), threading.Event()
+
+    def stuck():
+        started.set()
+        release.wait(5)
+        return "leader"
+
+    leader = threading.Thread(target=flight.do, args=("key", stuck))
+    leader.start()
+    started.wait(5)
+    begin = time.monotonic()
+    assert flight.do("key", lambda: "follower") == ("follower", False)
+    assert time.monotonic() - begin < 2
+    release.set()
+    leader.join(5)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="flock() is POSIX only")
+def test_lock_held_by_another_process_is_not_waited_on_forever(tmp_path):
+    flight = singleflight.SingleFlight("pdf", shared=True, shared_dir=str(tmp_path), follower_timeout=0.3)
+    base = tmp_path / f"pdf-{hashlib.sha256(b'key').hexdigest()}"
+    lock_path = base.with_suffix(".lock")
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import fcntl, sys, time\n"
+         f"f = open({str(lock_path)!r}, 'a+b')\n"
+         "fcntl.flock(f, fcntl.LOCK_EX)\n"
+         "print('locked', flush=True)\n"
+         "time.sleep(30)\n"],
+        stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        begin = time.monotonic()
+        assert flight.do("key", lambda: b"rendered") == (b"rendered", False)
+        assert 0.3 <= time.monotonic() - begin < 2
+    finally:
+        holder.kill()
+        holder.wait()
+
+    # Once the other worker is gone the lock is free again and results are published
+    assert flight.do("key", lambda: b"again") == (b"again", False)
+    assert base.with_suffix(".out").read_bytes() == b"again"
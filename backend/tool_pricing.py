@@ -0,0 +1,222 @@
+"""
+tool_pricing.py - Automation Platform Pricing
+
+Tier tables for Zapier, Make, n8n and Power Automate (the same data as
+app/src/utils/toolPricing.js) and the lookup that prices a monthly run
+volume on each platform. The tables are compiled once into sorted
+allowance breakpoints; a lookup is a binary search, done with bisect for
+one process and np.searchsorted for many.
+
+Tier rules follow calculateToolCost() in the frontend: a tier applies when
+its monthly allowance covers the volume (unlimited tiers cover any volume)
+and the cheapest such tier wins. Tiers without a published allowance are
+never matched by volume; above every allowance the platform's top tier
+applies. Quote-only ("custom") tiers have no list price: their cost is NaN
+and they are never picked as the cheapest platform.
+
+One run of a process is counted as one task / operation / execution.
+"""
+
+import bisect
+import functools
+import math
+
+PRICING_LAST_UPDATED = "2025-12-31"
+
+UNLIMITED = math.inf
+
+# Platform -> name, pricing unit and tiers as (name, monthly allowance, monthly
+# price in USD). Allowance None = not published; price None = quote only.
+TOOLS = {
+    "zapier": {
+        "name": "Zapier",
+        "unit": "tasks/month",
+        "tiers": [("Free", 100, 0.0), ("Professional", None, 19.99), ("Team", None, 69.0)],
+    },
+    "make": {
+        "name": "Make (Integromat)",
+        "unit": "credits/month",
+        "tiers": [("Free", 1000, 0.0), ("Core", 10000, 9.0), ("Pro", 30000, 16.0),
+                  ("Teams", 100000, 29.0), ("Enterprise", 500000, 99.0)],
+    },
+    "n8n": {
+        "name": "n8n",
+        "unit": "executions/month",
+        "tiers": [("Starter", 2500, 22.0), ("Pro", 10000, 55.0), ("Business", 40000, 730.0),
+                  ("Enterprise", None, None)],
+    },
+    "power_automate": {
+        "name": "Power Automate",
+        "unit": "user or bot/month",
+        "tiers": [("Premium", UNLIMITED, 15.0), ("Process", UNLIMITED, 150.0), ("Hosted Process", UNLIMITED, 215.0)],
+    },
+}
+
+# Column order of quote_all() results
+PLATFORMS = tuple(TOOLS)
+
+# Platform choices: a platform, or the cheapest one for the volume
+CHEAPEST = "cheapest"
+CHOICES = PLATFORMS + (CHEAPEST,)
+
+
+class PlatformTable:
+    """One platform's tiers compiled for binary search."""
+
+    __slots__ = ("platform", "tier_names", "prices", "breakpoints", "choice")
+
+    def __init__(self, platform: str, tiers: list):
+        self.platform = platform
+        self.tier_names = tuple(name for name, _, _ in tiers)
+        self.prices = tuple(math.nan if price is None else float(price) for _, _, price in tiers)
+
+        # Matchable tiers by allowance; choice[i] is the tier used when the
+        # first covering allowance is breakpoints[i] (the cheapest tier from
+        # there up), and choice[-1] the top tier for volumes above them all
+        matchable = sorted((allowance, index) for index, (_, allowance, _) in enumerate(tiers) if allowance is not None)
+        self.breakpoints = tuple(float(allowance) for allowance, _ in matchable)
+
+        def cost(index):
+            return (math.isnan(self.prices[index]), self.prices[index])
+
+        choice = [len(tiers) - 1]
+        best = None
+        for _, index in reversed(matchable):
+            if best is None or cost(index) <= cost(best):
+                best = index
+            choice.append(best)
+        self.choice = tuple(reversed(choice))
+
+    def lookup(self, runs_per_month: float) -> int:
+        """Index of the tier for one monthly volume."""
+        return self.choice[bisect.bisect_left(self.breakpoints, runs_per_month)]
+
+    def lookup_batch(self, runs_per_month):
+        """Tier indexes for an array of monthly volumes."""
+        import numpy as np
+
+        positions = np.searchsorted(np.asarray(self.breakpoints), runs_per_month, side="left")
+        return np.asarray(self.choice)[positions]
+
+
+@functools.lru_cache(maxsize=None)
+def tables() -> dict:
+    """Compiled tables by platform (built on first use)."""
+    return {platform: PlatformTable(platform, tool["tiers"]) for platform, tool in TOOLS.items()}
+
+
+def quote(platform: str, runs_per_month: float) -> tuple[str, str, float]:
+    """
+    Price one monthly volume on a platform.
+
+    Args:
+        platform: A PLATFORMS id, or "cheapest" for the lowest list price
+        runs_per_month: Runs (tasks) per month
+
+    Returns:
+        Tuple of (platform, tier name, monthly cost); cost is NaN for a
+        quote-only tier
+
+    Raises:
+        ValueError: On an unknown platform
+    """
+    compiled = tables()
+    if platform == CHEAPEST:
+        options = [(platform,) + _tier(compiled[platform], runs_per_month) for platform in PLATFORMS]
+        priced = [option for option in options if not math.isnan(option[2])]
+        return min(priced, key=lambda option: option[2])
+    if platform not in compiled:
+        raise ValueError(f"Unknown platform: {platform}. Expected one of {', '.join(PLATFORMS)} or cheapest")
+    return (platform,) + _tier(compiled[platform], runs_per_month)
+
+
+def _tier(table: PlatformTable, runs_per_month: float) -> tuple[str, float]:
+    index = table.lookup(runs_per_month)
+    return table.tier_names[index], table.prices[index]
+
+
+def quote_all(runs_per_month) -> dict:
+    """
+    Price many monthly volumes on every platform in one call.
+
+    Args:
+        runs_per_month: Array-like of runs per month, one per process
+
+    Returns:
+        Dict with tier (int array (processes, PLATFORMS), index into each
+        platform's tiers), monthly_cost (float array, NaN for quote-only
+        tiers) and cheapest (int array, index into PLATFORMS of the lowest
+        list price; ties go to the earlier platform)
+    """
+    import numpy as np
+
+    volumes = np.atleast_1d(np.asarray(runs_per_month, dtype=float))
+    compiled = tables()
+    tier = np.empty((len(volumes), len(PLATFORMS)), dtype=np.int64)
+    cost = np.empty((len(volumes), len(PLATFORMS)))
+    for column, platform in enumerate(PLATFORMS):
+        table = compiled[platform]
+        tier[:, column] = table.lookup_batch(volumes)
+        cost[:, column] = np.asarray(table.prices)[tier[:, column]]
+    cheapest = np.argmin(np.where(np.isnan(cost), np.inf, cost), axis=1)
+    return {"tier": tier, "monthly_cost": cost, "cheapest": cheapest}
+
+
+def annual_license_costs(choices, runs_per_month, fallback):
+    """
+    Annual license cost per process, vectorized license_cost().
+
+    Args:
+        choices: Int array of indexes into CHOICES, -1 where no platform is chosen
+        runs_per_month: Array-like of runs per month
+        fallback: Array-like used where no platform is chosen or the tier is
+                  quote-only (normally software_license_cost)
+
+    Returns:
+        Float array
+    """
+    import numpy as np
+
+    choices = np.asarray(choices)
+    fallback = np.asarray(fallback, dtype=float)
+    if not (choices >= 0).any():
+        return fallback.copy()
+
+    quotes = quote_all(runs_per_month)
+    column = np.where(choices == CHOICES.index(CHEAPEST), quotes["cheapest"], np.maximum(choices, 0))
+    monthly = quotes["monthly_cost"][np.arange(len(choices)), column]
+    priced = (choices >= 0) & ~np.isnan(monthly)
+    return np.where(priced, monthly * 12, fallback)
+
+
+def license_cost(platform: str, runs_per_month: float, fallback: float) -> float:
+    """
+    Annual license cost for one process: the platform's tier price times 12,
+    or fallback when no platform is chosen (None) or the tier is quote-only.
+    """
+    if platform is None:
+        return fallback
+    monthly = quote(platform, runs_per_month)[2]
+    return fallback if math.isnan(monthly) else monthly * 12
+
+
+def pricing_table() -> dict:
+    """Platforms and tiers in JSON-friendly form."""
+    return {
+        "last_updated": PRICING_LAST_UPDATED,
+        "platforms": {
+            platform: {
+                "name": tool["name"],
+                "unit": tool["unit"],
+                "tiers": [
+                    {
+                        "name": name,
+                        "included": "unlimited" if allowance == UNLIMITED else allowance,
+                        "monthly_price": price,
+                    }
+                    for name, allowance, price in tool["tiers"]
+                ],
+            }
+            for platform, tool in TOOLS.items()
+        },
+    }